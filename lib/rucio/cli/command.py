@@ -17,16 +17,11 @@ import sys
 import time
 
 import click
-from rich.console import Console
-from rich.status import Status
-from rich.theme import Theme
-from rich.traceback import install
 
 from rucio import version
-from rucio.cli.bin_legacy.rucio import ping, test_server, whoami_account
-from rucio.cli.utils import Arguments, exception_handler, get_client, setup_gfal2_logger, signal_handler
-from rucio.client.richclient import MAX_TRACEBACK_WIDTH, MIN_CONSOLE_WIDTH, CLITheme, get_cli_config, get_pager, setup_rich_logger
-from rucio.common.utils import setup_logger
+
+# Only click and the version are imported with the module, so that `rucio --version` starts fast.
+# The client stack, rich and the legacy commands are imported when a command is invoked.
 
 
 # Taken directly from https://click.palletsprojects.com/en/stable/complex/#defining-the-lazy-group
@@ -62,9 +57,9 @@ class LazyGroup(click.Group):
             raise ValueError(f"Lazy loading of {import_path} failed by returning " "a non-command object")
         return cmd_object
 
-    @exception_handler
     def _invoke_with_handler(self, ctx: click.Context):
-        return super().invoke(ctx)
+        from rucio.cli.utils import exception_handler
+        return exception_handler(super().invoke)(ctx)
 
     def invoke(self, ctx: click.Context):
         result = self._invoke_with_handler(ctx)
@@ -184,6 +179,15 @@ def main(
     client_key: str,
     ca_certificate: str,
 ):
+    from rich.console import Console
+    from rich.status import Status
+    from rich.theme import Theme
+    from rich.traceback import install
+
+    from rucio.cli.utils import Arguments, get_client, setup_gfal2_logger, signal_handler
+    from rucio.client.richclient import MAX_TRACEBACK_WIDTH, MIN_CONSOLE_WIDTH, CLITheme, get_cli_config, get_pager, setup_rich_logger
+    from rucio.common.utils import setup_logger
+
     ctx.ensure_object(Arguments)
     ctx.obj.start_time = time.time()
     ctx.obj.verbose = verbose
@@ -265,6 +269,8 @@ def _teardown(ctx):
 @main.command(name="whoami", help="Get information about account whose token is used")
 @click.pass_context
 def exe_whoami(ctx):
+    from rucio.cli.bin_legacy.rucio import whoami_account
+    from rucio.cli.utils import Arguments
     args = Arguments({"no_pager": ctx.obj.no_pager})
     whoami_account(args, ctx.obj.client, ctx.obj.logger, ctx.obj.console, ctx.obj.spinner)
 
@@ -272,6 +278,8 @@ def exe_whoami(ctx):
 @main.command(name="ping", help="Ping Rucio server")
 @click.pass_context
 def exe_ping(ctx):
+    from rucio.cli.bin_legacy.rucio import ping
+    from rucio.cli.utils import Arguments
     args = Arguments({"no_pager": ctx.obj.no_pager})
     ping(args, ctx.obj.client, ctx.obj.logger, ctx.obj.console, ctx.obj.spinner)
 
@@ -279,5 +287,7 @@ def exe_ping(ctx):
 @main.command(name="test-server", help="Test client against the server")
 @click.pass_context
 def exe_test_server(ctx):
+    from rucio.cli.bin_legacy.rucio import test_server
+    from rucio.cli.utils import Arguments
     args = Arguments({"no_pager": ctx.obj.no_pager})
     test_server(args, ctx.obj.client, ctx.obj.logger, ctx.obj.console, ctx.obj.spinner)
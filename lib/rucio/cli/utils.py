@@ -26,7 +26,6 @@ from typing import Optional, Union
 
 import click
 
-from rucio.client.client import Client
 from rucio.common.config import config_get
 from rucio.common.exception import (
     AccessDenied,
@@ -168,6 +167,8 @@ def get_client(args, logger):
     """
     Returns a new client object.
     """
+    from rucio.client.client import Client
+
     if hasattr(args, "config") and (args.config is not None):
         os.environ["RUCIO_CONFIG"] = args.config
 
@@ -19,22 +19,31 @@
 import errno
 import getpass
 import json
+import logging
 import os
 import secrets
+import socket
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from configparser import NoOptionError, NoSectionError
 from os import environ, fdopen, geteuid, makedirs
 from shutil import move
 from tempfile import mkstemp
+from types import GeneratorType
 from typing import TYPE_CHECKING, Any, Optional
 from urllib.parse import urlparse
 
 import requests
 from dogpile.cache import make_region
 from requests import Response, Session
-from requests.exceptions import ConnectionError
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, Timeout
 from requests.status_codes import codes
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib3.connection import HTTPConnection
 
 from rucio import version
 from rucio.common import exception
@@ -45,7 +54,7 @@ from rucio.common.extra import import_extras
 from rucio.common.utils import build_url, get_tmp_dir, my_key_generator, parse_response, setup_logger, ssh_sign, wlcg_token_discovery
 
 if TYPE_CHECKING:
-    from collections.abc import Generator
+    from collections.abc import Callable, Generator, Iterable
     from logging import Logger
 
 EXTRA_MODULES = import_extras(['requests_kerberos'])
@@ -62,6 +71,11 @@ REGION = make_region(function_key_generator=my_key_generator).configure(
 
 STATUS_CODES_TO_RETRY = [502, 503, 504]
 MAX_RETRY_BACK_OFF_SECONDS = 10
+# the connection pools of the session, per host, see the client section of rucio.cfg
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 32
+# the size of the reads of the x-json-stream responses, the default of requests is 512 bytes
+JSON_STREAM_CHUNK_SIZE = 64 * 1024
 
 
 @REGION.cache_on_arguments(namespace='host_to_choose')
@@ -83,6 +97,125 @@ def _expand_path(path: str) -> str:
     return os.path.abspath(os.path.expanduser(os.path.expandvars(path)))
 
 
+def _keepalive_socket_options(keepalive_idle: int) -> list[tuple[int, int, int]]:
+    """
+    Socket options enabling TCP keep-alive, so that the idle connections of a pool are not dropped by firewalls.
+
+    :param keepalive_idle: the seconds of inactivity before the first probe, and between probes.
+    :returns: the socket options, in addition to the default ones of urllib3.
+    """
+    options = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+    if hasattr(socket, 'TCP_KEEPIDLE'):
+        options += [(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, keepalive_idle),
+                    (socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, keepalive_idle)]
+    return options
+
+
+class KeepAliveHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled connections optionally enable TCP keep-alive."""
+
+    __attrs__ = HTTPAdapter.__attrs__ + ['keepalive_idle']
+
+    def __init__(self, keepalive_idle: Optional[int] = None, **kwargs) -> None:
+        """
+        :param keepalive_idle: the seconds of inactivity before a keep-alive probe, None to keep the system settings.
+        :param kwargs: the arguments of HTTPAdapter, e.g. pool_connections and pool_maxsize.
+        """
+        self.keepalive_idle = keepalive_idle
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs) -> None:
+        if self.keepalive_idle:
+            pool_kwargs['socket_options'] = _keepalive_socket_options(self.keepalive_idle)
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+
+
+class _HTTPXRawStream:
+    """File-like object over the decoded body of an httpx response, used as the raw stream of a requests Response."""
+
+    def __init__(self, response) -> None:
+        self._response = response
+        self._chunks = response.iter_bytes()
+        self._buffer = bytearray()
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        while amt is None or len(self._buffer) < amt:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        amt = len(self._buffer) if amt is None else amt
+        data = bytes(self._buffer[:amt])
+        del self._buffer[:amt]
+        return data
+
+    def close(self) -> None:
+        self._response.close()
+
+    def release_conn(self) -> None:
+        self._response.close()
+
+
+class HTTP2Adapter(HTTPAdapter):
+    """
+    Transport adapter sending the requests of a requests Session over HTTP/2, with httpx.
+
+    One httpx client, which multiplexes the requests over its connections, is kept per TLS configuration.
+    """
+
+    def __init__(self, httpx, pool_maxsize: int = DEFAULT_POOL_MAXSIZE, keepalive_idle: Optional[int] = None) -> None:
+        """
+        :param httpx: the httpx module.
+        :param pool_maxsize: the maximum number of connections per host.
+        :param keepalive_idle: the seconds of inactivity before a keep-alive probe, None to keep the system settings.
+        """
+        super().__init__()
+        self._httpx = httpx
+        self._limits = httpx.Limits(max_connections=pool_maxsize, max_keepalive_connections=pool_maxsize)
+        self._socket_options = _keepalive_socket_options(keepalive_idle) if keepalive_idle else None
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def _get_client(self, verify, cert):
+        key = (verify, tuple(cert) if isinstance(cert, list) else cert)
+        with self._lock:
+            if key not in self._clients:
+                transport = self._httpx.HTTPTransport(http2=True, verify=verify, cert=cert, limits=self._limits, socket_options=self._socket_options)
+                self._clients[key] = self._httpx.Client(transport=transport)
+            return self._clients[key]
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None) -> Response:
+        client = self._get_client(verify, cert)
+        if isinstance(timeout, tuple):
+            timeout = self._httpx.Timeout(timeout[1], connect=timeout[0])
+        try:
+            httpx_request = client.build_request(request.method, request.url, headers=dict(request.headers), content=request.body, timeout=timeout)
+            httpx_response = client.send(httpx_request, stream=True)
+        except self._httpx.TimeoutException as error:
+            raise Timeout(error, request=request)
+        except self._httpx.TransportError as error:
+            raise ConnectionError(error, request=request)
+
+        response = Response()
+        response.status_code = httpx_response.status_code
+        response.reason = httpx_response.reason_phrase
+        response.headers = CaseInsensitiveDict(httpx_response.headers.items())
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = _HTTPXRawStream(httpx_response)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        if not stream:
+            response.content  # noqa: B018
+        return response
+
+    def close(self) -> None:
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
+
+
 class BaseClient:
 
     """Main client class for accessing Rucio resources. Handles the authentication."""
@@ -131,7 +264,11 @@ class BaseClient:
         """
 
         self.logger = logger
-        self.session = Session()
+        self.pool_connections = config_get_int('client', 'pool_connections', False, DEFAULT_POOL_CONNECTIONS)
+        self.pool_maxsize = config_get_int('client', 'pool_maxsize', False, DEFAULT_POOL_MAXSIZE)
+        self.keepalive_idle = config_get_int('client', 'keepalive_idle', False, 0) or None
+        self.http2 = config_get_bool('client', 'http2', False, False)
+        self.session = self._create_session()
         self.user_agent = "%s/%s" % (user_agent, version.version_string())  # e.g. "rucio-clients/0.2.13"
         sys.argv[0] = sys.argv[0].split('/')[-1]
         self.script_id = '::'.join(sys.argv[0:2])
@@ -242,6 +379,75 @@ class BaseClient:
         except ValueError:
             self.logger.debug('request_retries must be an integer. Taking default.')
 
+    def _create_session(self) -> Session:
+        """
+        Creates the HTTP session, with connection pools sized for concurrent callers.
+
+        The pool of each host keeps up to pool_maxsize connections open, instead of the 10 of requests,
+        so that the threads of the download and upload clients, or of run_concurrently, reuse them.
+        If http2 is set and httpx is installed, the requests are sent over HTTP/2 instead.
+        """
+        session = Session()
+        adapter = None
+        if self.http2:
+            httpx = import_extras(['httpx'])['httpx']
+            if httpx is None:
+                self.logger.warning('http2 is enabled in the client section but httpx is not installed. Using HTTP/1.1.')
+            else:
+                adapter = HTTP2Adapter(httpx, pool_maxsize=self.pool_maxsize, keepalive_idle=self.keepalive_idle)
+        if adapter is None:
+            adapter = KeepAliveHTTPAdapter(keepalive_idle=self.keepalive_idle, pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def run_concurrently(
+            self,
+            calls: 'Iterable[Callable[[], Any]]',
+            max_workers: Optional[int] = None,
+            return_exceptions: bool = False
+    ) -> list[Any]:
+        """
+        Sends independent API calls concurrently over the connection pool of the client.
+
+        Parameters
+        ----------
+        calls :
+            The calls, as callables without arguments, e.g. functools.partial(client.get_did, scope, name).
+        max_workers :
+            The maximum number of calls in flight, by default the size of the connection pool.
+        return_exceptions :
+            If True, the exception raised by a call is returned in place of its result.
+            Otherwise, the first exception in the order of the calls is raised, once all calls are done.
+
+        Returns
+        -------
+        The results of the calls, in the order of the calls. The generators returned by the listing
+        methods are consumed in the worker threads and returned as lists.
+        """
+        def _call(call):
+            result = call()
+            if isinstance(result, GeneratorType):
+                result = list(result)
+            return result
+
+        calls = list(calls)
+        if not calls:
+            return []
+        with ThreadPoolExecutor(max_workers=min(max_workers or self.pool_maxsize, len(calls))) as executor:
+            futures = [executor.submit(_call, call) for call in calls]
+
+        results = []
+        for future in futures:
+            error = future.exception()
+            if error is None:
+                results.append(future.result())
+            elif return_exceptions:
+                results.append(error)
+            else:
+                raise error
+        return results
+
     def _get_auth_tokens(self) -> tuple[Optional[str], str, str, str]:
         # if token file path is defined in the rucio.cfg file, use that file. Currently this prevents authenticating as another user or VO.
         auth_token_file_path = config_get('client', 'auth_token_file_path', False, None)
@@ -409,18 +615,24 @@ class BaseClient:
         else:
             return exception.RucioException, "%s: %s" % (exc_cls, exc_msg)
 
-    def _load_json_data(self, response: requests.Response) -> 'Generator[Any, Any, Any]':
+    def _load_json_data(
+            self,
+            response: requests.Response,
+            datetime_fields: 'Optional[Iterable[str]]' = None
+    ) -> 'Generator[Any, Any, Any]':
         """
         Helper method to correctly load json data based on the content type of the http response.
 
         :param response: the response received from the server.
+        :param datetime_fields: the keys holding dates in the returned objects, if known for the endpoint.
+                                Only these keys are converted to datetime, which is faster than testing every string.
         """
         if 'content-type' in response.headers and response.headers['content-type'] == 'application/x-json-stream':
-            for line in response.iter_lines():
+            for line in response.iter_lines(chunk_size=JSON_STREAM_CHUNK_SIZE):
                 if line:
-                    yield parse_response(line)
+                    yield parse_response(line, datetime_fields)
         elif 'content-type' in response.headers and response.headers['content-type'] == 'application/json':
-            yield parse_response(response.text)
+            yield parse_response(response.text, datetime_fields)
         else:  # Exception ?
             if response.text:
                 yield response.text
@@ -472,14 +684,12 @@ class BaseClient:
         if verify is None:
             verify = self.ca_cert or False  # Maybe unnecessary but make sure to convert "" -> False
 
-        self.logger.debug("HTTP request: %s %s" % (method.value, url))
-        for h, v in hds.items():
-            if h == 'X-Rucio-Auth-Token':
-                v = "[hidden]"
-            self.logger.debug("HTTP header:  %s: %s" % (h, v))
-        if method != HTTPMethod.GET and data:
-            text = self._reduce_data(data)
-            self.logger.debug("Request data (length=%d): [%s]" % (len(data), text))
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("HTTP request: %s %s" % (method.value, url))
+            self.logger.debug("HTTP headers: %s" % ', '.join('%s: %s' % (h, '[hidden]' if h == 'X-Rucio-Auth-Token' else v) for h, v in hds.items()))
+            if method != HTTPMethod.GET and data:
+                text = self._reduce_data(data)
+                self.logger.debug("Request data (length=%d): [%s]" % (len(data), text))
 
         result = None
         for retry in range(self.AUTH_RETRIES + 1):
@@ -518,7 +728,7 @@ class BaseClient:
                 continue
 
             if result is not None and result.status_code == codes.unauthorized and not get_token:  # pylint: disable-msg=E1101
-                self.session = Session()
+                self.session = self._create_session()
                 self.__get_token()
                 hds['X-Rucio-Auth-Token'] = self.auth_token
             else:
@@ -83,7 +83,8 @@ class DIDClient(BaseClient):
         r = self._send_request(url, method=HTTPMethod.GET)
 
         if r.status_code == codes.ok:
-            dids = self._load_json_data(r)
+            # the listed DIDs hold no dates
+            dids = self._load_json_data(r, datetime_fields=())
             return dids
         else:
             exc_cls, exc_msg = self._get_exception(headers=r.headers, status_code=r.status_code, data=r.content)
@@ -558,7 +559,7 @@ class DIDClient(BaseClient):
 
         r = self._send_request(url, method=HTTPMethod.GET)
         if r.status_code == codes.ok:
-            return self._load_json_data(r)
+            return self._load_json_data(r, datetime_fields=())
         else:
             exc_cls, exc_msg = self._get_exception(headers=r.headers, status_code=r.status_code, data=r.content)
             raise exc_cls(exc_msg)
@@ -23,21 +23,25 @@ import shutil
 import signal
 import subprocess
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from queue import Empty, Queue, deque
-from threading import Thread
+from threading import Condition, Thread
 from typing import TYPE_CHECKING, Any, Optional
+from urllib.parse import urlparse
 
 from rucio import version
 from rucio.client.client import Client
-from rucio.common.checksum import CHECKSUM_ALGO_DICT, GLOBALLY_SUPPORTED_CHECKSUMS, PREFERRED_CHECKSUM, adler32
+from rucio.common.checksum import CHECKSUM_ALGO_DICT, GLOBALLY_SUPPORTED_CHECKSUMS, PREFERRED_CHECKSUM, STREAMING_CHECKSUMS, ChecksumCalculator, adler32
 from rucio.common.client import detect_client_location
-from rucio.common.config import config_get
+from rucio.common.config import config_get, config_get_int
 from rucio.common.constants import DEFAULT_VO
 from rucio.common.didtype import DID
 from rucio.common.exception import InputValidationError, NoFilesDownloaded, NotAllFilesDownloaded, RucioException
 from rucio.common.pcache import Pcache
 from rucio.common.utils import execute, extract_scope, generate_uuid, parse_replicas_from_file, parse_replicas_from_string, send_trace, sizefmt
 from rucio.rse import rsemanager as rsemgr
+from rucio.rse.protocols.protocol import RSEProtocol
 
 if TYPE_CHECKING:
     from collections.abc import Iterable, Iterator
@@ -155,6 +159,74 @@ class BaseExtractionTool:
         return False
 
 
+class HostConcurrencyLimiter:
+    """
+    Limits the number of concurrent downloads from each source host.
+
+    The limit of a host adapts to its behaviour: it is halved when a download from
+    the host fails and increased by one when a download succeeds, up to max_per_host.
+    A download over several streams takes one slot per stream.
+    """
+
+    def __init__(self, max_per_host: int):
+        """
+        Parameters
+        ----------
+        max_per_host :
+            The maximum number of concurrent downloads from one host
+        """
+        self.max_per_host = max(1, max_per_host)
+        self._limits = {}
+        self._active = {}
+        self._condition = Condition()
+
+    def acquire(self, host: str) -> None:
+        """
+        Waits until a download from the host can start.
+        """
+        with self._condition:
+            while self._active.get(host, 0) >= self._limits.get(host, self.max_per_host):
+                self._condition.wait()
+            self._active[host] = self._active.get(host, 0) + 1
+
+    def release(self, host: str, success: bool) -> None:
+        """
+        Ends a download from the host and adapts the limit of the host.
+        """
+        with self._condition:
+            self._active[host] -= 1
+            limit = self._limits.get(host, self.max_per_host)
+            if success:
+                self._limits[host] = min(limit + 1, self.max_per_host)
+            else:
+                self._limits[host] = max(limit // 2, 1)
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self, host: str) -> "Iterator[None]":
+        """
+        Holds a slot of the host during a download. The download fails if it raises,
+        except with NotImplementedError, which is an operation not supported by the protocol.
+        """
+        self.acquire(host)
+        success = False
+        try:
+            yield
+            success = True
+        except NotImplementedError:
+            success = True
+            raise
+        finally:
+            self.release(host, success)
+
+    def limit(self, host: str) -> int:
+        """
+        Returns the current limit of concurrent downloads from the host.
+        """
+        with self._condition:
+            return self._limits.get(host, self.max_per_host)
+
+
 class DownloadClient:
 
     def __init__(
@@ -231,6 +303,12 @@ class DownloadClient:
         self.extraction_tools.append(BaseExtractionTool('tar', '--version', extract_args, logger=self.logger))
         self.extract_scope_convention = config_get('common', 'extract_scope', False, None)
 
+        self.max_threads = config_get_int('download', 'max_threads', False, 32)
+        self.host_limiter = HostConcurrencyLimiter(config_get_int('download', 'max_threads_per_host', False, 5))
+        self.multistream_threshold = config_get_int('download', 'multistream_threshold', False, 1024 ** 3)
+        self.multistream_chunk_size = config_get_int('download', 'multistream_chunk_size', False, 256 * 1024 ** 2)
+        self.max_streams = config_get_int('download', 'max_streams', False, 4)
+
     def download_pfns(
         self,
         items: list[dict[str, Any]],
@@ -569,13 +647,13 @@ class DownloadClient:
         logger = self.logger
 
         num_files = len(input_items)
-        nlimit = 5
         num_threads = max(1, num_threads)
-        num_threads = min(num_files, num_threads, nlimit)
+        num_threads = min(num_files, num_threads, self.max_threads)
 
         input_queue = Queue()
         output_queue = Queue()
-        input_queue.queue = deque(input_items)
+        # start with the largest files, so that they do not end the download alone
+        input_queue.queue = deque(sorted(input_items, key=lambda item: item.get('bytes') or 0, reverse=True))
 
         if num_threads < 2:
             logger(logging.INFO, 'Using main thread to download %d file(s)' % num_files)
@@ -696,6 +774,70 @@ class DownloadClient:
         timeout = bytes_ // transfer_speed_timeout + transfer_speed_timeout_static_increment
         return timeout
 
+    def _get_file(
+            self,
+            protocol: RSEProtocol,
+            pfn: str,
+            dest_file_path: str,
+            filesize: Optional[int],
+            transfer_timeout: Optional[int],
+            host: str,
+            log_prefix: str = ''
+    ) -> None:
+        """
+        Downloads a file with the protocol. Large files are downloaded in ranges over
+        parallel streams when the protocol supports range requests. Each stream holds
+        a slot of the host in the host limiter.
+        (This function is meant to be used as class internal only)
+
+        Parameters
+        ----------
+        protocol :
+            The connected protocol of the source
+        pfn :
+            The PFN of the file to download
+        dest_file_path :
+            Path where the file is stored
+        filesize :
+            The size of the file in bytes, if known
+        transfer_timeout :
+            Timeout in seconds of the download
+        host :
+            The host of the source, whose concurrent downloads are limited
+        log_prefix :
+            String that will be put at the beginning of every log message
+        """
+        if (
+            not filesize
+            or filesize < self.multistream_threshold
+            or self.max_streams < 2
+            or type(protocol).get_range is RSEProtocol.get_range
+        ):
+            with self.host_limiter.slot(host):
+                protocol.get(pfn, dest_file_path, transfer_timeout=transfer_timeout)
+            return
+
+        def get_range(offset: int, length: int) -> None:
+            with self.host_limiter.slot(host):
+                protocol.get_range(pfn, dest_file_path, offset, length, transfer_timeout=transfer_timeout)
+
+        chunk_size = max(self.multistream_chunk_size, 1)
+        ranges = [(offset, min(chunk_size, filesize - offset)) for offset in range(0, filesize, chunk_size)]
+        num_streams = min(self.max_streams, len(ranges))
+        self.logger(logging.INFO, '%sDownloading %s in %d ranges over %d streams' % (log_prefix, pfn, len(ranges), num_streams))
+
+        with open(dest_file_path, 'wb') as dest_file:
+            dest_file.truncate(filesize)
+        try:
+            with ThreadPoolExecutor(max_workers=num_streams) as executor:
+                futures = [executor.submit(get_range, offset, length) for offset, length in ranges]
+                for future in futures:
+                    future.result()
+        except NotImplementedError:
+            self.logger(logging.DEBUG, '%sRange requests are not supported for %s, downloading it in one stream' % (log_prefix, pfn))
+            with self.host_limiter.slot(host):
+                protocol.get(pfn, dest_file_path, transfer_timeout=transfer_timeout)
+
     def _download_item(
             self,
             item: dict[str, Any],
@@ -874,8 +1016,13 @@ class DownloadClient:
 
                 start_time = time.time()
 
+                checksum_calculator = None
+                if not item.get('merged_options', {}).get('ignore_checksum', False):
+                    checksum_calculator = ChecksumCalculator(name for name in GLOBALLY_SUPPORTED_CHECKSUMS if item.get(name) and name in STREAMING_CHECKSUMS)
+                protocol.checksum_calculator = checksum_calculator
+
                 try:
-                    protocol.get(pfn, temp_file_path, transfer_timeout=transfer_timeout)
+                    self._get_file(protocol, pfn, temp_file_path, item.get('bytes'), transfer_timeout, urlparse(pfn).netloc or rse_name, log_prefix)
                     success = True
                 except Exception as error:
                     logger(logging.DEBUG, error)
@@ -885,7 +1032,11 @@ class DownloadClient:
                 end_time = time.time()
 
                 if success and not item.get('merged_options', {}).get('ignore_checksum', False):
-                    verified, rucio_checksum, local_checksum = _verify_checksum(item, temp_file_path)
+                    # the checksums computed during the download only apply if the protocol saw all the bytes
+                    streamed_checksums = None
+                    if checksum_calculator and checksum_calculator.bytes == os.path.getsize(temp_file_path):
+                        streamed_checksums = checksum_calculator.hexdigests()
+                    verified, rucio_checksum, local_checksum = _verify_checksum(item, temp_file_path, streamed_checksums)
                     if not verified:
                         success = False
                         os.unlink(temp_file_path)
@@ -2034,21 +2185,27 @@ class DownloadClient:
 
 def _verify_checksum(
         item: dict[str, Any],
-        path: str
+        path: str,
+        checksums: Optional[dict[str, str]] = None
 ) -> tuple[bool, Optional[str], Optional[str]]:
+    """
+    Verifies the checksum of a downloaded file. The checksums computed while the file
+    was downloaded are used when given, otherwise the file is read again.
+    """
+    checksums = checksums or {}
     rucio_checksum = item.get(PREFERRED_CHECKSUM)
     local_checksum = None
     checksum_algo = CHECKSUM_ALGO_DICT.get(PREFERRED_CHECKSUM)
 
     if rucio_checksum and checksum_algo:
-        local_checksum = checksum_algo(path)
+        local_checksum = checksums.get(PREFERRED_CHECKSUM) or checksum_algo(path)
         return rucio_checksum == local_checksum, rucio_checksum, local_checksum
 
     for checksum_name in GLOBALLY_SUPPORTED_CHECKSUMS:
         rucio_checksum = item.get(checksum_name)
         checksum_algo = CHECKSUM_ALGO_DICT.get(checksum_name)
         if rucio_checksum and checksum_algo:
-            local_checksum = checksum_algo(path)
+            local_checksum = checksums.get(checksum_name) or checksum_algo(path)
             return rucio_checksum == local_checksum, rucio_checksum, local_checksum
 
     return False, None, None
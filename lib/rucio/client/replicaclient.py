@@ -247,7 +247,7 @@ class ReplicaClient(BaseClient):
         r = self._send_request(url, headers=headers, method=HTTPMethod.POST, data=dumps(data), stream=True)
         if r.status_code == codes.ok:
             if not metalink:
-                return self._load_json_data(r)
+                return self._load_json_data(r, datetime_fields=())
             return r.text
         exc_cls, exc_msg = self._get_exception(headers=r.headers, status_code=r.status_code, data=r.content)
         raise exc_cls(exc_msg)
@@ -46,6 +46,29 @@ class RSEClient(BaseClient):
         --------
         A dict containing all attributes of the referred RSE.
 
+        Raises
+        -------
+        RSENotFound:
+            if the referred RSE was not found in the database.
+        """
+        return self.get_rse_with_etag(rse)[0]
+
+    def get_rse_with_etag(self, rse: str, etag: Optional[str] = None) -> tuple[Optional[dict[str, Any]], Optional[str]]:
+        """
+        Returns details about the referred RSE and their ETag, unless they did not change.
+
+        Parameters
+        ----------
+        rse:
+            Name of the referred RSE
+        etag:
+            The ETag of the details known by the caller, sent as If-None-Match header.
+
+        Returns
+        --------
+        A tuple with the dict containing all attributes of the referred RSE, or None if they
+        still match the given ETag, and the ETag of the current attributes.
+
         Raises
         -------
         RSENotFound:
@@ -54,10 +77,13 @@ class RSEClient(BaseClient):
         path = '/'.join([self.RSE_BASEURL, rse])
         url = build_url(choice(self.list_hosts), path=path)
 
-        r = self._send_request(url, method=HTTPMethod.GET)
+        headers = {'If-None-Match': etag} if etag else None
+        r = self._send_request(url, method=HTTPMethod.GET, headers=headers)
         if r.status_code == codes.ok:
             rse_dict = loads(r.text)
-            return rse_dict
+            return rse_dict, r.headers.get('ETag')
+        elif r.status_code == codes.not_modified:
+            return None, r.headers.get('ETag', etag)
         else:
             exc_cls, exc_msg = self._get_exception(headers=r.headers, status_code=r.status_code, data=r.content)
             raise exc_cls(exc_msg)
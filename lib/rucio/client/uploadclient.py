@@ -21,13 +21,16 @@ import os.path
 import random
 import socket
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
 from pathlib import Path
+from threading import Lock
 from typing import TYPE_CHECKING, Any, Final, Optional, Union, cast
 
 from rucio import version
 from rucio.client.client import Client
 from rucio.common.bittorrent import bittorrent_v2_merkle_sha256
-from rucio.common.checksum import GLOBALLY_SUPPORTED_CHECKSUMS, adler32, md5
+from rucio.common.checksum import GLOBALLY_SUPPORTED_CHECKSUMS, calculate_checksums, checksum_files
 from rucio.common.client import detect_client_location
 from rucio.common.config import config_get, config_get_bool, config_get_int
 from rucio.common.constants import DEFAULT_VO, RseAttr
@@ -46,16 +49,123 @@ from rucio.common.exception import (
     ScopeNotFound,
     ServiceUnavailable,
 )
-from rucio.common.utils import execute, generate_uuid, make_valid_did, retry, send_trace
+from rucio.common.utils import chunks, execute, generate_uuid, make_valid_did, retry, send_trace
 from rucio.rse import rsemanager as rsemgr
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable, Mapping
+    from collections.abc import Callable, Iterable, Mapping
 
     from rucio.common.types import AttachDict, DatasetDict, DIDStringDict, FileToUploadDict, FileToUploadWithCollectedAndDatasetInfoDict, FileToUploadWithCollectedInfoDict, LFNDict, LoggerFunction, PathTypeAlias, RSESettingsDict, TraceBaseDict, TraceDict
     from rucio.rse.protocols.protocol import RSEProtocol
 
 
+class _ReplicaRegistrationBatch:
+    """
+    Collects the registrations following the uploads, and registers them in bulk.
+
+    The replica states are updated with one call per RSE and the files are attached
+    with one call for all the datasets, every batch_size files. When a bulk call
+    fails, the registrations are retried one by one to find the failed files.
+    """
+
+    def __init__(
+            self,
+            client: Client,
+            batch_size: int = 100,
+            logger: "LoggerFunction" = logging.log
+    ):
+        self.client = client
+        self.batch_size = max(1, batch_size)
+        self.logger = logger
+        self._pending = []
+        self._failed = set()
+        self._lock = Lock()
+
+    def add(
+            self,
+            file: "Mapping[str, Any]",
+            replica: Optional[dict[str, Any]],
+            attach: bool
+    ) -> None:
+        """
+        Adds the registrations of an uploaded file, and registers the batch when it is full.
+
+        Parameters
+        ----------
+        file
+            The uploaded file.
+        replica
+            The replica whose state is updated, if any.
+        attach
+            If True, the file is attached to its dataset.
+        """
+        if not replica and not attach:
+            return
+        # the batch is registered outside the lock, the other uploads keep adding to the next one
+        with self._lock:
+            self._pending.append((file, replica, attach))
+            if len(self._pending) < self.batch_size:
+                return
+            pending, self._pending = self._pending, []
+        self._register_pending(pending)
+
+    def flush(self) -> None:
+        """
+        Registers the pending registrations.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        self._register_pending(pending)
+
+    def succeeded(self, file: "Mapping[str, Any]") -> bool:
+        """
+        Returns whether the registrations of the file succeeded.
+        """
+        return '%s:%s' % (file['did_scope'], file['did_name']) not in self._failed
+
+    def _register_pending(self, pending: list[tuple["Mapping[str, Any]", Optional[dict[str, Any]], bool]]) -> None:
+        if not pending:
+            return
+
+        files_per_rse = {}
+        for file, replica, _ in pending:
+            if replica:
+                files_per_rse.setdefault(file['rse'], []).append(file)
+        replicas = {id(file): replica for file, replica, _ in pending}
+        for rse, files in files_per_rse.items():
+            self._register(files,
+                           lambda files, rse=rse: self.client.update_replicas_states(rse, files=[replicas[id(file)] for file in files]),
+                           'Failed to update replica state for file {}')
+
+        attached_files = [file for file, _, attach in pending if attach]
+        if attached_files:
+            def _attach(files):
+                attachments = {}
+                for file in files:
+                    attachments.setdefault((file['dataset_scope'], file['dataset_name']), []).append({'scope': file['did_scope'], 'name': file['did_name']})
+                self.client.attach_dids_to_dids([{'scope': scope, 'name': name, 'dids': dids} for (scope, name), dids in attachments.items()])
+            self._register(attached_files, _attach, 'Failed to attach file {} to the dataset')
+
+    def _register(
+            self,
+            files: list["Mapping[str, Any]"],
+            register: "Callable[[list[Mapping[str, Any]]], Any]",
+            error_message: str
+    ) -> None:
+        try:
+            register(files)
+            return
+        except Exception as error:
+            if len(files) == 1:
+                self._failed.add('%s:%s' % (files[0]['did_scope'], files[0]['did_name']))
+                self.logger(logging.ERROR, error_message.format(files[0]['basename']))
+                self.logger(logging.DEBUG, 'Details: {}'.format(str(error)))
+                return
+            self.logger(logging.WARNING, 'Bulk registration of %d files failed, registering them one by one' % len(files))
+        for file in files:
+            self._register([file], register, error_message)
+
+
 class UploadClient:
     def __init__(
         self,
@@ -115,6 +225,8 @@ class UploadClient:
         self.default_file_scope: Final[str] = 'user.' + self.client.account
         self.rses = {}
         self.rse_expressions = {}
+        # the datasets are created once, by the first of the parallel uploads registering one of their files
+        self._registration_lock = Lock()
 
         self.trace: "TraceBaseDict" = {
             'hostname': socket.getfqdn(),
@@ -376,224 +488,52 @@ class UploadClient:
 
         # clear this set again to ensure that we only try to register datasets once
         registered_dataset_dids = set()
+        batch_size = max(1, config_get_int('upload', 'registration_batch_size', False, 100))
+        registrations = _ReplicaRegistrationBatch(self.client, batch_size=batch_size, logger=logger)
+        upload_file = partial(self._upload_file,
+                              registered_dataset_dids=registered_dataset_dids,
+                              registrations=registrations,
+                              traces_copy_out=traces_copy_out,
+                              ignore_availability=ignore_availability,
+                              activity=activity)
+        max_workers_per_rse = config_get_int('upload', 'max_workers_per_rse', False, 1)
+        parallel = max_workers_per_rse > 1 and len(files) > 1
+        if parallel:
+            logger(logging.INFO, 'Uploading %d files with up to %d workers per RSE' % (len(files), max_workers_per_rse))
+        executors = {}
+        futures = {}
+        uploaded = set()
+        try:
+            # the files registered before their upload are registered in bulk, by chunks,
+            # and the parallel uploads of a chunk run while the next one is registered
+            for chunk in chunks(files, batch_size):
+                self._register_files([file for file in chunk if self._registers_before_upload(file)],
+                                     registered_dataset_dids,
+                                     ignore_availability=ignore_availability,
+                                     activity=activity)
+                if parallel:
+                    for file in chunk:
+                        if file['rse'] not in executors:
+                            executors[file['rse']] = ThreadPoolExecutor(max_workers=max_workers_per_rse)
+                        futures[executors[file['rse']].submit(upload_file, file)] = file
+                else:
+                    uploaded.update(id(file) for file in chunk if upload_file(file))
+            uploaded.update(id(futures[future]) for future in as_completed(futures) if future.result())
+        finally:
+            for executor in executors.values():
+                executor.shutdown(cancel_futures=True)
+            registrations.flush()
+
+        # only report success if the registration operations succeeded as well
         num_succeeded = 0
         summary = []
         for file in files:
-            basename = file['basename']
-            logger(logging.INFO, 'Preparing upload for file %s' % basename)
-
-            no_register = file.get('no_register')
-            register_after_upload = file.get('register_after_upload') and not no_register
-            pfn = file.get('pfn')
-            force_scheme = file.get('force_scheme')
-            impl = file.get('impl')
-            delete_existing = False
-
-            trace = copy.deepcopy(self.trace)
-            # appending trace to the list reference if the reference exists
-            if traces_copy_out is not None:
-                traces_copy_out.append(trace)
-
-            rse = file['rse']
-            trace['scope'] = file['did_scope']
-            trace['datasetScope'] = file.get('dataset_scope', '')
-            trace['dataset'] = file.get('dataset_name', '')
-            trace['remoteSite'] = rse
-            trace['filesize'] = file['bytes']
-
-            file_did = {'scope': file['did_scope'], 'name': file['did_name']}
-            dataset_did_str = file.get('dataset_did_str')
-            rse_settings = self.rses[rse]
-            rse_sign_service = rse_settings.get('sign_url', None)
-            is_deterministic = rse_settings.get('deterministic', True)
-            if not is_deterministic and not pfn:
-                logger(logging.ERROR, 'PFN has to be defined for NON-DETERMINISTIC RSE.')
+            if id(file) not in uploaded:
                 continue
-            if pfn and is_deterministic:
-                logger(logging.WARNING,
-                       'Upload with given pfn implies that no_register is True, except non-deterministic RSEs')
-                no_register = True
-
-            # resolving local area networks
-            domain = 'wan'
-            rse_attributes = {}
-            try:
-                rse_attributes = self.client.list_rse_attributes(rse)
-            except Exception:
-                logger(logging.WARNING, 'Attributes of the RSE: %s not available.' % rse)
-            if self.client_location and 'lan' in rse_settings['domain'] and RseAttr.SITE in rse_attributes:
-                if self.client_location['site'] == rse_attributes[RseAttr.SITE]:
-                    domain = 'lan'
-            logger(logging.DEBUG, '{} domain is used for the upload'.format(domain))
-
-            # FIXME:
-            # Rewrite preferred_impl selection - also check test_upload.py/test_download.py and fix impl order (see FIXME there)
-            #
-            # if not impl and not force_scheme:
-            #    impl = self.preferred_impl(rse_settings, domain)
-
-            if not no_register and not register_after_upload:
-                self._register_file(file,
-                                    registered_dataset_dids,
-                                    ignore_availability=ignore_availability,
-                                    activity=activity)
-
-            # if register_after_upload, the file should be overwritten if it is not registered,
-            # otherwise if the file already exists on RSE we're done
-            if register_after_upload:
-                if rsemgr.exists(rse_settings,
-                                 pfn if pfn else file_did,  # type: ignore (pfn is str)
-                                 domain=domain,
-                                 scheme=force_scheme,
-                                 impl=impl,
-                                 auth_token=self.auth_token,
-                                 vo=self.client.vo,
-                                 logger=logger):
-                    try:
-                        self.client.get_did(file['did_scope'], file['did_name'])
-                        logger(logging.INFO, 'File already registered. Skipping upload.')
-                        trace['stateReason'] = 'File already exists'
-                        continue
-                    except DataIdentifierNotFound:
-                        logger(logging.INFO, 'File already exists on RSE. Previous left overs will be overwritten.')
-                        delete_existing = True
-            elif not is_deterministic and not no_register:
-                if rsemgr.exists(rse_settings,
-                                 pfn,  # type: ignore (pfn is str)
-                                 domain=domain,
-                                 scheme=force_scheme,
-                                 impl=impl,
-                                 auth_token=self.auth_token,
-                                 vo=self.client.vo,
-                                 logger=logger):
-                    logger(logging.INFO,
-                           'File already exists on RSE with given pfn. Skipping upload. Existing replica has to be removed first.')
-                    trace['stateReason'] = 'File already exists'
-                    continue
-                elif rsemgr.exists(rse_settings,
-                                   file_did,
-                                   domain=domain,
-                                   scheme=force_scheme,
-                                   impl=impl,
-                                   auth_token=self.auth_token,
-                                   vo=self.client.vo,
-                                   logger=logger):
-                    logger(logging.INFO, 'File already exists on RSE with different pfn. Skipping upload.')
-                    trace['stateReason'] = 'File already exists'
-                    continue
-            else:
-                if rsemgr.exists(rse_settings,
-                                 pfn if pfn else file_did,  # type: ignore (pfn is str)
-                                 domain=domain,
-                                 scheme=force_scheme,
-                                 impl=impl,
-                                 auth_token=self.auth_token,
-                                 vo=self.client.vo,
-                                 logger=logger):
-                    logger(logging.INFO, 'File already exists on RSE. Skipping upload')
-                    trace['stateReason'] = 'File already exists'
-                    continue
-
-            # protocol handling and upload
-            protocols = rsemgr.get_protocols_ordered(rse_settings=rse_settings,
-                                                     operation='write',
-                                                     scheme=force_scheme,
-                                                     domain=domain,
-                                                     impl=impl)
-            protocols.reverse()
-            success = False
-            state_reason = ''
-            logger(logging.DEBUG, str(protocols))
-            while not success and len(protocols):
-                protocol = protocols.pop()
-                cur_scheme = protocol['scheme']
-                logger(logging.INFO, 'Trying upload with %s to %s' % (cur_scheme, rse))
-                lfn: "LFNDict" = {'name': file['did_name'],
-                                  'scope': file['did_scope'],
-                                  'filename': basename}
-
-                for checksum_name in GLOBALLY_SUPPORTED_CHECKSUMS:
-                    if checksum_name in file:
-                        lfn[checksum_name] = file[checksum_name]
-
-                lfn['filesize'] = file['bytes']
-
-                sign_service = None
-                if cur_scheme == 'https':
-                    sign_service = rse_sign_service
-
-                trace['protocol'] = cur_scheme
-                trace['transferStart'] = time.time()
-                logger(logging.DEBUG, 'Processing upload with the domain: {}'.format(domain))
-                try:
-                    pfn = self._upload_item(rse_settings=rse_settings,
-                                            rse_attributes=rse_attributes,
-                                            lfn=lfn,
-                                            source_dir=file['dirname'],
-                                            domain=domain,
-                                            impl=impl,
-                                            force_scheme=cur_scheme,
-                                            force_pfn=pfn,
-                                            transfer_timeout=file.get('transfer_timeout'),
-                                            delete_existing=delete_existing,
-                                            sign_service=sign_service)
-                    logger(logging.DEBUG, 'Upload done.')
-                    success = True
-                    file['upload_result'] = {0: True, 1: None, 'success': True, 'pfn': pfn}  # TODO: needs to be removed
-                except (ServiceUnavailable,
-                        ResourceTemporaryUnavailable,
-                        RSEOperationNotSupported,
-                        RucioException) as error:
-                    logger(logging.WARNING, 'Upload attempt failed')
-                    logger(logging.INFO, 'Exception: %s' % str(error), exc_info=True)
-                    state_reason = str(error)
-
-            if success:
-                trace['transferEnd'] = time.time()
-                trace['clientState'] = 'DONE'
-                file['state'] = 'A'
-                logger(logging.INFO, 'Successfully uploaded file %s' % basename)
-                self._send_trace(cast("TraceDict", trace))
-
-                if summary_file_path:
-                    summary.append(copy.deepcopy(file))
-
-                registration_succeeded = True
-                if not no_register:
-                    if register_after_upload:
-                        self._register_file(file,
-                                            registered_dataset_dids,
-                                            ignore_availability=ignore_availability,
-                                            activity=activity)
-                    else:
-                        replica_for_api = self._convert_file_for_api(file)
-                        try:
-                            self.client.update_replicas_states(rse, files=[replica_for_api])
-                        except Exception as error:
-                            registration_succeeded = False
-                            logger(logging.ERROR, 'Failed to update replica state for file {}'.format(basename))
-                            logger(logging.DEBUG, 'Details: {}'.format(str(error)))
-
-                # add the file to dataset if needed
-                if dataset_did_str and not no_register:
-                    try:
-                        self.client.attach_dids(
-                            file['dataset_scope'],  # type: ignore (`dataset_scope` always exists if `dataset_did_str`)
-                            file['dataset_name'],  # type: ignore (`dataset_name` always exists if `dataset_did_str`)
-                            [file_did])
-                    except Exception as error:
-                        registration_succeeded = False
-                        logger(logging.ERROR, 'Failed to attach file to the dataset')
-                        logger(logging.DEBUG, 'Attaching to dataset {}'.format(str(error)))
-
-                # only report success if the registration operations succeeded as well
-                if registration_succeeded:
-                    num_succeeded += 1
-            else:
-                trace['clientState'] = 'FAILED'
-                trace['stateReason'] = state_reason
-                self._send_trace(cast('TraceDict', trace))
-                logger(logging.ERROR, 'Failed to upload file %s' % basename)
+            if summary_file_path:
+                summary.append(copy.deepcopy(file))
+            if registrations.succeeded(file):
+                num_succeeded += 1
 
         if summary_file_path:
             logger(logging.DEBUG, 'Summary will be available at {}'.format(summary_file_path))
@@ -623,6 +563,230 @@ class UploadClient:
             raise NotAllFilesUploaded()
         return 0
 
+    def _upload_file(
+            self,
+            file: "FileToUploadWithCollectedInfoDict",
+            registered_dataset_dids: set[str],
+            registrations: "_ReplicaRegistrationBatch",
+            traces_copy_out: Optional[list["TraceBaseDict"]] = None,
+            ignore_availability: bool = False,
+            activity: Optional[str] = None
+    ) -> bool:
+        """
+        Upload one file to its RSE, registering it after the upload if requested.
+
+        The files registered before their upload are registered in bulk by `upload`.
+        The replica state update and the attachment to the dataset following the upload
+        are added to the registration batch, which registers them in bulk.
+
+        Parameters
+        ----------
+        file
+            The collected information of the file, with its RSE.
+        registered_dataset_dids
+            A set of dataset DIDs already registered to avoid duplicates.
+        registrations
+            The batch collecting the registrations following the uploads.
+        traces_copy_out
+            A list reference for collecting the traces generated during the upload.
+        ignore_availability
+            If True, ignores the RSE's availability status.
+        activity
+            Specifies the transfer activity (e.g., 'User Subscriptions') for the replication rule.
+
+        Returns
+        -------
+        bool
+            True if the file was uploaded, False otherwise.
+        """
+        logger = self.logger
+        basename = file['basename']
+        logger(logging.INFO, 'Preparing upload for file %s' % basename)
+
+        no_register = file.get('no_register')
+        register_after_upload = file.get('register_after_upload') and not no_register
+        pfn = file.get('pfn')
+        force_scheme = file.get('force_scheme')
+        impl = file.get('impl')
+        delete_existing = False
+
+        trace = copy.deepcopy(self.trace)
+        # appending trace to the list reference if the reference exists
+        if traces_copy_out is not None:
+            traces_copy_out.append(trace)
+
+        rse = file['rse']
+        trace['scope'] = file['did_scope']
+        trace['datasetScope'] = file.get('dataset_scope', '')
+        trace['dataset'] = file.get('dataset_name', '')
+        trace['remoteSite'] = rse
+        trace['filesize'] = file['bytes']
+
+        file_did = {'scope': file['did_scope'], 'name': file['did_name']}
+        dataset_did_str = file.get('dataset_did_str')
+        rse_settings = self.rses[rse]
+        rse_sign_service = rse_settings.get('sign_url', None)
+        is_deterministic = rse_settings.get('deterministic', True)
+        if not is_deterministic and not pfn:
+            logger(logging.ERROR, 'PFN has to be defined for NON-DETERMINISTIC RSE.')
+            return False
+        if pfn and is_deterministic:
+            logger(logging.WARNING,
+                   'Upload with given pfn implies that no_register is True, except non-deterministic RSEs')
+            no_register = True
+
+        # resolving local area networks
+        domain = 'wan'
+        rse_attributes = {}
+        try:
+            rse_attributes = self.client.list_rse_attributes(rse)
+        except Exception:
+            logger(logging.WARNING, 'Attributes of the RSE: %s not available.' % rse)
+        if self.client_location and 'lan' in rse_settings['domain'] and RseAttr.SITE in rse_attributes:
+            if self.client_location['site'] == rse_attributes[RseAttr.SITE]:
+                domain = 'lan'
+        logger(logging.DEBUG, '{} domain is used for the upload'.format(domain))
+
+        # FIXME:
+        # Rewrite preferred_impl selection - also check test_upload.py/test_download.py and fix impl order (see FIXME there)
+        #
+        # if not impl and not force_scheme:
+        #    impl = self.preferred_impl(rse_settings, domain)
+
+        # if register_after_upload, the file should be overwritten if it is not registered,
+        # otherwise if the file already exists on RSE we're done
+        if register_after_upload:
+            if rsemgr.exists(rse_settings,
+                             pfn if pfn else file_did,  # type: ignore (pfn is str)
+                             domain=domain,
+                             scheme=force_scheme,
+                             impl=impl,
+                             auth_token=self.auth_token,
+                             vo=self.client.vo,
+                             logger=logger):
+                try:
+                    self.client.get_did(file['did_scope'], file['did_name'])
+                    logger(logging.INFO, 'File already registered. Skipping upload.')
+                    trace['stateReason'] = 'File already exists'
+                    return False
+                except DataIdentifierNotFound:
+                    logger(logging.INFO, 'File already exists on RSE. Previous left overs will be overwritten.')
+                    delete_existing = True
+        elif not is_deterministic and not no_register:
+            if rsemgr.exists(rse_settings,
+                             pfn,  # type: ignore (pfn is str)
+                             domain=domain,
+                             scheme=force_scheme,
+                             impl=impl,
+                             auth_token=self.auth_token,
+                             vo=self.client.vo,
+                             logger=logger):
+                logger(logging.INFO,
+                       'File already exists on RSE with given pfn. Skipping upload. Existing replica has to be removed first.')
+                trace['stateReason'] = 'File already exists'
+                return False
+            elif rsemgr.exists(rse_settings,
+                               file_did,
+                               domain=domain,
+                               scheme=force_scheme,
+                               impl=impl,
+                               auth_token=self.auth_token,
+                               vo=self.client.vo,
+                               logger=logger):
+                logger(logging.INFO, 'File already exists on RSE with different pfn. Skipping upload.')
+                trace['stateReason'] = 'File already exists'
+                return False
+        else:
+            if rsemgr.exists(rse_settings,
+                             pfn if pfn else file_did,  # type: ignore (pfn is str)
+                             domain=domain,
+                             scheme=force_scheme,
+                             impl=impl,
+                             auth_token=self.auth_token,
+                             vo=self.client.vo,
+                             logger=logger):
+                logger(logging.INFO, 'File already exists on RSE. Skipping upload')
+                trace['stateReason'] = 'File already exists'
+                return False
+
+        # protocol handling and upload
+        protocols = rsemgr.get_protocols_ordered(rse_settings=rse_settings,
+                                                 operation='write',
+                                                 scheme=force_scheme,
+                                                 domain=domain,
+                                                 impl=impl)
+        protocols.reverse()
+        success = False
+        state_reason = ''
+        logger(logging.DEBUG, str(protocols))
+        while not success and len(protocols):
+            protocol = protocols.pop()
+            cur_scheme = protocol['scheme']
+            logger(logging.INFO, 'Trying upload with %s to %s' % (cur_scheme, rse))
+            lfn: "LFNDict" = {'name': file['did_name'],
+                              'scope': file['did_scope'],
+                              'filename': basename}
+
+            for checksum_name in GLOBALLY_SUPPORTED_CHECKSUMS:
+                if checksum_name in file:
+                    lfn[checksum_name] = file[checksum_name]
+
+            lfn['filesize'] = file['bytes']
+
+            sign_service = None
+            if cur_scheme == 'https':
+                sign_service = rse_sign_service
+
+            trace['protocol'] = cur_scheme
+            trace['transferStart'] = time.time()
+            logger(logging.DEBUG, 'Processing upload with the domain: {}'.format(domain))
+            try:
+                pfn = self._upload_item(rse_settings=rse_settings,
+                                        rse_attributes=rse_attributes,
+                                        lfn=lfn,
+                                        source_dir=file['dirname'],
+                                        domain=domain,
+                                        impl=impl,
+                                        force_scheme=cur_scheme,
+                                        force_pfn=pfn,
+                                        transfer_timeout=file.get('transfer_timeout'),
+                                        delete_existing=delete_existing,
+                                        sign_service=sign_service)
+                logger(logging.DEBUG, 'Upload done.')
+                success = True
+                file['upload_result'] = {0: True, 1: None, 'success': True, 'pfn': pfn}  # TODO: needs to be removed
+            except (ServiceUnavailable,
+                    ResourceTemporaryUnavailable,
+                    RSEOperationNotSupported,
+                    RucioException) as error:
+                logger(logging.WARNING, 'Upload attempt failed')
+                logger(logging.INFO, 'Exception: %s' % str(error), exc_info=True)
+                state_reason = str(error)
+
+        if success:
+            trace['transferEnd'] = time.time()
+            trace['clientState'] = 'DONE'
+            file['state'] = 'A'
+            logger(logging.INFO, 'Successfully uploaded file %s' % basename)
+            self._send_trace(cast("TraceDict", trace))
+
+            if not no_register:
+                if register_after_upload:
+                    self._register_files([file],
+                                         registered_dataset_dids,
+                                         ignore_availability=ignore_availability,
+                                         activity=activity)
+                # the replica state and the dataset attachment are registered in bulk
+                registrations.add(file,
+                                  replica=None if register_after_upload else self._convert_file_for_api(file),
+                                  attach=bool(dataset_did_str))
+        else:
+            trace['clientState'] = 'FAILED'
+            trace['stateReason'] = state_reason
+            self._send_trace(cast('TraceDict', trace))
+            logger(logging.ERROR, 'Failed to upload file %s' % basename)
+        return success
+
     def _add_bittorrent_meta(
             self,
             file: "Mapping[str, Any]"
@@ -649,59 +813,49 @@ class UploadClient:
         self.client.set_metadata_bulk(scope=file['did_scope'], name=file['did_name'], meta=bittorrent_meta)
         self.logger(logging.INFO, f"Added BitTorrent metadata to file DID {file['did_scope']}:{file['did_name']}")
 
-    def _register_file(
+    def _registers_before_upload(
+            self,
+            file: "Mapping[str, Any]"
+    ) -> bool:
+        """
+        Returns whether the file is registered in Rucio before its upload.
+
+        Files with a PFN on a deterministic RSE are not registered, and files without
+        a PFN on a non-deterministic RSE are not uploaded.
+        """
+        if file.get('no_register') or file.get('register_after_upload'):
+            return False
+        return bool(file.get('pfn')) != self.rses[file['rse']].get('deterministic', True)
+
+    def _register_dataset(
             self,
             file: "Mapping[str, Any]",
-            registered_dataset_dids: set[str],
-            ignore_availability: bool = False,
-            activity: Optional[str] = None
+            registered_dataset_dids: set[str]
     ) -> None:
         """
-        Register a single file DID in Rucio, optionally creating its parent dataset if needed.
-
-        Ensures that a file is known in the Rucio catalog under the specified scope. If a
-        dataset is specified in `file` and it does not yet exist, the method creates it and
-        attaches the file to that dataset, applying replication rules as appropriate. If no
-        dataset is provided and the file DID does not yet exist in Rucio, the method creates
-        a replication rule for the newly added file. If the file DID already exists, no new
-        top-level rule is created (the file’s existing rules or attachments remain unchanged).
-        Checksums are compared to prevent conflicts if the file is already registered.
+        Create the parent dataset of a file, if it was not registered yet during this upload.
 
         Parameters
         ----------
         file
-            A dictionary containing file information (e.g., 'did_scope', 'did_name', 'adler32', etc.).
+            A dictionary containing file information (e.g., 'dataset_scope', 'dataset_name', 'rse', etc.).
         registered_dataset_dids
             A set of dataset DIDs already registered to avoid duplicates.
-        ignore_availability
-            If True, creates replication rules even when the RSE is marked unavailable.
-        activity
-            Specifies the transfer activity (e.g., 'User Subscriptions') for the replication rule.
 
         Raises
         ------
         InputValidationError
             If a dataset already exists, but the caller attempts to set a new lifetime for it.
-        DataIdentifierAlreadyExists
-            If the local checksum differs from the remote checksum.
         """
         logger = self.logger
-        logger(logging.DEBUG, 'Registering file')
-
-        # verification whether the scope exists
-        account_scopes = []
-        try:
-            account_scopes = self.client.list_scopes_for_account(self.client.account)
-        except ScopeNotFound:
-            pass
-        if account_scopes and file['did_scope'] not in account_scopes:
-            logger(logging.WARNING,
-                   'Scope {} not found for the account {}.'.format(file['did_scope'], self.client.account))
-
-        rse = file['rse']
         dataset_did_str = file.get('dataset_did_str')
-        # register a dataset if we need to
-        if dataset_did_str and dataset_did_str not in registered_dataset_dids:
+        if not dataset_did_str:
+            logger(logging.DEBUG, 'Skipping dataset registration')
+            return
+
+        with self._registration_lock:
+            if dataset_did_str in registered_dataset_dids:
+                return
             registered_dataset_dids.add(dataset_did_str)
             try:
                 logger(logging.DEBUG, 'Trying to create dataset: %s' % dataset_did_str)
@@ -710,7 +864,7 @@ class UploadClient:
                                         meta=file.get('dataset_meta'),
                                         rules=[{'account': self.client.account,
                                                 'copies': 1,
-                                                'rse_expression': rse,
+                                                'rse_expression': file['rse'],
                                                 'grouping': 'DATASET',
                                                 'lifetime': file.get('lifetime')}])
                 logger(logging.INFO, 'Successfully created dataset %s' % dataset_did_str)
@@ -719,44 +873,107 @@ class UploadClient:
                 if file.get('lifetime') is not None:
                     raise InputValidationError(
                         'Dataset %s exists and lifetime %s given. Prohibited to modify parent dataset lifetime.' % (dataset_did_str, file.get('lifetime')))
-        else:
-            logger(logging.DEBUG, 'Skipping dataset registration')
 
-        file_scope = file['did_scope']
-        file_name = file['did_name']
-        file_did = {'scope': file_scope, 'name': file_name}
-        replica_for_api = self._convert_file_for_api(file)
+    def _register_files(
+            self,
+            files: list["Mapping[str, Any]"],
+            registered_dataset_dids: set[str],
+            ignore_availability: bool = False,
+            activity: Optional[str] = None
+    ) -> None:
+        """
+        Register file DIDs in Rucio, optionally creating their parent datasets if needed.
+
+        Ensures that the files are known in the Rucio catalog under the specified scopes. If a
+        dataset is specified for a file and it does not yet exist, the method creates it. If no
+        dataset is provided and the file DID does not yet exist in Rucio, the method creates
+        a replication rule for the newly added file. If the file DID already exists, no new
+        top-level rule is created (the file’s existing rules or attachments remain unchanged).
+        Checksums are compared to prevent conflicts if a file is already registered.
+
+        The existing DIDs and their replicas are looked up for all the files at once, and the
+        replicas are added with one call per RSE.
+
+        Parameters
+        ----------
+        files
+            Dictionaries containing file information (e.g., 'did_scope', 'did_name', 'adler32', etc.).
+        registered_dataset_dids
+            A set of dataset DIDs already registered to avoid duplicates.
+        ignore_availability
+            If True, creates replication rules even when the RSE is marked unavailable.
+        activity
+            Specifies the transfer activity (e.g., 'User Subscriptions') for the replication rule.
+
+        Raises
+        ------
+        InputValidationError
+            If a dataset already exists, but the caller attempts to set a new lifetime for it.
+        DataIdentifierAlreadyExists
+            If the local checksum of a file differs from the remote checksum.
+        """
+        if not files:
+            return
+        logger = self.logger
+        logger(logging.DEBUG, 'Registering %d files' % len(files))
+
+        # verification whether the scopes exist
+        account_scopes = []
         try:
+            account_scopes = self.client.list_scopes_for_account(self.client.account)
+        except ScopeNotFound:
+            pass
+        for scope in sorted({file['did_scope'] for file in files}):
+            if account_scopes and scope not in account_scopes:
+                logger(logging.WARNING,
+                       'Scope {} not found for the account {}.'.format(scope, self.client.account))
+
+        # register the datasets if we need to
+        for file in files:
+            self._register_dataset(file, registered_dataset_dids)
+
+        file_dids = [{'scope': file['did_scope'], 'name': file['did_name']} for file in files]
+        existing = {(meta['scope'], meta['name']): meta for meta in self.client.get_metadata_bulk(file_dids)}
+        for file in files:
+            meta = existing.get((file['did_scope'], file['did_name']))
+            if meta is None:
+                continue
             # if the remote checksum is different, this DID must not be used
-            meta = self.client.get_metadata(file_scope, file_name)
-            logger(logging.INFO, 'File DID already exists')
+            logger(logging.INFO, 'File DID %s:%s already exists' % (file['did_scope'], file['did_name']))
             logger(logging.DEBUG, 'local checksum: %s, remote checksum: %s' % (file['adler32'], meta['adler32']))
-
             if str(meta['adler32']).lstrip('0') != str(file['adler32']).lstrip('0'):
                 logger(logging.ERROR,
                        'Local checksum %s does not match remote checksum %s' % (file['adler32'], meta['adler32']))
                 raise DataIdentifierAlreadyExists
 
-            # add the file to rse if it is not registered yet
-            replicastate = list(self.client.list_replicas([file_did], all_states=True))
-            if rse not in replicastate[0]['rses']:
-                self.client.add_replicas(rse=rse, files=[replica_for_api])
-                logger(logging.INFO, 'Successfully added replica in Rucio catalogue at %s' % rse)
-        except DataIdentifierNotFound:
-            logger(logging.DEBUG, 'File DID does not exist')
-            self.client.add_replicas(rse=rse, files=[replica_for_api])
+        # add the existing files to their RSE if they are not registered there yet
+        replica_rses = {}
+        if existing:
+            for replica in self.client.list_replicas([{'scope': scope, 'name': name} for scope, name in existing], all_states=True):
+                replica_rses[(replica['scope'], replica['name'])] = replica['rses']
+        new_files = [file for file in files if (file['did_scope'], file['did_name']) not in existing]
+        replicas_per_rse = {}
+        for file in files:
+            did = (file['did_scope'], file['did_name'])
+            if did not in existing or file['rse'] not in replica_rses.get(did, {}):
+                replicas_per_rse.setdefault(file['rse'], []).append(self._convert_file_for_api(file))
+        for rse, replicas in replicas_per_rse.items():
+            self.client.add_replicas(rse=rse, files=replicas)
+            logger(logging.INFO, 'Successfully added %d replicas in Rucio catalogue at %s' % (len(replicas), rse))
+
+        for file in new_files:
+            file_did = {'scope': file['did_scope'], 'name': file['did_name']}
             if config_get_bool('client', 'register_bittorrent_meta', default=False):
                 self._add_bittorrent_meta(file=file)
-            logger(logging.INFO, 'Successfully added replica in Rucio catalogue at %s' % rse)
-            if not dataset_did_str:
+            if not file.get('dataset_did_str'):
                 # only need to add rules for files if no dataset is given
                 self.client.add_replication_rule([file_did],
                                                  copies=1,
-                                                 rse_expression=rse,
+                                                 rse_expression=file['rse'],
                                                  lifetime=file.get('lifetime'),
                                                  ignore_availability=ignore_availability,
                                                  activity=activity)
-                logger(logging.INFO, 'Successfully added replication rule at %s' % rse)
+                logger(logging.INFO, 'Successfully added replication rule at %s' % file['rse'])
 
     def _get_file_guid(
             self,
@@ -816,7 +1033,8 @@ class UploadClient:
     def _collect_file_info(
             self,
             filepath: "PathTypeAlias",
-            item: "FileToUploadDict"
+            item: "FileToUploadDict",
+            checksums: Optional[dict[str, str]] = None
     ) -> "FileToUploadWithCollectedInfoDict":
         """
         Collects and returns essential file descriptors (e.g., size, checksums, GUID, etc.).
@@ -832,6 +1050,8 @@ class UploadClient:
         item
             A dictionary containing initial upload parameters (e.g., RSE name, scope) for the
             file. Some of its fields may be updated or augmented in the returned dictionary.
+        checksums
+            The Adler-32 and MD5 checksums of the file, if they were already computed.
 
         Returns
         -------
@@ -845,8 +1065,9 @@ class UploadClient:
         new_item['basename'] = os.path.basename(filepath)
 
         new_item['bytes'] = os.stat(filepath).st_size
-        new_item['adler32'] = adler32(filepath)
-        new_item['md5'] = md5(filepath)
+        checksums = checksums or calculate_checksums(filepath, ['adler32', 'md5'])
+        new_item['adler32'] = checksums['adler32']
+        new_item['md5'] = checksums['md5']
         new_item['meta'] = {'guid': self._get_file_guid(new_item)}
         new_item['state'] = 'C'
         if not new_item.get('did_scope'):
@@ -904,6 +1125,7 @@ class UploadClient:
         """
         logger = self.logger
         files: list["FileToUploadWithCollectedInfoDict"] = []
+        file_paths: list[tuple["PathTypeAlias", "FileToUploadDict"]] = []
         for item in items:
             path = item.get('path')
             pfn = item.get('pfn')
@@ -927,8 +1149,7 @@ class UploadClient:
             if os.path.isdir(path) and not recursive:
                 dname, subdirs, fnames = next(os.walk(path))
                 for fname in fnames:
-                    file = self._collect_file_info(os.path.join(dname, fname), item)
-                    files.append(file)
+                    file_paths.append((os.path.join(dname, fname), item))
                 if not len(fnames) and not len(subdirs):
                     logger(logging.WARNING, 'Skipping %s because it is empty.' % dname)
                 elif not len(fnames):
@@ -937,13 +1158,16 @@ class UploadClient:
             elif os.path.isdir(path) and recursive:
                 files.extend(cast("list[FileToUploadWithCollectedInfoDict]", self._collect_files_recursive(item)))
             elif os.path.isfile(path) and not recursive:
-                file = self._collect_file_info(path, item)
-                files.append(file)
+                file_paths.append((path, item))
             elif os.path.isfile(path) and recursive:
                 logger(logging.WARNING, 'Skipping %s because of --recursive flag' % path)
             else:
                 logger(logging.WARNING, 'No such file or directory: %s' % path)
 
+        # the checksums of all the files are computed concurrently
+        checksums = checksum_files([file_path for file_path, _ in file_paths], ['adler32', 'md5'])
+        files.extend(self._collect_file_info(file_path, item, checksums[file_path]) for file_path, item in file_paths)
+
         if not len(files):
             raise InputValidationError('No valid input files given')
 
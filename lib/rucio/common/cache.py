@@ -12,11 +12,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import TYPE_CHECKING, Optional
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import TYPE_CHECKING, Any, NamedTuple, Optional
 
 from dogpile.cache.region import CacheRegion
 
 from rucio.common.config import config_get, is_client
+from rucio.common.utils import APIEncoder, parse_response
 
 if TYPE_CHECKING:
     from collections.abc import Callable
@@ -108,3 +114,76 @@ class CacheKey:
     @staticmethod
     def value(section: str, option: str) -> str:
         return CacheKey._generate_key('get', section, option)
+
+
+class FileCacheEntry(NamedTuple):
+    value: Any
+    etag: Optional[str]
+    created_at: float
+
+
+class FileCache:
+    """
+    Persistent cache of JSON serializable values, stored as one file per key in a directory.
+
+    It keeps values across processes, for example the RSE info of short-lived clients.
+    The values are encoded like the responses of the server, datetimes included.
+    Each file is written to a temporary file and renamed over the previous one, so that
+    concurrent processes read either the old or the new entry. Files not owned by the
+    current user are ignored, as they could redirect the transfers of the user.
+    """
+
+    def __init__(self, directory: str, expiration_time: int):
+        """
+        :param directory: The directory of the cache files, created on the first write.
+        :param expiration_time: The seconds after which an entry must be validated again.
+        """
+        self.directory = directory
+        self.expiration_time = expiration_time
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest())
+
+    def get(self, key: str) -> Optional[FileCacheEntry]:
+        """
+        Returns the entry of a key, expired or not.
+
+        :param key: The key of the entry.
+        :returns: The entry, or None if there is none or it cannot be read.
+        """
+        try:
+            with open(self._path(key), 'rb') as f:
+                if os.fstat(f.fileno()).st_uid != os.getuid():
+                    return None
+                entry = parse_response(f.read())
+            return FileCacheEntry(entry['value'], entry['etag'], float(entry['created_at']))
+        except Exception:
+            return None
+
+    def set(self, key: str, value: Any, etag: Optional[str] = None) -> None:
+        """
+        Stores the entry of a key, created now. Errors are ignored, the value is then not cached.
+
+        :param key: The key of the entry.
+        :param value: The value to cache.
+        :param etag: The version of the value given by the server, to validate the entry once expired.
+        """
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp_')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(FileCacheEntry(value, etag, time.time())._asdict(), f, cls=APIEncoder)
+                os.replace(tmp_path, self._path(key))
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except Exception:
+            pass
+
+    def is_expired(self, entry: FileCacheEntry) -> bool:
+        """
+        :param entry: An entry returned by get.
+        :returns: True if the entry is older than the expiration time.
+        """
+        return time.time() - entry.created_at > self.expiration_time
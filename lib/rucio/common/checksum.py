@@ -12,16 +12,18 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import hashlib
-import io
 import mmap
 import zlib
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from rucio.common.bittorrent import merkle_sha256
 from rucio.common.exception import ChecksumCalculationError
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
+
     from _typeshed import FileDescriptorOrPath
 
 # GLOBALLY_SUPPORTED_CHECKSUMS = ['adler32', 'md5', 'sha256', 'crc32']
@@ -54,15 +56,6 @@ def set_preferred_checksum(checksum_name: str) -> None:
         PREFERRED_CHECKSUM = checksum_name
 
 
-def _iter_blocks(fobj):
-    """Iterate over blocks in a binary file-like object.
-
-    Uses blocks of size ``io.DEFAULT_BUFFER_SIZE * 8``.
-    """
-    block_size = io.DEFAULT_BUFFER_SIZE * 8
-    return iter(partial(fobj.read, block_size), b'')
-
-
 def adler32(file: "FileDescriptorOrPath") -> str:
     """
     An Adler-32 checksum is obtained by calculating two 16-bit checksums A and B
@@ -72,39 +65,7 @@ def adler32(file: "FileDescriptorOrPath") -> str:
     :param file: file name
     :returns: Hexified string, padded to 8 values.
     """
-
-    # adler starting value is _not_ 0
-    adler = 1
-
-    can_mmap = False
-    # try:
-    #    with open(file, 'r+b') as f:
-    #        can_mmap = True
-    # except:
-    #    pass
-
-    try:
-        # use mmap if possible
-        if can_mmap:
-            with open(file, 'r+b') as f:
-                m = mmap.mmap(f.fileno(), 0)
-                # partial block reads at slightly increased buffer sizes
-                for block in _iter_blocks(m):
-                    adler = zlib.adler32(block, adler)
-        else:
-            with open(file, 'rb') as f:
-                # partial block reads at slightly increased buffer sizes
-                for block in _iter_blocks(f):
-                    adler = zlib.adler32(block, adler)
-
-    except Exception as e:
-        raise ChecksumCalculationError('adler32', str(file), e)
-
-    # backflip on 32bit -- can be removed once everything is fully migrated to 64bit
-    if adler < 0:
-        adler = adler + 2 ** 32
-
-    return str('%08x' % adler)
+    return calculate_checksums(file, ['adler32'])['adler32']
 
 
 def md5(file: "FileDescriptorOrPath") -> str:
@@ -114,15 +75,7 @@ def md5(file: "FileDescriptorOrPath") -> str:
     :param file: file name
     :returns: string of 32 hexadecimal digits
     """
-    hash_md5 = hashlib.md5()
-    try:
-        with open(file, "rb") as f:
-            for block in _iter_blocks(f):
-                hash_md5.update(block)
-    except Exception as e:
-        raise ChecksumCalculationError('md5', str(file), e)
-
-    return hash_md5.hexdigest()
+    return calculate_checksums(file, ['md5'])['md5']
 
 
 def sha256(file: "FileDescriptorOrPath") -> str:
@@ -132,14 +85,7 @@ def sha256(file: "FileDescriptorOrPath") -> str:
     :param file: file name
     :returns: string of 32 hexadecimal digits
     """
-    checksum = hashlib.sha256()
-    try:
-        with open(file, "rb") as f:
-            for block in _iter_blocks(f):
-                checksum.update(block)
-    except Exception as e:
-        raise ChecksumCalculationError('sha256', str(file), e)
-    return checksum.hexdigest()
+    return calculate_checksums(file, ['sha256'])['sha256']
 
 
 def crc32(file: "FileDescriptorOrPath") -> str:
@@ -149,14 +95,119 @@ def crc32(file: "FileDescriptorOrPath") -> str:
     :param file: file name
     :returns: string of 32 hexadecimal digits
     """
-    prev = 0
+    return calculate_checksums(file, ['crc32'])['crc32']
+
+
+STREAMING_CHECKSUMS = ['adler32', 'md5', 'sha256', 'crc32']
+# a multiple of the page size, large enough for the checksums to release the GIL
+CHECKSUM_BLOCK_SIZE = 4 * 1024 * 1024
+
+
+class ChecksumCalculator:
+    """
+    Computes several checksums of a stream of bytes in one pass.
+
+    The bytes are fed with update, for example by a protocol while it transfers a file.
+    The digests have the format of the functions of CHECKSUM_ALGO_DICT.
+    """
+
+    def __init__(self, algorithms: "Iterable[str]"):
+        """
+        :param algorithms: The names of the checksums to compute, among STREAMING_CHECKSUMS.
+        :raises ValueError: if an algorithm cannot be computed on a stream.
+        """
+        self.algorithms = list(dict.fromkeys(algorithms))
+        unsupported = [algorithm for algorithm in self.algorithms if algorithm not in STREAMING_CHECKSUMS]
+        if unsupported:
+            raise ValueError('Checksums %s cannot be computed on a stream' % ', '.join(unsupported))
+        self.bytes = 0
+        self._adler32 = 1 if 'adler32' in self.algorithms else None
+        self._crc32 = 0 if 'crc32' in self.algorithms else None
+        self._hashes = [(algorithm, hashlib.new(algorithm)) for algorithm in self.algorithms if algorithm in ('md5', 'sha256')]
+
+    def update(self, data: bytes) -> None:
+        """
+        Adds a block of bytes to all the checksums.
+
+        :param data: The next block of the stream.
+        """
+        self.bytes += len(data)
+        if self._adler32 is not None:
+            self._adler32 = zlib.adler32(data, self._adler32)
+        if self._crc32 is not None:
+            self._crc32 = zlib.crc32(data, self._crc32)
+        for _, hash_ in self._hashes:
+            hash_.update(data)
+
+    def hexdigests(self) -> dict[str, str]:
+        """
+        :returns: A dictionary with the hexadecimal digest of each checksum.
+        """
+        digests = {}
+        if self._adler32 is not None:
+            digests['adler32'] = '%08x' % (self._adler32 & 0xFFFFFFFF)
+        if self._crc32 is not None:
+            digests['crc32'] = '%X' % (self._crc32 & 0xFFFFFFFF)
+        for algorithm, hash_ in self._hashes:
+            digests[algorithm] = hash_.hexdigest()
+        return digests
+
+
+def calculate_checksums(file: "FileDescriptorOrPath", algorithms: "Iterable[str]") -> dict[str, str]:
+    """
+    Computes several checksums of a file with a single read of it.
+
+    The file is mapped read-only in memory and fed to the checksums by blocks of
+    CHECKSUM_BLOCK_SIZE. Files which cannot be mapped, like empty files or pipes,
+    are read by blocks of the same size.
+
+    :param file: file name
+    :param algorithms: The names of the checksums to compute, among STREAMING_CHECKSUMS.
+    :returns: A dictionary with the hexadecimal digest of each checksum.
+    """
+    calculator = ChecksumCalculator(algorithms)
     try:
-        with open(file, "rb") as f:
-            for block in _iter_blocks(f):
-                prev = zlib.crc32(block, prev)
+        with open(file, 'rb') as f:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                mapped = None
+            if mapped is not None:
+                with mapped, memoryview(mapped) as view:
+                    for offset in range(0, len(view), CHECKSUM_BLOCK_SIZE):
+                        calculator.update(view[offset:offset + CHECKSUM_BLOCK_SIZE])
+            else:
+                for block in iter(partial(f.read, CHECKSUM_BLOCK_SIZE), b''):
+                    calculator.update(block)
     except Exception as e:
-        raise ChecksumCalculationError('crc32', str(file), e)
-    return "%X" % (prev & 0xFFFFFFFF)
+        raise ChecksumCalculationError(', '.join(calculator.algorithms), str(file), e)
+    return calculator.hexdigests()
+
+
+def checksum_files(
+        paths: "Iterable[str]",
+        algorithms: "Iterable[str]",
+        max_workers: Optional[int] = None
+) -> dict[str, dict[str, str]]:
+    """
+    Computes several checksums of many files, reading each file once.
+
+    The files are processed concurrently on a thread pool: zlib and hashlib release
+    the GIL while they process the blocks.
+
+    :param paths: The paths of the files.
+    :param algorithms: The names of the checksums to compute, among STREAMING_CHECKSUMS.
+    :param max_workers: The maximum number of threads, by default the one of ThreadPoolExecutor.
+    :returns: A dictionary with, for each path, the dictionary of the hexadecimal digests.
+    :raises ChecksumCalculationError: if the checksums of a file cannot be computed.
+    """
+    paths = list(dict.fromkeys(paths))
+    algorithms = list(algorithms)
+    if len(paths) < 2 or max_workers == 1:
+        return {path: calculate_checksums(path, algorithms) for path in paths}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(paths, executor.map(partial(calculate_checksums, algorithms=algorithms), paths)))
 
 
 CHECKSUM_ALGO_DICT = {
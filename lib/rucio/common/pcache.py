@@ -19,6 +19,7 @@ import getopt
 import os
 import re
 import signal
+import sqlite3
 import subprocess
 import sys
 import time
@@ -44,6 +45,9 @@ DEBUG, INFO, WARN, ERROR = "DEBUG", "INFO ", "WARN ", "ERROR"
 # filename for locking
 LOCK_NAME = ".LOCK"
 
+# filename of the metadata index, in the pcache dir
+INDEX_NAME = "index.sqlite"
+
 MAXFD = 1024
 
 # Session ID
@@ -125,12 +129,91 @@ def unitize(x: int) -> str:
 
     suff = 'BKMGTPEZY'
 
-    while ((x >= 1024) and suff):
-        y = x / 1024.0
+    y = float(x)
+    while ((y >= 1024) and (len(suff) > 1)):
+        y = y / 1024.0
         suff = suff[1:]
     return "%.4g%s" % (y, suff[0])
 
 
+class PcacheIndex:
+    """
+    Catalog of the cached files in an SQLite database, in WAL mode so that
+    concurrent pcache processes read while one of them writes.
+
+    One entry per cache directory records the size of its data file, the time
+    it was last used and the number of times it was linked from the cache, so
+    that the cache size and the least recently used entries are indexed queries
+    instead of walks of the CACHE and MRU trees.
+    """
+
+    def __init__(self, path: str, timeout: float = 60):
+        self.path = path
+        self.created = not os.path.exists(path)
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        if self.created:
+            # Shared by the users of the cache, like the cached files and the stats files
+            try:
+                os.chmod(path, 0o666)  # noqa: S103
+            except OSError:
+                pass
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS entries ("
+                          "path TEXT PRIMARY KEY, "
+                          "size INTEGER NOT NULL DEFAULT 0, "
+                          "atime REAL NOT NULL, "
+                          "refcount INTEGER NOT NULL DEFAULT 0)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS entries_atime_idx ON entries (atime)")
+
+    def touch(self, path: str, size: int) -> None:
+        # Record a use of the entry, creating it if needed
+        self.conn.execute("INSERT INTO entries (path, size, atime, refcount) VALUES (?, ?, ?, 1) "
+                          "ON CONFLICT (path) DO UPDATE SET size = excluded.size, atime = excluded.atime, refcount = refcount + 1",
+                          (path, size, time.time()))
+
+    def remove(self, path: str) -> None:
+        self.conn.execute("DELETE FROM entries WHERE path = ?", (path,))
+
+    def clear(self) -> None:
+        self.conn.execute("DELETE FROM entries")
+
+    def total_size(self) -> int:
+        return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def least_recently_used(self, limit: int) -> list[str]:
+        return [row[0] for row in self.conn.execute("SELECT path FROM entries ORDER BY atime LIMIT ?", (limit,))]
+
+    def reconcile(self, pcache_dir: str) -> int:
+        # Make the entries match the data files of the CACHE tree, return the cache size
+        cache_dir = os.path.normpath(os.path.join(pcache_dir, "CACHE"))
+        found = {}
+        for root, dirs, files in os.walk(cache_dir):
+            if "data" in files:
+                try:
+                    st = os.stat(os.path.join(root, "data"))
+                except OSError:
+                    continue
+                found[os.path.join(root, "")] = (st.st_size, max(st.st_atime, st.st_mtime))
+
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            indexed = {row[0] for row in self.conn.execute("SELECT path FROM entries")}
+            self.conn.executemany("DELETE FROM entries WHERE path = ?", ((path,) for path in indexed - found.keys()))
+            # Keep the access time of the known entries, which is more accurate than the one of the file system
+            self.conn.executemany("INSERT INTO entries (path, size, atime, refcount) VALUES (?, ?, ?, 0) "
+                                  "ON CONFLICT (path) DO UPDATE SET size = excluded.size",
+                                  ((path, size, atime) for path, (size, atime) in found.items()))
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return sum(size for size, _ in found.values())
+
+    def close(self) -> None:
+        self.conn.close()
+
+
 class Pcache:
 
     def usage(self) -> None:
@@ -188,6 +271,8 @@ class Pcache:
         self.panda_url = "https://pandaserver.cern.ch:25443/server/panda/"
         self.local_src = None
         self.skip_download = False
+        self.use_index = True
+        self.reconcile = False
 
         # internal variables
         self.sleep_interval = 15
@@ -195,6 +280,8 @@ class Pcache:
         self.locks = {}
         self.deleted_guids = []
         self.version = pcacheversion
+        self.index = None
+        self.index_pid = None
 
     def parse_args(self, args: list[str]) -> None:
         # handle pcache flags and leave the rest in self.args
@@ -223,7 +310,9 @@ class Pcache:
                                         "panda",
                                         "hostname",
                                         "sitename",
-                                        "local-src"])
+                                        "local-src",
+                                        "no-index",
+                                        "reconcile"])
 
             # XXXX cache, stats, reset, clean, delete, inventory
             # TODO: move checksum/size validation from lsm to pcache
@@ -293,6 +382,10 @@ class Pcache:
             elif opt in ("-X", "--skip-download"):
                 if str(arg) in ('True', 'true') or arg:
                     self.skip_download = True
+            elif opt == "--no-index":
+                self.use_index = False
+            elif opt == "--reconcile":
+                self.reconcile = True
 
         # Treatment of limits on pcache size
         self._convert_max_space()
@@ -515,6 +608,14 @@ class Pcache:
                 self.flush_cache()
                 sys.exit(0)
 
+        # Are we reconciling the index with the cache
+        if (self.reconcile):
+            size = self.do_cache_inventory()
+            if size is None:
+                sys.exit(1)
+            if (len(self.args) < 1) and not self.clean:
+                sys.exit(0)
+
         # Are we cleaning the cache
         if (self.clean):
             # size = self.do_cache_inventory()
@@ -601,13 +702,21 @@ class Pcache:
 
     def finish(self, local_src: Optional[str] = None) -> None:
         cache_file = self.pcache_dst_dir + "data"
-        self.update_mru()
+        if self.get_index() is None:
+            self.update_mru()
         if self.local_src:
             if (self.make_hard_link(self.local_src, cache_file)):
                 self.fail(102)
         else:
             if (self.make_hard_link(cache_file, self.dst)):
                 self.fail(102)
+        if self.get_index() is not None:
+            try:
+                size = os.stat(cache_file).st_size
+            except OSError as e:
+                self.log(ERROR, "stat(%s): %s", cache_file, e)
+            else:
+                self.index_call("touch", self.pcache_dst_dir, size)
 
     def pcache_copy_in(self) -> tuple[int, Optional[int]]:
 
@@ -735,6 +844,34 @@ class Pcache:
                      unitize(cache_size),
                      self.get_disk_usage())
 
+        if self.get_index() is not None:
+            self.clean_cache_by_index()
+        else:
+            self.clean_cache_by_mru()
+
+        self.log(INFO, "cleanup complete, cache size=%s, usage=%s%%, time=%.2f secs",
+                 self.get_cache_size(),
+                 self.get_disk_usage(),
+                 time.time() - t0)
+
+    def clean_cache_by_index(self) -> None:
+        # Evict the least recently used entries of the index, by batches
+        while True:
+            entries = self.index_call("least_recently_used", 100)
+            if not entries:
+                break
+            for d in entries:
+                self.log(DEBUG, "deleting %s", d)
+                if os.path.exists(d):
+                    self.empty_dir(d)
+                else:
+                    self.log(WARN, "Attempt to delete missing file %s", d)
+                # empty_dir removes the entry, unless there was a problem
+                self.index_call("remove", d)
+                if not self.over_limit(self.hysterisis):
+                    return
+
+    def clean_cache_by_mru(self) -> None:
         for link in self.list_by_mru():
             try:
                 d = os.readlink(link)
@@ -766,11 +903,6 @@ class Pcache:
             if not self.over_limit(self.hysterisis):
                 break
 
-        self.log(INFO, "cleanup complete, cache size=%s, usage=%s%%, time=%.2f secs",
-                 self.get_cache_size(),
-                 self.get_disk_usage(),
-                 time.time() - t0)
-
     def list_by_mru(self) -> "Iterator[str]":
         mru_dir = self.pcache_dir + "MRU/"
         for root, dirs, files in os.walk(mru_dir):
@@ -792,6 +924,7 @@ class Pcache:
         if self.update_panda:
             self.panda_flush_cache()
         self.reset_stats()
+        self.index_call("clear")
         ts = '.' + str(time.time())
         for d in "CACHE", "MRU":
             d = self.pcache_dir + d
@@ -986,6 +1119,11 @@ class Pcache:
         return self.update_stat_file("CACHE", "size", bytes_)
 
     def get_cache_size(self) -> Optional[int]:
+        if self.get_index() is not None:
+            size = self.index_call("total_size")
+            if size is not None:
+                return size
+
         filename = os.path.join(self.pcache_dir, "CACHE", "size")
         size = 0
 
@@ -1018,14 +1156,20 @@ class Pcache:
 
         self.log(INFO, "starting inventory")
 
-        for root, dirs, files in os.walk(self.pcache_dir):
-            for f in files:
-                if f == "data":
-                    fullname = os.path.join(root, f)
-                    try:
-                        size += os.stat(fullname).st_size
-                    except OSError as e:
-                        self.log(ERROR, "stat(%s): %s", fullname, e)
+        indexed_size = None
+        if self.get_index() is not None:
+            indexed_size = self.index_call("reconcile", self.pcache_dir)
+        if indexed_size is not None:
+            size = indexed_size
+        else:
+            for root, dirs, files in os.walk(self.pcache_dir):
+                for f in files:
+                    if f == "data":
+                        fullname = os.path.join(root, f)
+                        try:
+                            size += os.stat(fullname).st_size
+                        except OSError as e:
+                            self.log(ERROR, "stat(%s): %s", fullname, e)
 
         filename = os.path.join(self.pcache_dir, "CACHE", "size")
 
@@ -1128,6 +1272,39 @@ class Pcache:
                                 "node": self.hostname,
                                 "guids": ','.join(guids)})
 
+    # Index functions
+    def get_index(self) -> Optional[PcacheIndex]:
+        # The connection is opened per process, the cleaner is a forked process
+        if not self.use_index:
+            return None
+        if self.index is None or self.index_pid != os.getpid():
+            if (self.mkdir_p(self.pcache_dir)):
+                self.use_index = False
+                return None
+            try:
+                self.index = PcacheIndex(os.path.join(self.pcache_dir, INDEX_NAME))
+                self.index_pid = os.getpid()
+            except sqlite3.Error as e:
+                self.log(WARN, "cannot open the index, using the file system: %s", e)
+                self.use_index = False
+                return None
+            # A new index of an existing cache, e.g. filled by an older pcache
+            if self.index.created and os.path.isdir(os.path.join(self.pcache_dir, "CACHE")):
+                self.index_call("reconcile", self.pcache_dir)
+        return self.index
+
+    def index_call(self, method: str, *args) -> Any:
+        # Call a method of the index, falling back to the file system if it fails
+        index = self.get_index()
+        if index is None:
+            return None
+        try:
+            return getattr(index, method)(*args)
+        except sqlite3.Error as e:
+            self.log(WARN, "index %s failed, using the file system: %s", method, e)
+            self.use_index = False
+            return None
+
     # Locking functions
     def lock_dir(self, d: str, create: bool = True, blocking: bool = True) -> Optional[int]:
         lock_name = os.path.join(d, LOCK_NAME)
@@ -1309,6 +1486,7 @@ class Pcache:
                 if e.errno != errno.ENOENT:
                     self.log(WARN, "empty_dir2: %s", e)
                 # self.fail()
+        self.index_call("remove", os.path.join(d, ""))
         self.update_cache_size(-bytes_deleted)
         self.delete_parents_recursive(d)
         return status
@@ -54,6 +54,10 @@ class StompConnectionManager:
 
         self._connections = {}
 
+    @property
+    def connections(self) -> list[Connection]:
+        return list(self._connections.values())
+
     def is_stalled(self, connection: Connection, *, logger: "LoggerFunction" = logging.log):
         if not connection.is_connected():
             return True
@@ -135,7 +139,7 @@ class StompConnectionManager:
             conn = self._connections.pop(remote)
             if conn.is_connected():
                 conn.disconnect()
-            deleted_conns.append(to_delete)
+            deleted_conns.append(conn)
 
         created_conns = []
         for remote in to_create:
@@ -42,7 +42,6 @@ from urllib.parse import parse_qsl, quote, urlencode, urlparse, urlunparse
 from uuid import uuid4 as uuid
 from xml.etree import ElementTree
 
-import requests
 from typing_extensions import ParamSpec
 
 from rucio.common.config import config_get, config_get_bool
@@ -52,13 +51,10 @@ from rucio.common.extra import import_extras
 from rucio.common.plugins import PolicyPackageAlgorithms
 from rucio.common.types import InternalAccount, InternalScope, LFNDict, TraceDict
 
-EXTRA_MODULES = import_extras(['paramiko'])
+EXTRA_MODULES = import_extras(['orjson'])
 
-if EXTRA_MODULES['paramiko']:
-    try:
-        from paramiko import RSAKey
-    except Exception:
-        EXTRA_MODULES['paramiko'] = None
+if EXTRA_MODULES['orjson']:
+    import orjson
 
 if TYPE_CHECKING:
     from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
@@ -302,14 +298,46 @@ def datetime_parser(dct: dict[Any, Any]) -> dict[Any, Any]:
     return dct
 
 
-def parse_response(data: Union[str, bytes, bytearray]) -> Any:
+def _json_loads(data: Union[str, bytes, bytearray]) -> Any:
+    """ Decodes a JSON document with orjson if it is installed, with json otherwise. """
+    if EXTRA_MODULES['orjson']:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # e.g. integers larger than 64 bits, which json supports
+            pass
+    return json.loads(data)
+
+
+def parse_response(
+        data: Union[str, bytes, bytearray],
+        datetime_fields: "Optional[Iterable[str]]" = None
+) -> Any:
     """
     JSON render function
-    """
-    if isinstance(data, (bytes, bytearray)):
-        data = data.decode('utf-8')
 
-    return json.loads(data, object_hook=datetime_parser)
+    :param data: the JSON document.
+    :param datetime_fields: the keys of the top-level object(s) holding dates. If given, only these keys are
+                            converted to datetime, instead of testing every string of the document.
+    """
+    if datetime_fields is None:
+        if isinstance(data, (bytes, bytearray)):
+            data = data.decode('utf-8')
+        return json.loads(data, object_hook=datetime_parser)
+
+    result = _json_loads(data)
+    if datetime_fields:
+        for dct in (result if isinstance(result, list) else [result]):
+            if not isinstance(dct, dict):
+                continue
+            for key in datetime_fields:
+                value = dct.get(key)
+                if isinstance(value, str):
+                    try:
+                        dct[key] = datetime.datetime.strptime(value, DATE_FORMAT)
+                    except ValueError:
+                        pass
+    return result
 
 
 def execute(cmd: str) -> tuple[int, str, str]:
@@ -803,7 +831,10 @@ def ssh_sign(private_key: str, message: str) -> str:
     :return: Base64 encoded signature as a string.
     """
     encoded_message = message.encode()
-    if not EXTRA_MODULES['paramiko']:
+    # imported here, paramiko is slow to import and only needed by the ssh authentication
+    try:
+        from paramiko import RSAKey
+    except Exception:
         raise MissingModuleException('The paramiko module is not installed or faulty.')
     sio_private_key = StringIO(private_key)
     priv_k = RSAKey.from_private_key(sio_private_key)
@@ -847,6 +878,7 @@ def send_trace(trace: TraceDict, trace_endpoint: str, user_agent: str, retries:
     """
     if user_agent.startswith('pilot'):
         return 0
+    import requests
     for dummy in range(retries):
         try:
             requests.post(trace_endpoint + '/traces/', verify=False, data=json.dumps(trace))
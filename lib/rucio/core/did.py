@@ -22,7 +22,7 @@ from typing import TYPE_CHECKING, Any, Literal, Optional, Union
 from sqlalchemy import and_, delete, exists, insert, or_, update
 from sqlalchemy.exc import DatabaseError, IntegrityError, NoResultFound
 from sqlalchemy.sql import func, not_
-from sqlalchemy.sql.expression import bindparam, case, false, null, select, true
+from sqlalchemy.sql.expression import case, false, null, select, true
 
 import rucio.core.replica  # import add_replicas
 import rucio.core.rule
@@ -882,6 +882,7 @@ def delete_dids(
 
     # Delete rules on DID
     skip_deletion = False  # Skip deletion in case of expiration of a rule
+    rules_to_delete = {True: set(), False: set()}  # {purge_replicas: {rule_id}}
     with METRICS.timer('delete_dids.rules'):
         stmt = select(
             models.ReplicationRule.id,
@@ -912,25 +913,34 @@ def delete_dids(
                 set_metadata(scope=scope, name=name, key='lifetime', value=3600 * 24, session=session)
                 skip_deletion = True
             else:
-                rucio.core.rule.delete_rule(rule_id=rule_id, purge_replicas=purge_replicas, delete_parent=True, nowait=True, session=session)
+                rules_to_delete[purge_replicas].add(rule_id)
+
+        # The remaining rules of the whole chunk are removed with set-based statements
+        for purge_replicas, rule_ids in rules_to_delete.items():
+            rucio.core.rule.delete_rules(rule_ids=rule_ids, purge_replicas=purge_replicas, delete_parent=True, nowait=True, session=session, logger=logger)
 
     if skip_deletion:
         return
 
     # Detach from parent DIDs:
-    existing_parent_dids = False
+    parent_dids = {}  # {(scope, name): [{'scope': child_scope, 'name': child_name}]}
     with METRICS.timer('delete_dids.parent_content'):
         stmt = select(
-            models.DataIdentifierAssociation
+            models.DataIdentifierAssociation.scope,
+            models.DataIdentifierAssociation.name,
+            models.DataIdentifierAssociation.child_scope,
+            models.DataIdentifierAssociation.child_name
         ).join_from(
             temp_table,
             models.DataIdentifierAssociation,
             and_(models.DataIdentifierAssociation.child_scope == temp_table.scope,
                  models.DataIdentifierAssociation.child_name == temp_table.name)
         )
-        for parent_did in session.execute(stmt).scalars():
-            existing_parent_dids = True
-            detach_dids(scope=parent_did.scope, name=parent_did.name, dids=[{'scope': parent_did.child_scope, 'name': parent_did.child_name}], session=session)
+        for parent_scope, parent_name, child_scope, child_name in session.execute(stmt).all():
+            parent_dids.setdefault((parent_scope, parent_name), []).append({'scope': child_scope, 'name': child_name})
+        for (parent_scope, parent_name), children in parent_dids.items():
+            detach_dids(scope=parent_scope, name=parent_name, dids=children, session=session)
+    existing_parent_dids = bool(parent_dids)
 
     # Remove generic DID metadata
     must_delete_did_meta = True
@@ -1381,23 +1391,46 @@ def set_new_dids(
     """
     if session.bind.dialect.name == 'postgresql':
         new_flag = bool(new_flag)
-    for did in dids:
-        try:
-            stmt = update(
-                models.DataIdentifier
-            ).where(
-                and_(models.DataIdentifier.scope == did['scope'],
-                     models.DataIdentifier.name == did['name'])
-            ).values({
-                models.DataIdentifier.is_new: new_flag
-            }).execution_options(
-                synchronize_session=False
+    unique_dids = {(did['scope'], did['name']) for did in dids}
+    if not unique_dids:
+        return True
+
+    temp_table = temp_table_mngr(session).create_scope_name_table()
+    stmt = insert(
+        temp_table
+    )
+    session.execute(stmt, [{'scope': scope, 'name': name} for scope, name in unique_dids])
+
+    did_exists = exists().where(
+        and_(temp_table.scope == models.DataIdentifier.scope,
+             temp_table.name == models.DataIdentifier.name)
+    )
+    try:
+        stmt = update(
+            models.DataIdentifier
+        ).where(
+            did_exists
+        ).values({
+            models.DataIdentifier.is_new: new_flag
+        }).execution_options(
+            synchronize_session=False
+        )
+        rowcount = session.execute(stmt).rowcount
+    except DatabaseError as error:
+        raise exception.DatabaseException('%s : Cannot update the new flag of %d DIDs' % (error.args[0], len(unique_dids)))
+    if rowcount != len(unique_dids):
+        stmt = select(
+            temp_table.scope,
+            temp_table.name
+        ).where(
+            ~exists().where(
+                and_(models.DataIdentifier.scope == temp_table.scope,
+                     models.DataIdentifier.name == temp_table.name)
             )
-            rowcount = session.execute(stmt).rowcount
-            if not rowcount:
-                raise exception.DataIdentifierNotFound("Data identifier '%s:%s' not found" % (did['scope'], did['name']))
-        except DatabaseError as error:
-            raise exception.DatabaseException('%s : Cannot update %s:%s' % (error.args[0], did['scope'], did['name']))
+        )
+        missing = session.execute(stmt).first()
+        if missing:
+            raise exception.DataIdentifierNotFound("Data identifier '%s:%s' not found" % (missing.scope, missing.name))
     try:
         session.flush()
     except IntegrityError as error:
@@ -1603,26 +1636,42 @@ def list_child_dids_stmt(
 def list_one_did_childs_stmt(
         scope: "InternalScope",
         name: str,
-        did_type: DIDType,
-) -> "Select[tuple[InternalScope, str]]":
+        did_type: Optional[DIDType],
+        associations: bool = False,
+        long: bool = False,
+) -> "Select":
     """
     Returns the sqlalchemy query for recursively fetching the child DIDs of type
     'did_type' for the input did.
 
     did_type defines the desired type of DIDs in the result. If set to DIDType.Dataset,
     will only resolve containers and return datasets. If set to DIDType.File, will
-    also resolve the datasets and return files.
-    """
-    if did_type == DIDType.DATASET:
-        dids_to_resolve = [DIDType.CONTAINER]
-    else:
-        dids_to_resolve = [DIDType.CONTAINER, DIDType.DATASET]
+    also resolve the datasets and return files. If None, the whole tree is returned.
 
-    # Uses a recursive SQL CTE (Common Table Expressions)
-    initial_set = select(
+    By default, the query returns the distinct scope and name of the children. If
+    `associations` is set, it returns every content association of the tree instead, with
+    the columns scope, name, child_scope, child_name, child_type, bytes, adler32, guid and
+    events, plus lumiblocknr of the child if `long` is set.
+    """
+    dids_to_resolve = _did_tree_child_types(did_type)
+    columns = [
+        models.DataIdentifierAssociation.scope,
+        models.DataIdentifierAssociation.name,
         models.DataIdentifierAssociation.child_scope,
         models.DataIdentifierAssociation.child_name,
         models.DataIdentifierAssociation.child_type,
+    ]
+    if associations:
+        columns += [
+            models.DataIdentifierAssociation.bytes,
+            models.DataIdentifierAssociation.adler32,
+            models.DataIdentifierAssociation.guid,
+            models.DataIdentifierAssociation.events,
+        ]
+
+    # Uses a recursive SQL CTE (Common Table Expressions)
+    initial_set = select(
+        *columns
     ).where(
         and_(models.DataIdentifierAssociation.scope == scope,
              models.DataIdentifierAssociation.name == name,
@@ -1633,11 +1682,9 @@ def list_one_did_childs_stmt(
 
     # Oracle doesn't support union() in recursive CTEs, so use UNION ALL
     # and a "distinct" filter later
-    child_datasets_cte = initial_set.union_all(
+    tree_cte = initial_set.union_all(
         select(
-            models.DataIdentifierAssociation.child_scope,
-            models.DataIdentifierAssociation.child_name,
-            models.DataIdentifierAssociation.child_type,
+            *columns
         ).where(
             and_(models.DataIdentifierAssociation.scope == initial_set.c.child_scope,
                  models.DataIdentifierAssociation.name == initial_set.c.child_name,
@@ -1645,16 +1692,128 @@ def list_one_did_childs_stmt(
         )
     )
 
-    stmt = select(
-        child_datasets_cte.c.child_scope.label('scope'),
-        child_datasets_cte.c.child_name.label('name'),
-    ).distinct(
-    ).where(
-        child_datasets_cte.c.child_type == did_type,
-    )
+    if associations:
+        stmt = select(
+            *(tree_cte.c[column.key] for column in columns)
+        )
+        if long:
+            stmt = stmt.add_columns(
+                models.DataIdentifier.lumiblocknr
+            ).join(
+                models.DataIdentifier,
+                and_(models.DataIdentifier.scope == tree_cte.c.child_scope,
+                     models.DataIdentifier.name == tree_cte.c.child_name)
+            )
+    else:
+        stmt = select(
+            tree_cte.c.child_scope.label('scope'),
+            tree_cte.c.child_name.label('name'),
+        ).distinct()
+    if did_type is not None:
+        stmt = stmt.where(
+            tree_cte.c.child_type == did_type
+        )
     return stmt
 
 
+def _supports_recursive_cte(session: "Session") -> bool:
+    """
+    Check if the database behind the session supports recursive CTEs (Common Table Expressions).
+
+    MySQL only supports them since 8.0 and MariaDB since 10.2. All the other supported
+    dialects support them in every version usable with Rucio.
+    """
+    dialect = session.bind.dialect
+    if dialect.name == 'mysql' and dialect.server_version_info:
+        if getattr(dialect, 'is_mariadb', False):
+            return tuple(dialect.server_version_info[:2]) >= (10, 2)
+        return tuple(dialect.server_version_info[:1]) >= (8, )
+    return True
+
+
+def _did_tree_child_types(did_type: Optional[DIDType]) -> list[DIDType]:
+    """
+    Return the types of the DIDs which have to be expanded to find children of type `did_type`.
+    """
+    if did_type == DIDType.DATASET:
+        return [DIDType.CONTAINER]
+    return [DIDType.CONTAINER, DIDType.DATASET]
+
+
+@stream_session
+def list_did_tree(
+        scope: "InternalScope",
+        name: str,
+        did_type: Optional[DIDType] = None,
+        long: bool = False,
+        *,
+        session: "Session"
+) -> "Iterator[dict[str, Any]]":
+    """
+    Stream the content associations of the whole DID tree below a DID.
+
+    Uses a single recursive query (see :func:`list_one_did_childs_stmt`). On databases without
+    recursive CTE support, the tree is expanded one level at a time through a temporary
+    table, so the number of queries is bound by the depth of the tree and not by the
+    number of collections in it.
+
+    :param scope:     The scope of the root DID.
+    :param name:      The name of the root DID.
+    :param did_type:  Only return children of this type; see :func:`list_one_did_childs_stmt`.
+    :param long:      Also return the lumiblocknr of the children.
+    :param session:   The database session in use.
+    :returns:         Iterator of dicts with the keys scope, name, child_scope, child_name,
+                      child_type, bytes, adler32, guid, events (and lumiblocknr if `long`).
+    """
+    if _supports_recursive_cte(session):
+        stmt = list_one_did_childs_stmt(scope, name, did_type=did_type, associations=True, long=long)
+        for row in session.execute(stmt).yield_per(500):
+            yield row._asdict()
+        return
+
+    dids_to_resolve = _did_tree_child_types(did_type)
+    collections = {(scope, name)}
+    while collections:
+        temp_table = temp_table_mngr(session).create_scope_name_table()
+        stmt = insert(
+            temp_table
+        )
+        session.execute(stmt, [{'scope': s, 'name': n} for s, n in collections])
+
+        stmt = select(
+            models.DataIdentifierAssociation.scope,
+            models.DataIdentifierAssociation.name,
+            models.DataIdentifierAssociation.child_scope,
+            models.DataIdentifierAssociation.child_name,
+            models.DataIdentifierAssociation.child_type,
+            models.DataIdentifierAssociation.bytes,
+            models.DataIdentifierAssociation.adler32,
+            models.DataIdentifierAssociation.guid,
+            models.DataIdentifierAssociation.events,
+        ).join_from(
+            temp_table,
+            models.DataIdentifierAssociation,
+            and_(models.DataIdentifierAssociation.scope == temp_table.scope,
+                 models.DataIdentifierAssociation.name == temp_table.name,
+                 models.DataIdentifierAssociation.did_type.in_(dids_to_resolve))
+        )
+        if long:
+            stmt = stmt.add_columns(
+                models.DataIdentifier.lumiblocknr
+            ).join(
+                models.DataIdentifier,
+                and_(models.DataIdentifier.scope == models.DataIdentifierAssociation.child_scope,
+                     models.DataIdentifier.name == models.DataIdentifierAssociation.child_name)
+            )
+
+        collections = set()
+        for row in session.execute(stmt).yield_per(500):
+            if row.child_type in dids_to_resolve:
+                collections.add((row.child_scope, row.child_name))
+            if did_type is None or row.child_type == did_type:
+                yield row._asdict()
+
+
 @transactional_session
 def list_child_datasets(
         scope: "InternalScope",
@@ -1671,11 +1830,19 @@ def list_child_datasets(
     :returns:         List of DIDs
     :rtype:           Generator
     """
-    stmt = list_one_did_childs_stmt(scope, name, did_type=DIDType.DATASET)
     result = []
-    for row in session.execute(stmt):
-        result.append({'scope': row.scope, 'name': row.name})
-
+    if _supports_recursive_cte(session):
+        stmt = list_one_did_childs_stmt(scope, name, did_type=DIDType.DATASET)
+        for row in session.execute(stmt):
+            result.append({'scope': row.scope, 'name': row.name})
+        return result
+
+    # Without the recursive query, a dataset attached to several containers is listed once per container
+    seen = set()
+    for row in list_did_tree(scope, name, did_type=DIDType.DATASET, session=session):
+        if (row['child_scope'], row['child_name']) not in seen:
+            seen.add((row['child_scope'], row['child_name']))
+            result.append({'scope': row['child_scope'], 'name': row['child_name']})
     return result
 
 
@@ -1743,78 +1910,18 @@ def list_files(scope: "InternalScope", name: str, long: bool = False, *, session
                        'adler32': did[3], 'guid': did[4] and did[4].upper(),
                        'events': did[5]}
         else:
-            cnt_query = select(
-                models.DataIdentifierAssociation.child_scope,
-                models.DataIdentifierAssociation.child_name,
-                models.DataIdentifierAssociation.child_type
-            ).with_hint(
-                models.DataIdentifierAssociation,
-                'INDEX(CONTENTS CONTENTS_PK)',
-                'oracle'
-            )
-
-            if long:
-                dst_cnt_query = select(
-                    models.DataIdentifierAssociation.child_scope,
-                    models.DataIdentifierAssociation.child_name,
-                    models.DataIdentifierAssociation.child_type,
-                    models.DataIdentifierAssociation.bytes,
-                    models.DataIdentifierAssociation.adler32,
-                    models.DataIdentifierAssociation.guid,
-                    models.DataIdentifierAssociation.events,
-                    models.DataIdentifier.lumiblocknr
-                ).with_hint(
-                    models.DataIdentifierAssociation,
-                    'INDEX_RS_ASC(DIDS DIDS_PK) INDEX_RS_ASC(CONTENTS CONTENTS_PK) NO_INDEX_FFS(CONTENTS CONTENTS_PK)',
-                    'oracle'
-                ).where(
-                    and_(models.DataIdentifier.scope == models.DataIdentifierAssociation.child_scope,
-                         models.DataIdentifier.name == models.DataIdentifierAssociation.child_name)
-                )
-            else:
-                dst_cnt_query = select(
-                    models.DataIdentifierAssociation.child_scope,
-                    models.DataIdentifierAssociation.child_name,
-                    models.DataIdentifierAssociation.child_type,
-                    models.DataIdentifierAssociation.bytes,
-                    models.DataIdentifierAssociation.adler32,
-                    models.DataIdentifierAssociation.guid,
-                    models.DataIdentifierAssociation.events,
-                    bindparam("lumiblocknr", None)
-                ).with_hint(
-                    models.DataIdentifierAssociation,
-                    'INDEX(CONTENTS CONTENTS_PK)',
-                    'oracle'
-                )
-
-            dids = [(scope, name, did[7]), ]
-            while dids:
-                s, n, t = dids.pop()
-                if t == DIDType.DATASET:
-                    stmt = dst_cnt_query.where(
-                        and_(models.DataIdentifierAssociation.scope == s,
-                             models.DataIdentifierAssociation.name == n)
-                    )
-
-                    for child_scope, child_name, child_type, bytes_, adler32, guid, events, lumiblocknr in session.execute(stmt).yield_per(500):
-                        if long:
-                            yield {'scope': child_scope, 'name': child_name,
-                                   'bytes': bytes_, 'adler32': adler32,
-                                   'guid': guid and guid.upper(),
-                                   'events': events,
-                                   'lumiblocknr': lumiblocknr}
-                        else:
-                            yield {'scope': child_scope, 'name': child_name,
-                                   'bytes': bytes_, 'adler32': adler32,
-                                   'guid': guid and guid.upper(),
-                                   'events': events}
+            for row in list_did_tree(scope=scope, name=name, did_type=DIDType.FILE, long=long, session=session):
+                if long:
+                    yield {'scope': row['child_scope'], 'name': row['child_name'],
+                           'bytes': row['bytes'], 'adler32': row['adler32'],
+                           'guid': row['guid'] and row['guid'].upper(),
+                           'events': row['events'],
+                           'lumiblocknr': row['lumiblocknr']}
                 else:
-                    stmt = cnt_query.where(
-                        and_(models.DataIdentifierAssociation.scope == s,
-                             models.DataIdentifierAssociation.name == n)
-                    )
-                    for child_scope, child_name, child_type in session.execute(stmt).yield_per(500):
-                        dids.append((child_scope, child_name, child_type))
+                    yield {'scope': row['child_scope'], 'name': row['child_name'],
+                           'bytes': row['bytes'], 'adler32': row['adler32'],
+                           'guid': row['guid'] and row['guid'].upper(),
+                           'events': row['events']}
 
     except NoResultFound:
         raise exception.DataIdentifierNotFound(f"Data identifier '{scope}:{name}' not found")
@@ -12,12 +12,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import heapq
 import importlib
 from configparser import NoOptionError, NoSectionError
 from typing import TYPE_CHECKING
 
 from rucio.common import config, exception
-from rucio.db.sqla.session import read_session, transactional_session
+from rucio.db.sqla.session import read_session, stream_session, transactional_session
 
 if TYPE_CHECKING:
     from sqlalchemy.orm import Session
@@ -204,7 +205,9 @@ def list_dids(scope=None, filters=None, did_type='collection', ignore_case=False
     """
     Search data identifiers.
 
-    All filter keys should belong to a single plugin. Queries across plugins are not currently supported.
+    When the filter keys belong to several plugins, each plugin lists its DIDs ordered by name and the
+    results are intersected with a sorted merge, so that they are streamed with bounded memory. Recursive
+    listing is not supported in that case.
 
     :param scope: the scope name.
     :param filters: dictionary of attributes by which the results should be filtered.
@@ -243,11 +246,97 @@ def list_dids(scope=None, filters=None, did_type='collection', ignore_case=False
 
     if not required_unique_plugins:               # if no metadata keys were specified, fall back to using the base plugin
         required_unique_plugins = [METADATA_PLUGIN_MODULES[0]]
-    elif len(required_unique_plugins) > 1:        # check that only a single plugin is required for the query, otherwise not supported
-        raise exception.InvalidMetadata('Filter keys used do not all belong to the same metadata plugin.')
+    elif len(required_unique_plugins) > 1:        # the query is split between the plugins and their results intersected
+        if recursive:
+            raise exception.InvalidMetadata('Recursive listing is not supported with filter keys belonging to several metadata plugins.')
+        return _list_dids_across_plugins(scope=scope, filters=filters, did_type=did_type, ignore_case=ignore_case,
+                                         limit=limit, offset=offset, long=long, ignore_dids=ignore_dids, session=session)
     selected_plugin_to_use = list(required_unique_plugins)[0]
 
     return selected_plugin_to_use.list_dids(scope=scope, filters=filters, did_type=did_type,
                                             ignore_case=ignore_case, limit=limit,
                                             offset=offset, long=long, recursive=recursive,
                                             ignore_dids=ignore_dids, session=session)
+
+
+@stream_session
+def _list_dids_across_plugins(scope, filters, did_type='collection', ignore_case=False, limit=None, offset=None, long=False,
+                              ignore_dids=None, *, session: "Session"):
+    """
+    Search data identifiers with filter keys belonging to several plugins.
+
+    Each OR group is split by plugin, the base plugin always taking part to filter on the DID type. The
+    name ordered results of the plugins are intersected for each OR group, then merged across OR groups.
+
+    :param scope: the scope name.
+    :param filters: list of dictionaries of attributes by which the results should be filtered.
+    :param did_type: the type of the DID: all(container, dataset, file), collection(dataset or container), dataset, container, file.
+    :param ignore_case: ignore case distinctions, passed to the plugins.
+    :param limit: limit number.
+    :param offset: number of matching DIDs to skip, in name order.
+    :param long: Long format option to display more information for each DID.
+    :param ignore_dids: List of DIDs to refrain from yielding.
+    :param session: The database session in use.
+    :returns: List of DIDs satisfying metadata criteria.
+    """
+    base_plugin = METADATA_PLUGIN_MODULES[0]
+    or_group_streams = []
+    for or_group in filters:
+        filters_by_plugin = {base_plugin: {}}
+        for key, value in or_group.items():
+            if key == 'name':
+                continue
+            key_nooperator = key.split('.')[0]
+            for metadata_plugin in METADATA_PLUGIN_MODULES:
+                if metadata_plugin.manages_key(key_nooperator, session=session):
+                    filters_by_plugin.setdefault(metadata_plugin, {})[key] = value
+                    break
+        if 'name' in or_group:
+            for plugin_filters in filters_by_plugin.values():
+                plugin_filters['name'] = or_group['name']
+        or_group_streams.append(_intersect_sorted_dids([
+            metadata_plugin.list_dids_sorted(scope=scope, filters=[plugin_filters], did_type=did_type, ignore_case=ignore_case, session=session)
+            for metadata_plugin, plugin_filters in filters_by_plugin.items()
+        ]))
+
+    previous_name, skipped, count = None, 0, 0
+    for did in heapq.merge(*or_group_streams, key=lambda did: did['name']):
+        if did['name'] == previous_name:   # the OR groups may match the same DIDs
+            continue
+        previous_name = did['name']
+        if offset and skipped < offset:
+            skipped += 1
+            continue
+        if ignore_dids is not None:
+            did_full = '{}:{}'.format(did['scope'], did['name'])
+            if did_full in ignore_dids:
+                continue
+            ignore_dids.add(did_full)
+        yield did if long else did['name']
+        count += 1
+        if limit and count >= limit:
+            return
+
+
+def _intersect_sorted_dids(streams):
+    """
+    Intersect streams of DIDs ordered by name.
+
+    :param streams: The streams of DIDs of the same scope, ordered by name.
+    :returns: The DIDs present in all the streams, as given by the first one, ordered by name.
+    """
+    iterators = [iter(stream) for stream in streams]
+    try:
+        current = [next(iterator) for iterator in iterators]
+        while True:
+            highest_name = max(did['name'] for did in current)
+            if all(did['name'] == highest_name for did in current):
+                yield current[0]
+                current = [next(iterator) for iterator in iterators]
+                continue
+            for idx, iterator in enumerate(iterators):
+                while current[idx]['name'] < highest_name:
+                    current[idx] = next(iterator)
+    except StopIteration:
+        return
+
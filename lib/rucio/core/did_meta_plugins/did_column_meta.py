@@ -24,7 +24,7 @@ from sqlalchemy.sql.expression import true
 from rucio.common import exception
 from rucio.core import account_counter, rse_counter
 from rucio.core.did_meta_plugins.did_meta_plugin_interface import DidMetaPlugin
-from rucio.core.did_meta_plugins.filter_engine import FilterEngine
+from rucio.core.did_meta_plugins.filter_engine import FilterEngine, list_sorted_by_key
 from rucio.db.sqla import models
 from rucio.db.sqla.constants import DIDType
 from rucio.db.sqla.session import read_session, stream_session, transactional_session
@@ -33,6 +33,7 @@ if TYPE_CHECKING:
     from collections.abc import Iterator
     from typing import Literal, Optional, Union
 
+    from sqlalchemy import Select
     from sqlalchemy.orm import Session
 
     from rucio.common.types import InternalScope
@@ -314,57 +315,12 @@ class DidColumnMeta(DidMetaPlugin):
         if not ignore_dids:
             ignore_dids = set()
 
-        # mapping for semantic <type> to a (set of) recognised DIDType(s).
-        type_to_did_type_mapping = {
-            'all': [DIDType.CONTAINER, DIDType.DATASET, DIDType.FILE],
-            'collection': [DIDType.CONTAINER, DIDType.DATASET],
-            'container': [DIDType.CONTAINER],
-            'dataset': [DIDType.DATASET],
-            'file': [DIDType.FILE]
-        }
-
         # backwards compatibility for filters as single {}.
         if isinstance(filters, dict):
             filters = [filters]
 
-        # for each or_group, make sure there is a mapped "did_type" filter.
-        # if type maps to many DIDTypes, the corresponding or_group will be copied the
-        # required number of times to satisfy all the logical possibilities.
-        filters_tmp = []
-        for or_group in filters:
-            if 'type' not in or_group:
-                or_group_type = did_type.lower()
-            else:
-                or_group_type = or_group.pop('type').lower()
-            if or_group_type not in type_to_did_type_mapping.keys():
-                raise exception.UnsupportedOperation(
-                    '{} is not a valid type. Valid types are {}'.format(or_group_type, type_to_did_type_mapping.keys()))
-
-            for mapped_did_type in type_to_did_type_mapping[or_group_type]:
-                or_group['did_type'] = mapped_did_type
-                filters_tmp.append(or_group.copy())
-        filters = filters_tmp
-
-        # instantiate fe and create sqla query
-        fe = FilterEngine(filters, model_class=models.DataIdentifier)
-        stmt = fe.create_sqla_query(
-            additional_model_attributes=[
-                models.DataIdentifier.scope,
-                models.DataIdentifier.name,
-                models.DataIdentifier.did_type,
-                models.DataIdentifier.bytes,
-                models.DataIdentifier.length
-            ], additional_filters=[
-                (models.DataIdentifier.scope, operator.eq, scope),
-                (models.DataIdentifier.suppressed, operator.ne, true())
-            ],
-            session=session
-        )
-        stmt = stmt.with_hint(
-            models.DataIdentifier,
-            'USE_CONCAT INDEX_RS_ASC(DIDS)',
-            'oracle'
-        )
+        filters = self._map_did_type_filters(filters, did_type)
+        stmt = self._create_list_dids_query(scope, filters, session=session)
 
         if limit:
             stmt = stmt.limit(
@@ -413,6 +369,117 @@ class DidColumnMeta(DidMetaPlugin):
                     ignore_dids.add(did_full)
                     yield did.name
 
+    @stream_session
+    def list_dids_sorted(
+            self,
+            scope: "InternalScope",
+            filters: "Union[dict[str, Any], list[dict[str, Any]]]",
+            did_type: "Literal['all', 'collection', 'dataset', 'container', 'file']" = 'collection',
+            ignore_case: bool = False,
+            *,
+            session: "Session",
+    ) -> "Iterator[dict[str, Any]]":
+        """
+        Search data identifiers, ordered by name, streamed.
+
+        :param scope: The scope of the DIDs to list.
+        :param filters: A single dict or a list of dicts representing OR groups (disjunction).
+        :param did_type: Option to filter by a specific DID type:
+            all(container, dataset, file), collection(dataset or container), dataset, container, file.
+        :param ignore_case: Has no effect.
+        :param session: The database session in use.
+        :yields: dicts with keys: {'scope', 'name', 'did_type', 'bytes', 'length'}.
+        """
+        if isinstance(filters, dict):
+            filters = [filters]
+
+        filters = self._map_did_type_filters(filters, did_type)
+        stmt = self._create_list_dids_query(scope, filters, session=session)
+        for did in list_sorted_by_key(stmt, models.DataIdentifier.name, session=session):
+            yield {
+                'scope': did.scope,
+                'name': did.name,
+                'did_type': did.did_type.name,
+                'bytes': did.bytes,
+                'length': did.length
+            }
+
+    def _map_did_type_filters(
+            self,
+            filters: "list[dict[str, Any]]",
+            did_type: str
+    ) -> "list[dict[str, Any]]":
+        """
+        For each or_group, make sure there is a mapped "did_type" filter.
+        If type maps to many DIDTypes, the corresponding or_group will be copied the
+        required number of times to satisfy all the logical possibilities.
+
+        :param filters: A list of dicts representing OR groups (disjunction).
+        :param did_type: The semantic type used for the OR groups without a 'type'.
+        :returns: The OR groups with a 'did_type' filter.
+        :raises: UnsupportedOperation
+        """
+        # mapping for semantic <type> to a (set of) recognised DIDType(s).
+        type_to_did_type_mapping = {
+            'all': [DIDType.CONTAINER, DIDType.DATASET, DIDType.FILE],
+            'collection': [DIDType.CONTAINER, DIDType.DATASET],
+            'container': [DIDType.CONTAINER],
+            'dataset': [DIDType.DATASET],
+            'file': [DIDType.FILE]
+        }
+
+        filters_tmp = []
+        for or_group in filters:
+            if 'type' not in or_group:
+                or_group_type = did_type.lower()
+            else:
+                or_group_type = or_group.pop('type').lower()
+            if or_group_type not in type_to_did_type_mapping.keys():
+                raise exception.UnsupportedOperation(
+                    '{} is not a valid type. Valid types are {}'.format(or_group_type, type_to_did_type_mapping.keys()))
+
+            for mapped_did_type in type_to_did_type_mapping[or_group_type]:
+                or_group['did_type'] = mapped_did_type
+                filters_tmp.append(or_group.copy())
+        return filters_tmp
+
+    def _create_list_dids_query(
+            self,
+            scope: "InternalScope",
+            filters: "list[dict[str, Any]]",
+            *,
+            session: "Session"
+    ) -> "Select":
+        """
+        Create the query listing the DIDs of a scope matching the filters.
+
+        :param scope: The scope of the DIDs to list.
+        :param filters: A list of dicts representing OR groups (disjunction).
+        :param session: The database session in use.
+        :returns: A SQLAlchemy Select object.
+        """
+        # instantiate fe and create sqla query
+        fe = FilterEngine(filters, model_class=models.DataIdentifier)
+        stmt = fe.create_sqla_query(
+            additional_model_attributes=[
+                models.DataIdentifier.scope,
+                models.DataIdentifier.name,
+                models.DataIdentifier.did_type,
+                models.DataIdentifier.bytes,
+                models.DataIdentifier.length
+            ], additional_filters=[
+                (models.DataIdentifier.scope, operator.eq, scope),
+                (models.DataIdentifier.suppressed, operator.ne, true())
+            ],
+            session=session
+        )
+        stmt = stmt.with_hint(
+            models.DataIdentifier,
+            'USE_CONCAT INDEX_RS_ASC(DIDS)',
+            'oracle'
+        )
+        return stmt
+
     def delete_metadata(
             self,
             scope: "InternalScope",
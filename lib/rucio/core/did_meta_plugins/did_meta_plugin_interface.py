@@ -162,6 +162,31 @@ class DidMetaPlugin(metaclass=ABCMeta):
         """
         pass
 
+    def list_dids_sorted(
+        self,
+        scope: "InternalScope",
+        filters: list[dict[str, "Any"]],
+        did_type: "Literal['all', 'collection', 'dataset', 'container', 'file']" = 'collection',
+        ignore_case: bool = False,
+        *,
+        session: "Session | None" = None
+    ) -> "Iterator[dict[str, Any]]":
+        """
+        Search data identifiers, ordered by name. Used to intersect the results of several plugins.
+
+        This default implementation sorts the results of list_dids in memory, plugins able to
+        order and paginate their results in the backend should override it.
+
+        :param scope: The scope of the DID.
+        :param filters: list of dictionaries of attributes by which the results should be filtered (disjunction).
+        :param did_type: the type of the DID: all(container, dataset, file), collection(dataset or container), dataset, container, file.
+        :param ignore_case: ignore case distinctions.
+        :param session: The database session in use.
+        :yields: dicts with keys: {'scope', 'name', 'did_type', 'bytes', 'length'}.
+        """
+        dids = self.list_dids(scope=scope, filters=filters, did_type=did_type, ignore_case=ignore_case, long=True, session=session)
+        yield from sorted(dids, key=lambda did: did['name'])  # type: ignore
+
     @abstractmethod
     def manages_key(
         self,
@@ -14,6 +14,7 @@
 
 import ast
 import fnmatch
+import functools
 import operator
 from datetime import date, datetime, timedelta
 from importlib import import_module
@@ -30,8 +31,9 @@ from rucio.db.sqla.constants import DIDType
 from rucio.db.sqla.session import read_session
 
 if TYPE_CHECKING:
-    from collections.abc import Callable, Iterable
+    from collections.abc import Callable, Iterable, Iterator
 
+    from sqlalchemy import Row
     from sqlalchemy.orm import Session
 
     from rucio.db.sqla.models import ModelBase
@@ -87,6 +89,18 @@ VALID_DATE_FORMATS = (
     '%a, %d %b %Y %H:%M:%S UTC'
 )
 
+# number of translated filters kept in memory, by filters and model class.
+TRANSLATED_FILTERS_CACHE_SIZE = 1024
+
+# number of rows fetched at once by the name ordered searches.
+KEYSET_PAGE_SIZE = 1000
+
+# binary collations, so that the database orders strings as python compares them.
+BINARY_COLLATIONS = {
+    'postgresql': 'C',
+    'mysql': 'utf8mb4_bin'
+}
+
 
 class FilterEngine:
     """
@@ -106,8 +120,18 @@ class FilterEngine:
             raise exception.DIDFilterSyntaxError("Input filters are of an unrecognised type.")
 
         filters = self._make_input_backwards_compatible(filters=filters)
-        self._filters, self.mandatory_model_attributes = self._translate_filters(filters=filters, model_class=model_class, strict_coerce=strict_coerce)
-        self._sanity_check_translated_filters()
+        try:
+            # the value types are part of the key, as e.g. False, 0 and 0.0 are equal but give different queries
+            cache_key = tuple(tuple((key, type(value), value) for key, value in or_group.items()) for or_group in filters)
+            hash(cache_key)
+        except TypeError:   # unhashable values, e.g. lists, are translated every time
+            self._filters, self.mandatory_model_attributes = self._translate_filters(filters=filters, model_class=model_class, strict_coerce=strict_coerce)
+            self._sanity_check_translated_filters()
+        else:
+            translated_filters, mandatory_model_attributes = _translate_filters_cached(cache_key, model_class, strict_coerce)
+            # the queries append the additional filters to the OR groups, so each engine gets its own lists
+            self._filters = [list(or_group) for or_group in translated_filters]
+            self.mandatory_model_attributes = list(mandatory_model_attributes)
 
     @property
     def filters(self) -> list[list["FilterTuple"]]:
@@ -410,13 +434,17 @@ class FilterEngine:
         additional_filters: Optional["Iterable[FilterTuple]"] = None,
         fixed_table_columns: Union[tuple[str, ...], dict[str, str]] = ('scope', 'name', 'vo'),
         jsonb_column: str = 'data'
-    ) -> str:
+    ) -> tuple[str, dict[str, Any]]:
         """
         Returns a single postgres query describing the filters expression.
 
+        The keys of the JSON column and the values are not part of the query string, they are
+        named placeholders (e.g. %(p0)s) to be bound as parameters when executing the query.
+
         :param additional_filters: additional filters to be applied to all clauses.
         :param fixed_table_columns: the table columns
-        :returns: a postgres query string describing the filters expression.
+        :param jsonb_column: the JSON column
+        :returns: a postgres query string describing the filters expression, and its parameters.
         """
         additional_filters = additional_filters or []
         # Add additional filters, applied as AND clauses to each OR group.
@@ -424,64 +452,48 @@ class FilterEngine:
             for _filter in additional_filters:
                 or_group.append(list(_filter))  # type: ignore
 
+        params: dict[str, Any] = {}
+
+        def bind(value: Any) -> str:
+            name = 'p%d' % len(params)
+            params[name] = value
+            return '%%(%s)s' % name
+
         or_expressions: list[str] = []
         for or_group in self._filters:
             and_expressions: list[str] = []
             for and_group in or_group:
                 key, oper, value = and_group
                 if key in fixed_table_columns:                                              # is this key filtering on a column or in the jsonb?
-                    is_in_json_column = False
+                    column = key
                 else:
-                    is_in_json_column = True
+                    column = "{}->>{}::text".format(jsonb_column, bind(key))
                 if isinstance(value, str) and any([char in value for char in ['*', '%']]):  # wildcards
                     if value in ('*', '%', '*', '%'):                                       # match wildcard exactly == no filtering on key
                         continue
                     else:                                                                   # partial match with wildcard == like || notlike
+                        pattern = value.replace('*', '%').replace('_', '\\_')
                         if oper == operator.eq:
-                            if is_in_json_column:
-                                expression = "{}->>'{}' LIKE '{}' ".format(jsonb_column, key, value.replace('*', '%').replace('_', '\_'))       # NOQA: W605
-                            else:
-                                expression = "{} LIKE '{}' ".format(key, value.replace('*', '%').replace('_', '\_'))                            # NOQA: W605
+                            expression = "{} LIKE {}".format(column, bind(pattern))
                         elif oper == operator.ne:
-                            if is_in_json_column:
-                                expression = "{}->>'{}' NOT LIKE '{}' ".format(jsonb_column, key, value.replace('*', '%').replace('_', '\_'))   # NOQA: W605
-                            else:
-                                expression = "{} NOT LIKE '{}' ".format(key, value.replace('*', '%').replace('_', '\_'))                        # NOQA: W605
+                            expression = "{} NOT LIKE {}".format(column, bind(pattern))
                 else:
                     # Infer what type key should be cast to from typecasting the value in the expression.
                     try:
-                        if isinstance(value, int):                                          # this could be bool or int (as bool subclass of int)
-                            if isinstance(value, bool):
-                                if is_in_json_column:
-                                    expression = "({}->>'{}')::boolean {} {}".format(jsonb_column, key, POSTGRES_OP_MAP[oper], str(value).lower())
-                                else:
-                                    expression = "{}::boolean {} {}".format(key, POSTGRES_OP_MAP[oper], str(value).lower())
-                            else:
-                                # cast as float, not integer, to avoid potentially losing precision in key
-                                if is_in_json_column:
-                                    expression = "({}->>'{}')::float {} {}".format(jsonb_column, key, POSTGRES_OP_MAP[oper], value)
-                                else:
-                                    expression = "{}::float {} {}".format(key, POSTGRES_OP_MAP[oper], value)
-                        elif isinstance(value, float):
-                            if is_in_json_column:
-                                expression = "({}->>'{}')::float {} {}".format(jsonb_column, key, POSTGRES_OP_MAP[oper], value)
-                            else:
-                                expression = "{}::float {} {}".format(key, POSTGRES_OP_MAP[oper], value)
+                        if isinstance(value, bool):
+                            expression = "({})::boolean {} {}".format(column, POSTGRES_OP_MAP[oper], bind(value))
+                        elif isinstance(value, (int, float)):
+                            # cast as float, not integer, to avoid potentially losing precision in key
+                            expression = "({})::float {} {}".format(column, POSTGRES_OP_MAP[oper], bind(float(value)))
                         elif isinstance(value, datetime):
-                            if is_in_json_column:
-                                expression = "({}->>'{}')::timestamp {} '{}'".format(jsonb_column, key, POSTGRES_OP_MAP[oper], value)
-                            else:
-                                expression = "{}::timestamp {} '{}'".format(key, POSTGRES_OP_MAP[oper], value)
+                            expression = "({})::timestamp {} {}".format(column, POSTGRES_OP_MAP[oper], bind(value))
                         else:
-                            if is_in_json_column:
-                                expression = "{}->>'{}' {} '{}'".format(jsonb_column, key, POSTGRES_OP_MAP[oper], value)
-                            else:
-                                expression = "{} {} '{}'".format(key, POSTGRES_OP_MAP[oper], value)
+                            expression = "{} {} {}".format(column, POSTGRES_OP_MAP[oper], bind(str(value)))
                     except Exception as e:
                         raise exception.FilterEngineGenericError(e)
                 and_expressions.append(expression)
             or_expressions.append(' AND '.join(and_expressions))
-        return ' OR '.join(or_expressions)
+        return ' OR '.join(or_expressions), params
 
     @read_session
     def create_sqla_query(
@@ -668,3 +680,73 @@ class FilterEngine:
                 return super(LiteralCompiler, self).render_literal_value(value, type_)
 
         return LiteralCompiler(dialect, statement).process(statement)
+
+
+@functools.lru_cache(maxsize=TRANSLATED_FILTERS_CACHE_SIZE)
+def _translate_filters_cached(
+        filters: tuple[tuple[tuple[str, type, Any], ...], ...],
+        model_class: Optional[type["ModelBase"]],
+        strict_coerce: bool
+) -> tuple[tuple[tuple["FilterTuple", ...], ...], tuple[InstrumentedAttribute[Any], ...]]:
+    """
+    Translates and sanity checks filters, caching the result, so that repeated searches skip the
+    typecasting and the checks. Only the translation is cached: the queries are still built for each
+    search. Those of create_sqla_query and create_postgres_query bind the values as parameters, so
+    that searches with the same filter keys and operators give the same SQL string.
+
+    :param filters: The filters, as a tuple of OR groups of (key, value type, value) items.
+    :param model_class: The SQL model class.
+    :param strict_coerce: Enforce that keywords must be coercible to a model attribute.
+    :returns: The translated filters and the mandatory model attributes, as tuples.
+    :raises: The exceptions of the translation and of the sanity checks, which are not cached.
+    """
+    engine = FilterEngine.__new__(FilterEngine)
+    engine._filters, engine.mandatory_model_attributes = engine._translate_filters(
+        filters=[{key: value for key, _, value in or_group} for or_group in filters], model_class=model_class, strict_coerce=strict_coerce)
+    engine._sanity_check_translated_filters()
+    return tuple(tuple(or_group) for or_group in engine._filters), tuple(engine.mandatory_model_attributes)
+
+
+def list_sorted_by_key(
+        stmt: Select,
+        key_column: InstrumentedAttribute,
+        *,
+        session: "Session",
+        page_size: int = KEYSET_PAGE_SIZE
+) -> "Iterator[Row]":
+    """
+    Yields the rows of a query ordered by a unique string column, with a bounded memory use.
+
+    The keys are ordered with a binary collation, the same order as the python string comparison,
+    so that the results of several queries can be merged. Where the database needs an explicit
+    collation, the ordering is not served by the indexes of the column: the rows are sorted once,
+    by one query streamed with a server-side cursor. MySQL cannot interleave the unbuffered results
+    of several queries on one connection, there the rows are buffered by the client. Elsewhere the
+    indexes give the order, and the rows are read by pages, each starting after the last key of
+    the previous one, so that no cursor is kept open between the pages.
+
+    :param stmt: The query, selecting the key column.
+    :param key_column: The column to order by, unique in the results of the query.
+    :param session: The database session in use.
+    :param page_size: The number of rows fetched at once.
+    :yields: The rows of the query, ordered by the key column.
+    """
+    dialect_name = session.bind.dialect.name
+    collation = BINARY_COLLATIONS.get(dialect_name)
+    if collation:
+        stmt = stmt.order_by(key_column.collate(collation))
+        if dialect_name == 'postgresql':
+            stmt = stmt.execution_options(yield_per=page_size)
+        yield from session.execute(stmt)
+        return
+
+    last_key = None
+    while True:
+        page_stmt = stmt
+        if last_key is not None:
+            page_stmt = page_stmt.where(key_column > last_key)
+        page = session.execute(page_stmt.order_by(key_column).limit(page_size)).all()
+        yield from page
+        if len(page) < page_size:
+            return
+        last_key = getattr(page[-1], key_column.key)
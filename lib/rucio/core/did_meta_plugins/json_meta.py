@@ -14,20 +14,25 @@
 
 import json as json_lib
 import operator
+import re
 from typing import TYPE_CHECKING, Any, cast
 
-from sqlalchemy import and_, select
+from sqlalchemy import and_, exists, inspect, select, text, union
 from sqlalchemy.exc import DataError, NoResultFound
 
 from rucio.common import exception
+from rucio.common.config import config_get_list
 from rucio.core.did_meta_plugins.did_meta_plugin_interface import DidMetaPlugin
-from rucio.core.did_meta_plugins.filter_engine import FilterEngine
+from rucio.core.did_meta_plugins.filter_engine import FilterEngine, list_sorted_by_key
 from rucio.db.sqla import models
 from rucio.db.sqla.constants import DIDType
 from rucio.db.sqla.session import read_session, stream_session, transactional_session
 from rucio.db.sqla.util import json_implemented
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from typing import Optional
+
     from sqlalchemy.orm import Session
 
 
@@ -166,9 +171,6 @@ class JSONDidMeta(DidMetaPlugin):
         if not json_implemented(session=session):
             raise NotImplementedError
 
-        if not ignore_dids:
-            ignore_dids = set()
-
         # backwards compatibility for filters as single {}.
         if isinstance(filters, dict):
             filters = [filters]
@@ -187,48 +189,186 @@ class JSONDidMeta(DidMetaPlugin):
             session=session
         )
 
+        if recursive:
+            # The content of the matching collections is expanded once with a recursive CTE, and the
+            # matching content is returned by the same query. The name filters only apply to the top level.
+            content_filters = [{key: value for key, value in or_group.items() if key.split('.')[0] != 'name'} for or_group in filters]
+            content_fe = FilterEngine(content_filters, model_class=models.DidMeta, strict_coerce=False)
+            content_stmt = content_fe.create_sqla_query(
+                additional_model_attributes=[
+                    models.DidMeta.scope,
+                    models.DidMeta.name
+                ],
+                json_column=models.DidMeta.meta,
+                session=session
+            )
+            content_cte = self._list_content_cte(stmt.subquery())
+            stmt = union(
+                stmt,
+                content_stmt.where(
+                    exists(
+                    ).where(
+                        and_(content_cte.c.child_scope == models.DidMeta.scope,
+                             content_cte.c.child_name == models.DidMeta.name)
+                    )
+                )
+            )
+
         if limit:
             stmt = stmt.limit(
                 limit
             )
-        if recursive:
-            from rucio.core.did import list_content
-
-            # Get attached DIDs and save in list because query has to be finished before starting a new one in the recursion
-            collections_content = []
-            for did in session.execute(stmt).yield_per(100):
-                if (did.did_type == DIDType.CONTAINER or did.did_type == DIDType.DATASET):
-                    collections_content += [d for d in list_content(scope=did.scope, name=did.name)]
-
-            # Replace any name filtering with recursed DID names.
-            for did in collections_content:
-                for or_group in filters:
-                    or_group['name'] = did['name']
-                for result in self.list_dids(scope=did['scope'], filters=filters, recursive=True, did_type=did_type, limit=limit, offset=offset,
-                                             long=long, ignore_dids=ignore_dids, session=session):
-                    yield result
 
         try:
-            for did in session.execute(stmt).yield_per(5):                  # don't unpack this as it makes it dependent on query return order!
-                if long:
+            for did in session.execute(stmt).yield_per(1000):               # don't unpack this as it makes it dependent on query return order!
+                # a DID is returned once by the query, duplicates only need to be checked against the caller's DIDs
+                if ignore_dids is not None:
                     did_full = "{}:{}".format(did.scope, did.name)
-                    if did_full not in ignore_dids:         # concatenating results of OR clauses may contain duplicate DIDs if query result sets not mutually exclusive.
-                        ignore_dids.add(did_full)
-                        yield {
-                            'scope': did.scope,
-                            'name': did.name,
-                            'did_type': None,               # not available with JSON plugin
-                            'bytes': None,                  # not available with JSON plugin
-                            'length': None                  # not available with JSON plugin
-                        }
+                    if did_full in ignore_dids:
+                        continue
+                    ignore_dids.add(did_full)
+                if long:
+                    yield {
+                        'scope': did.scope,
+                        'name': did.name,
+                        'did_type': None,               # not available with JSON plugin
+                        'bytes': None,                  # not available with JSON plugin
+                        'length': None                  # not available with JSON plugin
+                    }
                 else:
-                    did_full = "{}:{}".format(did.scope, did.name)
-                    if did_full not in ignore_dids:         # concatenating results of OR clauses may contain duplicate DIDs if query result sets not mutually exclusive.
-                        ignore_dids.add(did_full)
-                        yield did.name
+                    yield did.name
+        except DataError as e:
+            raise exception.InvalidMetadata("Database query failed: {}. This can be raised when the datatype of a key is inconsistent between dids.".format(e))
+
+    def _list_content_cte(self, collections):
+        """
+        Build a recursive CTE listing the content, at any depth, of the given collections.
+
+        :param collections: A subquery with the scope and name of the collections.
+        :returns: The CTE, with the child_scope and child_name columns.
+        """
+        initial_set = select(
+            models.DataIdentifierAssociation.child_scope,
+            models.DataIdentifierAssociation.child_name,
+            models.DataIdentifierAssociation.child_type,
+        ).join_from(
+            collections,
+            models.DataIdentifierAssociation,
+            and_(models.DataIdentifierAssociation.scope == collections.c.scope,
+                 models.DataIdentifierAssociation.name == collections.c.name),
+        ).cte(
+            recursive=True,
+        )
+
+        # Oracle doesn't support union() in recursive CTEs, so use UNION ALL
+        return initial_set.union_all(
+            select(
+                models.DataIdentifierAssociation.child_scope,
+                models.DataIdentifierAssociation.child_name,
+                models.DataIdentifierAssociation.child_type,
+            ).where(
+                and_(models.DataIdentifierAssociation.scope == initial_set.c.child_scope,
+                     models.DataIdentifierAssociation.name == initial_set.c.child_name,
+                     initial_set.c.child_type.in_([DIDType.CONTAINER, DIDType.DATASET]))
+            )
+        )
+
+    @stream_session
+    def list_dids_sorted(self, scope, filters, did_type='collection', ignore_case=False, *, session: "Session"):
+        """
+        Search data identifiers on their JSON metadata, ordered by name, streamed.
+
+        :param scope: The scope of the DIDs to list.
+        :param filters: A single dict or a list of dicts representing OR groups (disjunction).
+        :param did_type: Has no effect, the DID type is not available with the JSON plugin.
+        :param ignore_case: Has no effect.
+        :param session: The database session in use.
+        :yields: dicts with keys: {'scope', 'name', 'did_type', 'bytes', 'length'}, only scope and name being set.
+        :raises: NotImplementedError if the database does not support JSON, InvalidMetadata if the query fails.
+        """
+        if not json_implemented(session=session):
+            raise NotImplementedError
+
+        # backwards compatibility for filters as single {}.
+        if isinstance(filters, dict):
+            filters = [filters]
+
+        fe = FilterEngine(filters, model_class=models.DidMeta, strict_coerce=False)
+        stmt = fe.create_sqla_query(
+            additional_model_attributes=[
+                models.DidMeta.scope,
+                models.DidMeta.name
+            ], additional_filters=[
+                (models.DidMeta.scope, operator.eq, scope)
+            ],
+            json_column=models.DidMeta.meta,
+            session=session
+        )
+        try:
+            for did in list_sorted_by_key(stmt, models.DidMeta.name, session=session):
+                yield {
+                    'scope': did.scope,
+                    'name': did.name,
+                    'did_type': None,               # not available with JSON plugin
+                    'bytes': None,                  # not available with JSON plugin
+                    'length': None                  # not available with JSON plugin
+                }
         except DataError as e:
             raise exception.InvalidMetadata("Database query failed: {}. This can be raised when the datatype of a key is inconsistent between dids.".format(e))
 
     @read_session
     def manages_key(self, key, *, session: "Session"):
         return json_implemented(session=session)
+
+
+@transactional_session
+def create_json_meta_indexes(keys: "Optional[Iterable[str]]" = None, *, session: "Session") -> list[str]:
+    """
+    Create the indexes on the JSON metadata of the hot keys, used by the searches on these keys.
+
+    - PostgreSQL: an expression index on meta->>key, the expression used by the searches.
+    - MySQL: a virtual column generated from the key, indexed. MySQL uses it for the matching expressions.
+    - Oracle: a JSON search index on the whole column, used by the json_exists searches of all keys.
+
+    :param keys: The metadata keys to index. By default, the keys listed in metadata/json_indexed_keys.
+    :param session: The database session in use.
+    :returns: The names of the created indexes, the existing ones are skipped.
+    :raises: InvalidMetadata if a key cannot be part of an index name or two keys differ only by case, UnsupportedOperation for other databases.
+    """
+    if keys is None:
+        keys = config_get_list('metadata', 'json_indexed_keys', raise_exception=False, default=[])
+    keys = list(keys)
+    for key in keys:
+        if not re.match(r'^\w{1,40}$', key):
+            raise exception.InvalidMetadata('Cannot index the metadata key %s, only keys of up to 40 word characters can be indexed.' % key)
+    if len({key.lower() for key in keys}) != len(set(keys)):
+        raise exception.InvalidMetadata('Cannot index the metadata keys %s, the index names of keys differing only by case collide.' % ', '.join(keys))
+    keys = list(dict.fromkeys(keys))
+
+    dialect = session.bind.dialect
+    table = dialect.identifier_preparer.format_table(models.DidMeta.__table__)
+    existing_indexes = {index['name'].lower() for index in inspect(session.connection()).get_indexes(
+        models.DidMeta.__tablename__, schema=models.DidMeta.__table__.schema)}
+
+    statements = {}
+    if dialect.name == 'postgresql':
+        for key in keys:
+            statements['did_meta_%s_idx' % key.lower()] = "CREATE INDEX did_meta_%s_idx ON %s ((meta ->> '%s'))" % (key.lower(), table, key)
+    elif dialect.name == 'mysql':
+        for key in keys:
+            statements['did_meta_%s_idx' % key.lower()] = (
+                "ALTER TABLE %s ADD COLUMN meta_%s VARCHAR(255) GENERATED ALWAYS AS (JSON_UNQUOTE(JSON_EXTRACT(meta, '$.\"%s\"'))) VIRTUAL, "
+                "ADD INDEX did_meta_%s_idx (meta_%s)" % (table, key.lower(), key, key.lower(), key.lower()))
+    elif dialect.name == 'oracle':
+        statements['did_meta_json_idx'] = "CREATE SEARCH INDEX did_meta_json_idx ON %s (meta) FOR JSON" % table
+    else:
+        raise exception.UnsupportedOperation('JSON metadata indexes are not supported on %s' % dialect.name)
+
+    created = []
+    for index_name, statement in statements.items():
+        if index_name in existing_indexes:
+            continue
+        session.execute(text(statement))
+        created.append(index_name)
+    return created
+
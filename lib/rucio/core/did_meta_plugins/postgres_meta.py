@@ -293,7 +293,7 @@ class ExternalPostgresJSONDidMeta(DidMetaPlugin):
         try:
             # instantiate fe and create postgres query
             fe = FilterEngine(filters, model_class=None, strict_coerce=False)
-            postgres_query_str = fe.create_postgres_query(
+            postgres_query_str, postgres_query_params = fe.create_postgres_query(
                 additional_filters=[
                     ('scope', operator.eq, scope.internal),
                     ('vo', operator.eq, scope.vo)
@@ -318,7 +318,7 @@ class ExternalPostgresJSONDidMeta(DidMetaPlugin):
         )
 
         cur = self.client.cursor(row_factory=dict_row)
-        cur.execute(statement)
+        cur.execute(statement, postgres_query_params)
         query_result = cur.fetchall()
         cur.close()
 
@@ -27,8 +27,10 @@ from rucio.db.sqla.models import Message, MessageHistory
 from rucio.db.sqla.session import transactional_session
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
     from typing import Any, Optional
 
+    from sqlalchemy.engine import Dialect
     from sqlalchemy.orm import Session
 
     MessageType = dict[str, Any]
@@ -94,6 +96,19 @@ def add_message(event_type: str, payload: dict, *, session: "Session") -> None:
     add_messages([{'event_type': event_type, 'payload': payload}], session=session)
 
 
+def _supports_skip_locked(dialect: "Dialect") -> bool:
+    """
+    Checks if the database can skip the locked rows, FOR UPDATE SKIP LOCKED.
+
+    :param dialect: The dialect of the database.
+    :returns: False for MySQL before 8.0 and MariaDB before 10.6, True otherwise.
+    """
+    if dialect.name != 'mysql':
+        return True
+    version = dialect.server_version_info or ()
+    return version >= ((10, 6) if getattr(dialect, 'is_mariadb', False) else (8, 0))
+
+
 @transactional_session
 def retrieve_messages(bulk: int = 1000,
                       thread: "Optional[int]" = None,
@@ -102,6 +117,8 @@ def retrieve_messages(bulk: int = 1000,
                       lock: bool = False,
                       old_mode: bool = True,
                       service_filter: "Optional[str]" = None,
+                      skip_locked: bool = False,
+                      excluded_services: "Optional[Iterable[str]]" = None,
                       *, session: "Session") -> "MessagesListType":
     """
     Retrieve up to $bulk messages.
@@ -114,35 +131,38 @@ def retrieve_messages(bulk: int = 1000,
     :param old_mode: If True, doesn't return email if event_type is None.
     :param session: The database session to use.
     :param service_filter: When a service is supplied this queries the database for messages for that service.
+    :param skip_locked: If True, skip the messages locked by another caller instead of failing on them.
+                        Ignored on MySQL before 8.0 and MariaDB before 10.6, which cannot skip locked rows.
+    :param excluded_services: Do not return the messages of these services.
 
     :returns messages: List of dictionaries {id, created_at, event_type, payload, services}
     """
     messages = []
     try:
-        stmt_subquery = select(
-            Message.id
-        ).order_by(
-            Message.created_at
-        )
-        stmt_subquery = filter_thread_work(session=session, query=stmt_subquery, total_threads=total_threads, thread_id=thread)
-        if service_filter:
-            stmt_subquery = stmt_subquery.where(
-                Message.services == service_filter
-            )
-        if event_type:
-            stmt_subquery = stmt_subquery.where(
-                Message.event_type == event_type
-            )
-        elif old_mode:
-            stmt_subquery = stmt_subquery.where(
-                Message.event_type != 'email'
-            )
+        dialect = session.bind.dialect
+        if skip_locked and not _supports_skip_locked(dialect):
+            skip_locked = False
+
+        def filter_messages(stmt):
+            stmt = filter_thread_work(session=session, query=stmt, total_threads=total_threads, thread_id=thread)
+            if service_filter:
+                stmt = stmt.where(
+                    Message.services == service_filter
+                )
+            if excluded_services:
+                stmt = stmt.where(
+                    Message.services.not_in(list(excluded_services))
+                )
+            if event_type:
+                stmt = stmt.where(
+                    Message.event_type == event_type
+                )
+            elif old_mode:
+                stmt = stmt.where(
+                    Message.event_type != 'email'
+                )
+            return stmt
 
-        # Step 1:
-        # MySQL does not support limits in nested queries, limit on the outer query instead.
-        # This is not as performant, but the best we can get from MySQL.
-        # FIXME: SQLAlchemy generates wrong nowait MySQL8 statement for MySQL5
-        #        Remove once this is resolved in SQLAlchemy
         stmt = select(
             Message.id,
             Message.created_at,
@@ -150,29 +170,54 @@ def retrieve_messages(bulk: int = 1000,
             Message.payload,
             Message.services
         )
-        if session.bind.dialect.name == 'mysql':
-            stmt = stmt.where(
-                Message.id.in_(stmt_subquery)
-            )
-        else:
-            stmt_subquery = stmt_subquery.limit(
+        if skip_locked and dialect.name != 'oracle':
+            # Step 1:
+            # The locked rows are skipped before limiting, so the limit is on the locked query itself.
+            stmt = filter_messages(stmt).order_by(
+                Message.created_at,
+                Message.id
+            ).limit(
                 bulk
-            )
-            stmt = stmt.where(
-                Message.id.in_(stmt_subquery)
             ).with_for_update(
-                nowait=True
+                skip_locked=True
             )
+        else:
+            stmt_subquery = filter_messages(select(
+                Message.id
+            ).order_by(
+                Message.created_at,
+                Message.id
+            ))
+
+            # Step 1:
+            # MySQL does not support limits in nested queries, limit on the outer query instead.
+            # This is not as performant, but the best we can get from MySQL.
+            # FIXME: SQLAlchemy generates wrong nowait MySQL8 statement for MySQL5
+            #        Remove once this is resolved in SQLAlchemy
+            if dialect.name == 'mysql':
+                stmt = stmt.where(
+                    Message.id.in_(stmt_subquery)
+                ).limit(
+                    bulk
+                )
+            else:
+                # Oracle does not allow FOR UPDATE with a limit, the limit is on the subquery.
+                stmt_subquery = stmt_subquery.limit(
+                    bulk
+                )
+                stmt = stmt.where(
+                    Message.id.in_(stmt_subquery)
+                )
+                if skip_locked:
+                    stmt = stmt.with_for_update(
+                        skip_locked=True
+                    )
+                else:
+                    stmt = stmt.with_for_update(
+                        nowait=True
+                    )
 
         # Step 2:
-        # MySQL does not support limits in nested queries, limit on the outer query instead.
-        # This is not as performant, but the best we can get from MySQL.
-        if session.bind.dialect.name == 'mysql':
-            stmt = stmt.limit(
-                bulk
-            )
-
-        # Step 3:
         # Assemble message object
         for id_, created_at, event_type, payload, services in session.execute(stmt).all():
             message = {'id': id_,
@@ -206,25 +251,27 @@ def delete_messages(messages: "MessagesListType", *, session: "Session") -> None
 
     :param messages: The messages to delete as a list of dictionaries.
     """
-    message_condition = []
+    message_ids = []
     for message in messages:
-        message_condition.append(Message.id == message['id'])
+        message_ids.append(message['id'])
         if len(message['payload']) > MAX_MESSAGE_LENGTH:
             message['payload_nolimit'] = message.pop('payload')
 
     try:
-        if message_condition:
-            stmt = delete(
-                Message
-            ).prefix_with(
-                '/*+ INDEX(messages MESSAGES_ID_PK) */',
-                dialect='oracle'
-            ).where(
-                or_(*message_condition)
-            ).execution_options(
-                synchronize_session=False
-            )
-            session.execute(stmt)
+        if message_ids:
+            # The ids are random GUIDs, delete them by chunks of primary keys rather than by ranges
+            for chunk in chunks(message_ids, 1000):
+                stmt = delete(
+                    Message
+                ).prefix_with(
+                    '/*+ INDEX(messages MESSAGES_ID_PK) */',
+                    dialect='oracle'
+                ).where(
+                    Message.id.in_(chunk)
+                ).execution_options(
+                    synchronize_session=False
+                )
+                session.execute(stmt)
 
             stmt = insert(
                 MessageHistory
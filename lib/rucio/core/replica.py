@@ -33,7 +33,7 @@ from sqlalchemy import and_, delete, exists, func, insert, not_, or_, union, upd
 from sqlalchemy.exc import DatabaseError, IntegrityError
 from sqlalchemy.orm import aliased
 from sqlalchemy.orm.exc import FlushError, NoResultFound
-from sqlalchemy.sql.expression import ColumnElement, case, false, literal, literal_column, null, select, text, true
+from sqlalchemy.sql.expression import ColumnElement, bindparam, case, false, literal, literal_column, null, select, text, true
 
 import rucio.core.did
 import rucio.core.lock
@@ -2808,12 +2808,14 @@ def touch_replica(
     Update the accessed_at timestamp of the given file replica/DID but don't wait if row is locked.
 
     :param replica: a dictionary with the information of the affected replica.
+                    An optional access_cnt gives the number of accesses to count, 1 by default.
     :param session: The database session in use.
 
     :returns: True, if successful, False otherwise.
     """
     try:
         accessed_at, none_value = replica.get('accessed_at') or datetime.utcnow(), None
+        access_cnt = replica.get('access_cnt', 1)
 
         stmt = select(
             models.RSEFileAssociation
@@ -2841,7 +2843,8 @@ def touch_replica(
         ).values({
             models.RSEFileAssociation.accessed_at: accessed_at,
             models.RSEFileAssociation.tombstone: case(
-                (models.RSEFileAssociation.tombstone.not_in([OBSOLETE, none_value]),
+                (and_(models.RSEFileAssociation.tombstone != none_value,
+                      models.RSEFileAssociation.tombstone != OBSOLETE),
                  accessed_at),
                 else_=models.RSEFileAssociation.tombstone)
         }).execution_options(
@@ -2875,8 +2878,8 @@ def touch_replica(
         ).values({
             models.DataIdentifier.accessed_at: accessed_at,
             models.DataIdentifier.access_cnt: case(
-                (models.DataIdentifier.access_cnt == none_value, 1),
-                else_=(models.DataIdentifier.access_cnt + 1)
+                (models.DataIdentifier.access_cnt == none_value, access_cnt),
+                else_=(models.DataIdentifier.access_cnt + access_cnt)
             )  # type: ignore
         }).execution_options(
             synchronize_session=False
@@ -2891,6 +2894,106 @@ def touch_replica(
     return True
 
 
+@transactional_session
+def touch_replicas(
+    replicas: "Sequence[dict[str, Any]]",
+    *,
+    session: "Session"
+) -> bool:
+    """
+    Update the accessed_at timestamp of several file replicas and of their DIDs, with one
+    UPDATE statement per table, but don't wait if any of the rows is locked.
+
+    :param replicas: a list of dictionaries with the scope, name, rse_id and accessed_at of the replicas.
+                     An optional access_cnt gives the number of accesses to count, 1 by default.
+    :param session: The database session in use.
+
+    :returns: True, if successful, False otherwise. If False is returned because one of the rows is
+              locked, nothing was updated. If the UPDATE of the DIDs fails, the replicas may already
+              be updated in the transaction of the session.
+    """
+    now, none_value = datetime.utcnow(), None
+    replica_values = []
+    did_values = {}  # {(scope, name): {'b_scope':, 'b_name':, 'b_accessed_at':, 'b_access_cnt':}}
+    for replica in replicas:
+        accessed_at = replica.get('accessed_at') or now
+        replica_values.append({'b_scope': replica['scope'], 'b_name': replica['name'], 'b_rse_id': replica['rse_id'], 'b_accessed_at': accessed_at})
+        did = did_values.setdefault((replica['scope'], replica['name']),
+                                    {'b_scope': replica['scope'], 'b_name': replica['name'], 'b_accessed_at': accessed_at, 'b_access_cnt': 0})
+        did['b_accessed_at'] = max(did['b_accessed_at'], accessed_at)
+        did['b_access_cnt'] += replica.get('access_cnt', 1)
+    if not replica_values:
+        return True
+
+    try:
+        # Lock all the rows beforehand, so that this fails instead of waiting for a locked row
+        for chunk in chunks(replica_values, 50):
+            stmt = select(
+                models.RSEFileAssociation.rse_id
+            ).where(
+                or_(*[and_(models.RSEFileAssociation.rse_id == values['b_rse_id'],
+                           models.RSEFileAssociation.scope == values['b_scope'],
+                           models.RSEFileAssociation.name == values['b_name']) for values in chunk])
+            ).with_for_update(
+                nowait=True
+            )
+            session.execute(stmt).all()
+        for chunk in chunks(list(did_values.values()), 50):
+            stmt = select(
+                models.DataIdentifier.scope
+            ).where(
+                and_(or_(*[and_(models.DataIdentifier.scope == values['b_scope'],
+                                models.DataIdentifier.name == values['b_name']) for values in chunk]),
+                     models.DataIdentifier.did_type == DIDType.FILE)
+            ).with_for_update(
+                nowait=True
+            )
+            session.execute(stmt).all()
+
+        # Executed on the connection, as the bulk ORM UPDATE does not support these WHERE criteria
+        accessed_at = bindparam('b_accessed_at', type_=models.RSEFileAssociation.accessed_at.type)
+        stmt = update(
+            models.RSEFileAssociation
+        ).where(
+            and_(models.RSEFileAssociation.rse_id == bindparam('b_rse_id'),
+                 models.RSEFileAssociation.scope == bindparam('b_scope'),
+                 models.RSEFileAssociation.name == bindparam('b_name'))
+        ).prefix_with(
+            '/*+ INDEX(REPLICAS REPLICAS_PK) */', dialect='oracle'
+        ).values({
+            models.RSEFileAssociation.accessed_at: accessed_at,
+            models.RSEFileAssociation.tombstone: case(
+                (and_(models.RSEFileAssociation.tombstone != none_value,
+                      models.RSEFileAssociation.tombstone != OBSOLETE),
+                 accessed_at),
+                else_=models.RSEFileAssociation.tombstone)
+        })
+        session.connection().execute(stmt, replica_values)
+
+        access_cnt = bindparam('b_access_cnt', type_=models.DataIdentifier.access_cnt.type)
+        stmt = update(
+            models.DataIdentifier
+        ).where(
+            and_(models.DataIdentifier.scope == bindparam('b_scope'),
+                 models.DataIdentifier.name == bindparam('b_name'),
+                 models.DataIdentifier.did_type == DIDType.FILE)
+        ).prefix_with(
+            '/*+ INDEX(DIDS DIDS_PK) */', dialect='oracle'
+        ).values({
+            models.DataIdentifier.accessed_at: bindparam('b_accessed_at', type_=models.DataIdentifier.accessed_at.type),
+            models.DataIdentifier.access_cnt: case(
+                (models.DataIdentifier.access_cnt == none_value, access_cnt),
+                else_=(models.DataIdentifier.access_cnt + access_cnt)
+            )  # type: ignore
+        })
+        session.connection().execute(stmt, list(did_values.values()))
+
+    except DatabaseError:
+        return False
+
+    return True
+
+
 @transactional_session
 def update_replica_state(
     rse_id: str,
@@ -159,59 +159,53 @@ class RSESelector:
         :raises:                             InsufficientAccountLimit, InsufficientTargetRSEs
         """
 
-        blocklist = blocklist or []
-        result = []
-        rses = self.rses
+        blocklist = set(blocklist or [])
+        existing_rse_size = existing_rse_size or {}
         count = self.copies if copies == 0 else copies
 
-        # Remove blocklisted rses
-        if blocklist:
-            rses = [rse for rse in self.rses if rse['rse_id'] not in blocklist]
-        if len(rses) < count:
+        # Filter the candidates in a single pass, counting how many survive each
+        # constraint so that the most specific error can still be raised.
+        rses = []
+        n_unblocked = n_with_space = n_with_quota = 0
+        for rse in self.rses:
+            if rse['rse_id'] in blocklist:
+                continue
+            n_unblocked += 1
+            # Account for the files already at each rse
+            if rse['space_left'] < size - existing_rse_size.get(rse['rse_id'], 0):
+                continue
+            n_with_space += 1
+            if rse['quota_left'] <= size:
+                continue
+            n_with_quota += 1
+            if any(quota_left < size for quota_left in rse.get('global_quota_left', {}).values()):
+                continue
+            rses.append(rse)
+
+        if n_unblocked < count:
             raise InsufficientTargetRSEs('There are not enough target RSEs to fulfil the request at this time.')
-
-        # Remove rses which do not have enough space, accounting for the files already at each rse
-        if existing_rse_size is None:
-            existing_rse_size = {}
-        rses = [rse for rse in rses if rse['space_left'] >= size - existing_rse_size.get(rse['rse_id'], 0)]
-        if len(rses) < count:
+        if n_with_space < count:
             raise RSEOverQuota('There is insufficient space on any of the target RSE\'s to fulfill the operation.')
-
-        # Remove rses which do not have enough local quota
-        rses = [rse for rse in rses if rse['quota_left'] > size]
-        if len(rses) < count:
+        if n_with_quota < count or len(rses) < count:
             raise InsufficientAccountLimit('There is insufficient quota on any of the target RSE\'s to fulfill the operation.')
 
-        # Remove rses which do not have enough global quota
-        rses_with_enough_quota = []
-        for rse in rses:
-            enough_global_quota = True
-            for rse_expression in rse.get('global_quota_left', []):
-                if rse['global_quota_left'][rse_expression] < size:
-                    enough_global_quota = False
-                    break
-            if enough_global_quota:
-                rses_with_enough_quota.append(rse)
-        rses = rses_with_enough_quota
-        if len(rses) < count:
-            raise InsufficientAccountLimit('There is insufficient quota on any of the target RSE\'s to fulfill the operation.')
+        # Prioritize the preferred rses, keeping the order in which they were given
+        rses_dict = {rse['rse_id']: rse for rse in rses}
+        preferred_rses = [rses_dict[rse_id] for rse_id in preferred_rse_ids if rse_id in rses_dict]
 
-        for copy in range(count):
-            # Remove rses already in the result set
-            rses = [rse for rse in rses if rse['rse_id'] not in [item[0] for item in result]]
-            rses_dict = {}
-            for rse in rses:
-                rses_dict[rse['rse_id']] = rse
-            # Prioritize the preferred rses
-            preferred_rses = [rses_dict[rse_id] for rse_id in preferred_rse_ids if rse_id in rses_dict]
+        result = []
+        for _ in range(count):
             if prioritize_order_over_weight and preferred_rses:
-                rse = (preferred_rses[0]['rse_id'], preferred_rses[0]['staging_area'], preferred_rses[0]['availability_write'])
+                rse = preferred_rses[0]
             elif preferred_rses:
                 rse = self.__choose_rse(preferred_rses)
             else:
                 rse = self.__choose_rse(rses)
-            result.append(rse)
+            result.append((rse['rse_id'], rse['staging_area'], rse['availability_write']))
             self.__update_quota(rse, size)
+            # Remove rses already in the result set
+            rses = [candidate for candidate in rses if candidate['rse_id'] != rse['rse_id']]
+            preferred_rses = [candidate for candidate in preferred_rses if candidate['rse_id'] != rse['rse_id']]
         return result
 
     def get_rse_dictionary(self):
@@ -229,32 +223,31 @@ class RSESelector:
         """
         Update the internal quota value.
 
-        :param rse:      RSE tuple to update.
+        :param rse:      RSE dictionary to update.
         :param size:     Size to subtract.
         """
 
-        for element in self.rses:
-            if element['rse_id'] == rse[0]:
-                element['quota_left'] -= size
-                for rse_expression in element.get('global_quota_left', []):
-                    element['global_quota_left'][rse_expression] -= size
-                return
+        rse['quota_left'] -= size
+        for rse_expression in rse.get('global_quota_left', []):
+            rse['global_quota_left'][rse_expression] -= size
 
     def __choose_rse(self, rses):
         """
         Choose an RSE based on weighting.
 
         :param rses:  The rses to be considered for the choose.
-        :return:      The (rse_id, staging_area) tuple of the chosen RSE.
+        :return:      The RSE dictionary of the chosen RSE.
         """
 
+        rses = list(rses)
         shuffle(rses)
         pick = uniform(0, sum([rse['weight'] for rse in rses]))  # noqa: S311
         weight = 0
         for rse in rses:
             weight += rse['weight']
             if pick <= weight:
-                return (rse['rse_id'], rse['staging_area'], rse['availability_write'])
+                return rse
+        return rses[-1]
 
 
 @read_session
@@ -23,20 +23,20 @@ from string import Template
 from typing import TYPE_CHECKING, Any, Literal, Optional, TypeVar, Union
 
 from dogpile.cache.api import NoValue
-from sqlalchemy import delete, desc, select, update
+from sqlalchemy import delete, desc, exists, insert, select, update
 from sqlalchemy.exc import (
     IntegrityError,
     NoResultFound,  # https://pydoc.dev/sqlalchemy/latest/sqlalchemy.exc.NoResultFound.html
     StatementError,
 )
 from sqlalchemy.sql import func
-from sqlalchemy.sql.expression import and_, false, null, or_, true, tuple_
+from sqlalchemy.sql.expression import and_, case, false, null, or_, true, tuple_
 
 import rucio.core.did
 import rucio.core.lock  # import get_replica_locks, get_files_and_replica_locks_of_dataset
 import rucio.core.replica  # import get_and_lock_file_replicas, get_and_lock_file_replicas_for_dataset
 from rucio.common.cache import MemcacheRegion
-from rucio.common.config import config_get
+from rucio.common.config import config_get, config_get_bool
 from rucio.common.constants import DEFAULT_ACTIVITY, DEFAULT_VO, POLICY_ALGORITHM_TYPES_LITERAL, RseAttr
 from rucio.common.exception import (
     DataIdentifierNotFound,
@@ -81,9 +81,10 @@ from rucio.core.rule_grouping import apply_rule, apply_rule_grouping, create_tra
 from rucio.db.sqla import filter_thread_work, models
 from rucio.db.sqla.constants import OBSOLETE, BadFilesStatus, DIDAvailability, DIDReEvaluation, DIDType, LockState, ReplicaState, RequestType, RSEType, RuleGrouping, RuleNotification, RuleState
 from rucio.db.sqla.session import read_session, stream_session, transactional_session
+from rucio.db.sqla.util import temp_table_mngr
 
 if TYPE_CHECKING:
-    from collections.abc import Callable, Iterator, Sequence
+    from collections.abc import Callable, Iterable, Iterator, Sequence
 
     from sqlalchemy.orm import Session
 
@@ -512,23 +513,29 @@ def add_rules(
         rule_ids = {}
 
         # 1. Fetch the RSEs from the RSE expression to restrict further queries just on these RSEs
-        restrict_rses = []
-        all_source_rses = []
+        #    Rules sharing the same account and RSE expression resolve it only once
+        rule_rses = {}        # {(account, rse_expression, ignore_availability): [rses]}
+        rule_source_rses = {}  # {(vo, source_replica_expression): [rses]}
         with METRICS.timer('add_rules.parse_rse_expressions'):
             for rule in rules:
-                vo = rule['account'].vo
-                if rule.get('ignore_availability'):
-                    restrict_rses.extend(parse_expression(rule['rse_expression'], filter_={'vo': vo}, session=session))
-                else:
-                    restrict_rses.extend(parse_expression(rule['rse_expression'], filter_={'vo': vo, 'availability_write': True}, session=session))
-            restrict_rses = list(set([rse['id'] for rse in restrict_rses]))
+                rses_key = (rule['account'], rule['rse_expression'], bool(rule.get('ignore_availability')))
+                if rses_key not in rule_rses:
+                    vo = rule['account'].vo
+                    if rule.get('ignore_availability'):
+                        rule_rses[rses_key] = parse_expression(rule['rse_expression'], filter_={'vo': vo}, session=session)
+                    else:
+                        rule_rses[rses_key] = parse_expression(rule['rse_expression'], filter_={'vo': vo, 'availability_write': True}, session=session)
+            restrict_rses = list(set([rse['id'] for rses in rule_rses.values() for rse in rses]))
 
             for rule in rules:
                 if rule.get('source_replica_expression'):
-                    vo = rule['account'].vo
-                    all_source_rses.extend(parse_expression(rule.get('source_replica_expression'), filter_={'vo': vo}, session=session))
-            all_source_rses = list(set([rse['id'] for rse in all_source_rses]))
+                    source_rses_key = (rule['account'].vo, rule['source_replica_expression'])
+                    if source_rses_key not in rule_source_rses:
+                        rule_source_rses[source_rses_key] = parse_expression(rule['source_replica_expression'], filter_={'vo': source_rses_key[0]}, session=session)
+            all_source_rses = list(set([rse['id'] for rses in rule_source_rses.values() for rse in rses]))
 
+        prepared_rules = {}  # {rule index: (rses, source_rses, rseselector)}
+        rse_selectors = {}   # {(account, rse_expression, ignore_availability, weight, copies, ask_approval): rseselector}
         for elem in dids:
             # 2. Get the DID
             with METRICS.timer('add_rules.get_did'):
@@ -602,49 +609,53 @@ def add_rules(
                                                                                                      source_rses=all_source_rses,
                                                                                                      session=session)
 
-            for rule in rules:
+            rule_creations = []
+            for idx, rule in enumerate(rules):
                 with METRICS.timer('add_rules.add_rule'):
-                    # 4. Resolve the rse_expression into a list of RSE-ids
-                    vo = rule['account'].vo
-                    if rule.get('ignore_availability'):
-                        rses = parse_expression(rule['rse_expression'], filter_={'vo': vo}, session=session)
-                    else:
-                        rses = parse_expression(rule['rse_expression'], filter_={'vo': vo, 'availability_write': True}, session=session)
+                    # 4. Resolve the rule settings which do not depend on the DID, once per rule
+                    if idx not in prepared_rules:
+                        rses_key = (rule['account'], rule['rse_expression'], bool(rule.get('ignore_availability')))
+                        rses = rule_rses[rses_key]
 
-                    if rule.get('lifetime', None) is None:  # Check if one of the rses is a staging area
-                        if [rse for rse in rses if rse.get('staging_area', False)]:
-                            raise StagingAreaRuleRequiresLifetime()
+                        if rule.get('lifetime', None) is None:  # Check if one of the rses is a staging area
+                            if [rse for rse in rses if rse.get('staging_area', False)]:
+                                raise StagingAreaRuleRequiresLifetime()
 
-                    # Check SCRATCHDISK Policy
-                    try:
-                        lifetime = get_scratch_policy(rule.get('account'), rses, rule.get('lifetime', None), session=session)
-                    except UndefinedPolicy:
-                        lifetime = rule.get('lifetime', None)
+                        # Check SCRATCHDISK Policy
+                        try:
+                            lifetime = get_scratch_policy(rule.get('account'), rses, rule.get('lifetime', None), session=session)
+                        except UndefinedPolicy:
+                            lifetime = rule.get('lifetime', None)
 
-                    rule['lifetime'] = lifetime
+                        rule['lifetime'] = lifetime
 
-                    # 4.5 Get the lifetime
-                    eol_at = define_eol(did.scope, did.name, rses, session=session)
+                        # Auto-lock rules for TAPE rses
+                        if not rule.get('locked', False) and rule.get('lifetime', None) is None:
+                            if [rse for rse in rses if rse.get('rse_type', RSEType.DISK) == RSEType.TAPE]:
+                                rule['locked'] = True
 
-                    # Auto-lock rules for TAPE rses
-                    if not rule.get('locked', False) and rule.get('lifetime', None) is None:
-                        if [rse for rse in rses if rse.get('rse_type', RSEType.DISK) == RSEType.TAPE]:
-                            rule['locked'] = True
+                        # Block manual approval if RSE does not allow it
+                        if rule.get('ask_approval', False):
+                            for rse in rses:
+                                if list_rse_attributes(rse_id=rse['id'], session=session).get(RseAttr.BLOCK_MANUAL_APPROVAL, False):
+                                    raise ManualRuleApprovalBlocked()
 
-                    # Block manual approval if RSE does not allow it
-                    if rule.get('ask_approval', False):
-                        for rse in rses:
-                            if list_rse_attributes(rse_id=rse['id'], session=session).get(RseAttr.BLOCK_MANUAL_APPROVAL, False):
-                                raise ManualRuleApprovalBlocked()
+                        if rule.get('source_replica_expression'):
+                            source_rses = rule_source_rses[(rule['account'].vo, rule['source_replica_expression'])]
+                        else:
+                            source_rses = []
 
-                    if rule.get('source_replica_expression'):
-                        source_rses = parse_expression(rule.get('source_replica_expression'), filter_={'vo': vo}, session=session)
-                    else:
-                        source_rses = []
+                        # 5. Create the RSE selector, shared by the rules with the same account, RSEs and quota settings
+                        selector_key = rses_key + (rule.get('weight'), rule['copies'], rule.get('ask_approval', False))
+                        if selector_key not in rse_selectors:
+                            with METRICS.timer('add_rules.create_rse_selector'):
+                                rse_selectors[selector_key] = RSESelector(account=rule['account'], rses=rses, weight=rule.get('weight'), copies=rule['copies'], ignore_account_limit=rule.get('ask_approval', False), session=session)
+                        prepared_rules[idx] = (rses, source_rses, rse_selectors[selector_key])
 
-                    # 5. Create the RSE selector
-                    with METRICS.timer('add_rules.create_rse_selector'):
-                        rseselector = RSESelector(account=rule['account'], rses=rses, weight=rule.get('weight'), copies=rule['copies'], ignore_account_limit=rule.get('ask_approval', False), session=session)
+                    rses, source_rses, rseselector = prepared_rules[idx]
+
+                    # 4.5 Get the lifetime
+                    eol_at = define_eol(did.scope, did.name, rses, session=session)
 
                     # 4. Create the replication rule
                     with METRICS.timer('add_rules.create_rule'):
@@ -734,64 +745,75 @@ def add_rules(
                         logger(logging.DEBUG, "Created rule %s for injection due to Split Container mode", str(new_rule.id))
                         continue
 
-                    # 5. Apply the replication rule to create locks, replicas and transfers
-                    with METRICS.timer('add_rules.create_locks_replicas_transfers'):
+                    # 5. Apply the replication rule to compute the locks, replicas and transfers
+                    with METRICS.timer('add_rules.apply_rule_grouping'):
+                        logger(logging.DEBUG, "Creating locks and replicas for rule %s [%d/%d/%d]", str(new_rule.id), new_rule.locks_ok_cnt, new_rule.locks_replicating_cnt, new_rule.locks_stuck_cnt)
                         try:
-                            __create_locks_replicas_transfers(datasetfiles=datasetfiles,
-                                                              locks=locks,
-                                                              replicas=replicas,
-                                                              source_replicas=source_replicas,
-                                                              rseselector=rseselector,
-                                                              rule=new_rule,
-                                                              preferred_rse_ids=[],
-                                                              source_rses=[rse['id'] for rse in source_rses],
-                                                              session=session)
+                            # Each rule starts from the quota of a fresh selector, as if it was created individually
+                            rule_creations.append((new_rule, apply_rule_grouping(datasetfiles=datasetfiles,
+                                                                                 locks=locks,
+                                                                                 replicas=replicas,
+                                                                                 source_replicas=source_replicas,
+                                                                                 rseselector=deepcopy(rseselector),
+                                                                                 rule=new_rule,
+                                                                                 preferred_rse_ids=[],
+                                                                                 source_rses=[rse['id'] for rse in source_rses],
+                                                                                 session=session)))
                         except IntegrityError as error:
                             raise ReplicationRuleCreationTemporaryFailed(error.args[0]) from error
 
-                    if new_rule.locks_stuck_cnt > 0:
-                        new_rule.state = RuleState.STUCK
-                        new_rule.error = 'MissingSourceReplica'
-                        if new_rule.grouping != RuleGrouping.NONE:
-                            stmt = update(
-                                models.DatasetLock
-                            ).where(
-                                models.DatasetLock.rule_id == new_rule.id
-                            ).values({
-                                models.DatasetLock.state: LockState.STUCK
-                            })
-                            session.execute(stmt)
-                    elif new_rule.locks_replicating_cnt == 0:
-                        new_rule.state = RuleState.OK
-                        if new_rule.grouping != RuleGrouping.NONE:
-                            stmt = update(
-                                models.DatasetLock
-                            ).where(
-                                models.DatasetLock.rule_id == new_rule.id
-                            ).values({
-                                models.DatasetLock.state: LockState.OK
-                            })
-                            session.execute(stmt)
-                            session.flush()
-                        if new_rule.notification == RuleNotification.YES:
-                            generate_email_for_rule_ok_notification(rule=new_rule, session=session)
-                        generate_rule_notifications(rule=new_rule, replicating_locks_before=0, session=session)
-                    else:
-                        new_rule.state = RuleState.REPLICATING
-                        if new_rule.grouping != RuleGrouping.NONE:
-                            stmt = update(
-                                models.DatasetLock
-                            ).where(
-                                models.DatasetLock.rule_id == new_rule.id
-                            ).values({
-                                models.DatasetLock.state: LockState.REPLICATING
-                            })
-                            session.execute(stmt)
+            # 6. Insert the locks, replicas and transfers of all rules of this DID together
+            if rule_creations:
+                with METRICS.timer('add_rules.create_locks_replicas_transfers'):
+                    try:
+                        __bulk_create_locks_replicas_transfers(rule_creations=rule_creations, session=session, logger=logger)
+                    except IntegrityError as error:
+                        raise ReplicationRuleCreationTemporaryFailed(error.args[0]) from error
+
+            for new_rule, _ in rule_creations:
+                if new_rule.locks_stuck_cnt > 0:
+                    new_rule.state = RuleState.STUCK
+                    new_rule.error = 'MissingSourceReplica'
+                    if new_rule.grouping != RuleGrouping.NONE:
+                        stmt = update(
+                            models.DatasetLock
+                        ).where(
+                            models.DatasetLock.rule_id == new_rule.id
+                        ).values({
+                            models.DatasetLock.state: LockState.STUCK
+                        })
+                        session.execute(stmt)
+                elif new_rule.locks_replicating_cnt == 0:
+                    new_rule.state = RuleState.OK
+                    if new_rule.grouping != RuleGrouping.NONE:
+                        stmt = update(
+                            models.DatasetLock
+                        ).where(
+                            models.DatasetLock.rule_id == new_rule.id
+                        ).values({
+                            models.DatasetLock.state: LockState.OK
+                        })
+                        session.execute(stmt)
+                        session.flush()
+                    if new_rule.notification == RuleNotification.YES:
+                        generate_email_for_rule_ok_notification(rule=new_rule, session=session)
+                    generate_rule_notifications(rule=new_rule, replicating_locks_before=0, session=session)
+                else:
+                    new_rule.state = RuleState.REPLICATING
+                    if new_rule.grouping != RuleGrouping.NONE:
+                        stmt = update(
+                            models.DatasetLock
+                        ).where(
+                            models.DatasetLock.rule_id == new_rule.id
+                        ).values({
+                            models.DatasetLock.state: LockState.REPLICATING
+                        })
+                        session.execute(stmt)
 
-                    # Add rule to History
-                    insert_rule_history(rule=new_rule, recent=True, longterm=True, session=session)
+                # Add rule to History
+                insert_rule_history(rule=new_rule, recent=True, longterm=True, session=session)
 
-                    logger(logging.INFO, "Created rule %s [%d/%d/%d] in state %s", str(new_rule.id), new_rule.locks_ok_cnt, new_rule.locks_replicating_cnt, new_rule.locks_stuck_cnt, str(new_rule.state))
+                logger(logging.INFO, "Created rule %s [%d/%d/%d] in state %s", str(new_rule.id), new_rule.locks_ok_cnt, new_rule.locks_replicating_cnt, new_rule.locks_stuck_cnt, str(new_rule.state))
 
     return rule_ids
 
@@ -1248,6 +1270,254 @@ def delete_rule(
             transfer_core.cancel_transfers(transfers_to_cancel)
 
 
+@transactional_session
+def delete_rules(
+    rule_ids: "Iterable[str]",
+    purge_replicas: Optional[bool] = None,
+    delete_parent: bool = False,
+    nowait: bool = False,
+    *,
+    session: "Session",
+    ignore_rule_lock: bool = False,
+    logger: LoggerFunction = logging.log
+) -> None:
+    """
+    Delete several replication rules at once.
+
+    Set-based counterpart of a hard :func:`delete_rule` for many rules: the affected locks, replicas,
+    dataset locks, account counters and rule history are handled with a fixed number of statements
+    joined against a temporary table of rule ids, instead of a round trip per lock.
+
+    :param rule_ids:          The rules to delete.
+    :param purge_replicas:    Purge the replicas immediately. If None, the setting of each rule is used.
+    :param delete_parent:     Delete rules even if they have a child_rule_id set.
+    :param nowait:            Nowait parameter for the FOR UPDATE statements.
+    :param session:           The database session in use.
+    :param ignore_rule_lock:  Ignore any locks on the rules.
+    :param logger:            Optional decorated logger that can be passed from the calling daemons or servers.
+    :raises:                  RuleNotFound if one of the rules cannot be found.
+    :raises:                  UnsupportedOperation if one of the rules is locked or has a child rule.
+    """
+    rule_ids = set(rule_ids)
+    if not rule_ids:
+        return
+
+    with METRICS.timer('delete_rules.total'):
+        rules_temp_table = temp_table_mngr(session).create_id_table()
+        stmt = insert(
+            rules_temp_table
+        )
+        session.execute(stmt, [{'id': rule_id} for rule_id in rule_ids])
+
+        stmt = select(
+            models.ReplicationRule
+        ).where(
+            models.ReplicationRule.id.in_(select(rules_temp_table.id))
+        ).with_for_update(
+            nowait=nowait
+        )
+        rules = session.execute(stmt).scalars().all()
+
+        missing_rule_ids = rule_ids - {rule.id for rule in rules}
+        if missing_rule_ids:
+            raise RuleNotFound('No rule with the id %s found' % ', '.join(str(rule_id) for rule_id in missing_rule_ids))
+
+        purging_rule_ids = set()
+        for rule in rules:
+            if rule.locked and not ignore_rule_lock:
+                raise UnsupportedOperation('The replication rule %s is locked and has to be unlocked before it can be deleted.' % str(rule.id))
+            if rule.child_rule_id is not None and not delete_parent:
+                raise UnsupportedOperation('The replication rule %s has a child rule and thus cannot be deleted.' % str(rule.id))
+            if purge_replicas if purge_replicas is not None else rule.purge_replicas:
+                purging_rule_ids.add(rule.id)
+
+        # Replicas are matched to the locks of the deleted rules with correlated subqueries
+        def locks_of_deleted_rules_exist(*whereclause):
+            return exists(
+            ).where(
+                and_(models.ReplicaLock.scope == models.RSEFileAssociation.scope,
+                     models.ReplicaLock.name == models.RSEFileAssociation.name,
+                     models.ReplicaLock.rse_id == models.RSEFileAssociation.rse_id,
+                     models.ReplicaLock.rule_id == rules_temp_table.id,
+                     *whereclause)
+            )
+
+        deleted_locks_exist = locks_of_deleted_rules_exist()
+        replicating_locks_exist = locks_of_deleted_rules_exist(models.ReplicaLock.state == LockState.REPLICATING)
+        tombstone_whens = [(models.RSEFileAssociation.state == ReplicaState.UNAVAILABLE, OBSOLETE),
+                           (models.RSEFileAssociation.accessed_at != null(), models.RSEFileAssociation.accessed_at)]
+        if purging_rule_ids:
+            purging_temp_table = temp_table_mngr(session).create_id_table()
+            stmt = insert(
+                purging_temp_table
+            )
+            session.execute(stmt, [{'id': rule_id} for rule_id in purging_rule_ids])
+            tombstone_whens.insert(0, (locks_of_deleted_rules_exist(models.ReplicaLock.rule_id.in_(select(purging_temp_table.id))), OBSOLETE))
+
+        # Lock the replicas before touching them
+        with METRICS.timer('delete_rules.replicas'):
+            stmt = select(
+                models.RSEFileAssociation.scope
+            ).where(
+                deleted_locks_exist
+            ).with_for_update(
+                nowait=nowait
+            )
+            session.execute(stmt).all()
+
+            deleted_locks_cnt = select(
+                func.count()
+            ).where(
+                and_(models.ReplicaLock.scope == models.RSEFileAssociation.scope,
+                     models.ReplicaLock.name == models.RSEFileAssociation.name,
+                     models.ReplicaLock.rse_id == models.RSEFileAssociation.rse_id,
+                     models.ReplicaLock.rule_id == rules_temp_table.id)
+            ).scalar_subquery()
+            stmt = update(
+                models.RSEFileAssociation
+            ).where(
+                deleted_locks_exist
+            ).values({
+                models.RSEFileAssociation.lock_cnt: models.RSEFileAssociation.lock_cnt - deleted_locks_cnt
+            }).execution_options(
+                synchronize_session=False
+            )
+            session.execute(stmt)
+
+            # Transfers of replicating locks which were the last lock on their replica have to be cancelled
+            stmt = select(
+                models.RSEFileAssociation.scope,
+                models.RSEFileAssociation.name,
+                models.RSEFileAssociation.rse_id
+            ).where(
+                and_(models.RSEFileAssociation.lock_cnt == 0,
+                     replicating_locks_exist)
+            )
+            transfers_to_delete = [{'scope': scope, 'name': name, 'rse_id': rse_id} for scope, name, rse_id in session.execute(stmt)]
+
+            stmt = update(
+                models.RSEFileAssociation
+            ).where(
+                and_(models.RSEFileAssociation.lock_cnt == 0,
+                     deleted_locks_exist)
+            ).values({
+                models.RSEFileAssociation.tombstone: case(*tombstone_whens, else_=models.RSEFileAssociation.created_at)
+            }).execution_options(
+                synchronize_session=False
+            )
+            session.execute(stmt)
+
+            if transfers_to_delete:
+                stmt = update(
+                    models.RSEFileAssociation
+                ).where(
+                    and_(models.RSEFileAssociation.lock_cnt == 0,
+                         replicating_locks_exist)
+                ).values({
+                    models.RSEFileAssociation.state: ReplicaState.UNAVAILABLE,
+                    models.RSEFileAssociation.tombstone: OBSOLETE
+                }).execution_options(
+                    synchronize_session=False
+                )
+                session.execute(stmt)
+
+        # Decrease account_counters
+        stmt = select(
+            models.ReplicationRule.account,
+            models.ReplicaLock.rse_id,
+            func.count(),
+            func.coalesce(func.sum(models.ReplicaLock.bytes), 0)
+        ).join_from(
+            rules_temp_table,
+            models.ReplicaLock,
+            models.ReplicaLock.rule_id == rules_temp_table.id
+        ).join(
+            models.ReplicationRule,
+            models.ReplicationRule.id == models.ReplicaLock.rule_id
+        ).group_by(
+            models.ReplicationRule.account,
+            models.ReplicaLock.rse_id
+        )
+        for account, rse_id, files, bytes_ in session.execute(stmt).all():
+            account_counter.decrease(rse_id=rse_id, account=account, files=files, bytes_=bytes_, session=session)
+
+        # Remove the locks and DatasetLocks
+        with METRICS.timer('delete_rules.locks'):
+            stmt = delete(
+                models.ReplicaLock
+            ).where(
+                models.ReplicaLock.rule_id.in_(select(rules_temp_table.id))
+            ).execution_options(
+                synchronize_session=False
+            )
+            rowcount = session.execute(stmt).rowcount
+            logger(logging.DEBUG, 'Deleted %s locks of %s rules', rowcount, len(rules))
+
+            stmt = delete(
+                models.DatasetLock
+            ).where(
+                models.DatasetLock.rule_id.in_(select(rules_temp_table.id))
+            ).execution_options(
+                synchronize_session=False
+            )
+            session.execute(stmt)
+
+        # Release parent rules which are not deleted themselves
+        stmt = select(
+            models.ReplicationRule
+        ).where(
+            and_(models.ReplicationRule.child_rule_id.in_(select(rules_temp_table.id)),
+                 models.ReplicationRule.id.not_in(select(rules_temp_table.id)))
+        )
+        for parent_rule in session.execute(stmt).scalars().all():
+            parent_rule.expires_at = None
+            parent_rule.child_rule_id = None
+            insert_rule_history(rule=parent_rule, recent=True, longterm=False, session=session)
+
+        # Insert history
+        history = []
+        for rule in rules:
+            values = {column.name: getattr(rule, column.name) for column in models.ReplicationRuleHistory.__table__.columns}
+            values['purge_replicas'] = rule.id in purging_rule_ids
+            history.append(values)
+        stmt = insert(
+            models.ReplicationRuleHistory
+        )
+        session.execute(stmt, history)
+
+        session.flush()
+        for rule in rules:
+            session.expunge(rule)
+
+        with METRICS.timer('delete_rules.rules'):
+            # Parent-child relations inside the deleted set must not block the deletion
+            stmt = update(
+                models.ReplicationRule
+            ).where(
+                and_(models.ReplicationRule.id.in_(select(rules_temp_table.id)),
+                     models.ReplicationRule.child_rule_id != null())
+            ).values({
+                models.ReplicationRule.child_rule_id: None
+            }).execution_options(
+                synchronize_session=False
+            )
+            session.execute(stmt)
+
+            stmt = delete(
+                models.ReplicationRule
+            ).where(
+                models.ReplicationRule.id.in_(select(rules_temp_table.id))
+            ).execution_options(
+                synchronize_session=False
+            )
+            session.execute(stmt)
+
+        for transfer in transfers_to_delete:
+            transfers_to_cancel = request_core.cancel_request_did(scope=transfer['scope'], name=transfer['name'],
+                                                                  dest_rse_id=transfer['rse_id'], session=session)
+            transfer_core.cancel_transfers(transfers_to_cancel)
+
+
 @transactional_session
 def repair_rule(
     rule_id: str,
@@ -3672,6 +3942,10 @@ def __evaluate_did_attach(
                 )
                 rules = session.execute(stmt).scalars().all()
             if rules:
+                # In bulk mode, the locks, replicas and transfers of all rules are inserted together at the end
+                bulk_evaluation = config_get_bool('rules', 'bulk_attach_evaluation', raise_exception=False, default=False, session=session)
+                rule_creations = []
+
                 # Resolve the new_child_dids to its locks
                 with METRICS.timer('evaluate_did_attach.resolve_did_to_locks_and_replicas'):
                     # Resolve the rules to possible target rses:
@@ -3782,15 +4056,26 @@ def __evaluate_did_attach(
 
                         locks_stuck_before = rule.locks_stuck_cnt
                         try:
-                            __create_locks_replicas_transfers(datasetfiles=datasetfiles,
-                                                              locks=locks,
-                                                              replicas=replicas,
-                                                              source_replicas=source_replicas,
-                                                              rseselector=rseselector,
-                                                              rule=rule,
-                                                              preferred_rse_ids=preferred_rse_ids,
-                                                              source_rses=[rse['id'] for rse in source_rses],
-                                                              session=session)
+                            if bulk_evaluation:
+                                rule_creations.append((rule, apply_rule_grouping(datasetfiles=datasetfiles,
+                                                                                 locks=locks,
+                                                                                 replicas=replicas,
+                                                                                 source_replicas=source_replicas,
+                                                                                 rseselector=rseselector,
+                                                                                 rule=rule,
+                                                                                 preferred_rse_ids=preferred_rse_ids,
+                                                                                 source_rses=[rse['id'] for rse in source_rses],
+                                                                                 session=session)))
+                            else:
+                                __create_locks_replicas_transfers(datasetfiles=datasetfiles,
+                                                                  locks=locks,
+                                                                  replicas=replicas,
+                                                                  source_replicas=source_replicas,
+                                                                  rseselector=rseselector,
+                                                                  rule=rule,
+                                                                  preferred_rse_ids=preferred_rse_ids,
+                                                                  source_rses=[rse['id'] for rse in source_rses],
+                                                                  session=session)
                         except (InsufficientAccountLimit, InsufficientTargetRSEs, RSEOverQuota) as error:
                             rule.state = RuleState.STUCK
                             rule.error = (str(error)[:245] + '...') if len(str(error)) > 245 else str(error)
@@ -3854,6 +4139,10 @@ def __evaluate_did_attach(
                         # Insert rule history
                         insert_rule_history(rule=rule, recent=True, longterm=False, session=session)
 
+                if rule_creations:
+                    with METRICS.timer('evaluate_did_attach.bulk_create_locks_replicas_transfers'):
+                        __bulk_create_locks_replicas_transfers(rule_creations=rule_creations, session=session, logger=logger)
+
             # Unflag the DIDs
             with METRICS.timer('evaluate_did_attach.update_did'):
                 for did in new_child_dids:
@@ -4119,15 +4408,26 @@ def __resolve_dids_to_locks_and_replicas(
                     else:
                         source_replicas[(scope, name)].append(rse_id)
     else:
-        # The evaluate_dids will be containers and/or datasets
+        # The evaluate_dids will be containers and/or datasets, fetch all of them at once
+        temp_table = temp_table_mngr(session).create_scope_name_table()
+        stmt = insert(
+            temp_table
+        )
+        session.execute(stmt, [{'scope': scope, 'name': name} for scope, name in {(did.child_scope, did.child_name) for did in dids}])
+        stmt = select(
+            models.DataIdentifier
+        ).join_from(
+            temp_table,
+            models.DataIdentifier,
+            and_(models.DataIdentifier.scope == temp_table.scope,
+                 models.DataIdentifier.name == temp_table.name)
+        )
+        real_dids = {(real_did.scope, real_did.name): real_did for real_did in session.execute(stmt).scalars()}
         for did in dids:
-            stmt = select(
-                models.DataIdentifier
-            ).where(
-                and_(models.DataIdentifier.scope == did.child_scope,
-                     models.DataIdentifier.name == did.child_name)
-            )
-            real_did = session.execute(stmt).scalar_one()
+            try:
+                real_did = real_dids[(did.child_scope, did.child_name)]
+            except KeyError as exc:
+                raise NoResultFound('DID %s:%s not found' % (did.child_scope, did.child_name)) from exc
             tmp_datasetfiles, tmp_locks, tmp_replicas, tmp_source_replicas = __resolve_did_to_locks_and_replicas(did=real_did,
                                                                                                                  nowait=nowait,
                                                                                                                  restrict_rses=restrict_rses,
@@ -4207,6 +4507,56 @@ def __create_locks_replicas_transfers(
     logger(logging.DEBUG, "Finished creating locks and replicas for rule %s [%d/%d/%d]", str(rule.id), rule.locks_ok_cnt, rule.locks_replicating_cnt, rule.locks_stuck_cnt)
 
 
+@transactional_session
+def __bulk_create_locks_replicas_transfers(
+    rule_creations: 'Sequence[tuple[models.ReplicationRule, tuple[dict[str, list[models.RSEFileAssociation]], dict[str, list[models.ReplicaLock]], list[dict[str, Any]]]]]',
+    *,
+    session: "Session",
+    logger: LoggerFunction = logging.log
+) -> None:
+    """
+    Insert the replicas, locks and transfers computed by apply_rule_grouping for several rules at once.
+
+    :param rule_creations:  List of (rule, (replicas_to_create, locks_to_create, transfers_to_create)) tuples.
+    :param session:         Session of the db.
+    :param logger:          Optional decorated logger that can be passed from the calling daemons or servers.
+    """
+
+    replicas_to_create = []
+    locks_to_create = []
+    transfers_to_create = []
+    rse_counter_increases = {}      # {rse_id: [files, bytes]}
+    account_counter_increases = {}  # {(account, rse_id): [files, bytes]}
+    for rule, (rule_replicas, rule_locks, rule_transfers) in rule_creations:
+        for rse_id, rse_replicas in rule_replicas.items():
+            replicas_to_create.extend(rse_replicas)
+            counter = rse_counter_increases.setdefault(rse_id, [0, 0])
+            counter[0] += len(rse_replicas)
+            counter[1] += sum([replica.bytes for replica in rse_replicas])
+        for rse_id, rse_locks in rule_locks.items():
+            locks_to_create.extend(rse_locks)
+            counter = account_counter_increases.setdefault((rule.account, rse_id), [0, 0])
+            counter[0] += len(rse_locks)
+            counter[1] += sum([lock.bytes for lock in rse_locks])
+        transfers_to_create.extend(rule_transfers)
+        logger(logging.DEBUG, "Rule %s  [%d/%d/%d] queued %d transfers", str(rule.id), rule.locks_ok_cnt, rule.locks_replicating_cnt, rule.locks_stuck_cnt, len(rule_transfers))
+
+    # Add the replicas and locks of all rules
+    session.add_all(replicas_to_create)
+    session.flush()
+    session.add_all(locks_to_create)
+    session.flush()
+
+    for rse_id, (files, bytes_) in rse_counter_increases.items():
+        rse_counter.increase(rse_id=rse_id, files=files, bytes_=bytes_, session=session)
+    for (account, rse_id), (files, bytes_) in account_counter_increases.items():
+        account_counter.increase(rse_id=rse_id, account=account, files=files, bytes_=bytes_, session=session)
+
+    request_core.queue_requests(requests=transfers_to_create, session=session, logger=logger)
+    session.flush()
+    logger(logging.DEBUG, "Created %d replicas, %d locks and %d transfers for %d rules", len(replicas_to_create), len(locks_to_create), len(transfers_to_create), len(rule_creations))
+
+
 @transactional_session
 def __delete_lock_and_update_replica(
     lock: models.ReplicaLock,
@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import logging
+from collections import Counter
 from datetime import datetime
 from typing import TYPE_CHECKING, Any, Optional
 
@@ -33,13 +34,15 @@ from rucio.db.sqla.constants import OBSOLETE, DIDType, LockState, ReplicaState,
 from rucio.db.sqla.session import transactional_session
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
+    from collections.abc import Iterable, Sequence
 
     from sqlalchemy.orm import Session
 
     from rucio.common.types import InternalScope
     from rucio.core.rse_selector import RSESelector
 
+__COVERAGE_STATES = frozenset((ReplicaState.AVAILABLE, ReplicaState.COPYING, ReplicaState.TEMPORARY_UNAVAILABLE))
+
 
 @transactional_session
 def apply_rule_grouping(
@@ -367,25 +370,12 @@ def __apply_rule_to_files_all_grouping(
     preferred_rse_ids = preferred_rse_ids or []
     source_rses = source_rses or []
 
-    bytes_ = 0
-    rse_coverage = {}  # {'rse_id': coverage }
-    blocklist = set()
-    for dataset in datasetfiles:
-        for file in dataset['files']:
-            bytes_ += file['bytes']
-            for replica in replicas[(file['scope'], file['name'])]:
-                if replica.state == ReplicaState.BEING_DELETED:
-                    blocklist.add(replica.rse_id)
-                    continue
-                if replica.state in [ReplicaState.AVAILABLE, ReplicaState.COPYING, ReplicaState.TEMPORARY_UNAVAILABLE]:
-                    if replica.rse_id in rse_coverage:
-                        rse_coverage[replica.rse_id] += file['bytes']
-                    else:
-                        rse_coverage[replica.rse_id] = file['bytes']
+    bytes_, rse_coverage, blocklist = __get_rse_coverage(files=(file for dataset in datasetfiles for file in dataset['files']),
+                                                         replicas=replicas)
 
     if not preferred_rse_ids:
         rse_tuples = rseselector.select_rse(size=bytes_,
-                                            preferred_rse_ids=[x[0] for x in sorted(rse_coverage.items(), key=lambda tup: tup[1], reverse=True)],
+                                            preferred_rse_ids=[rse_id for rse_id, _ in rse_coverage.most_common()],
                                             blocklist=list(blocklist),
                                             prioritize_order_over_weight=True,
                                             existing_rse_size=rse_coverage)
@@ -518,23 +508,11 @@ def __apply_rule_to_files_dataset_grouping(
     source_rses = source_rses or []
 
     for dataset in datasetfiles:
-        bytes_ = sum([file['bytes'] for file in dataset['files']])
-        rse_coverage = {}  # {'rse_id': coverage }
-        blocklist = set()
-        for file in dataset['files']:
-            for replica in replicas[(file['scope'], file['name'])]:
-                if replica.state == ReplicaState.BEING_DELETED:
-                    blocklist.add(replica.rse_id)
-                    continue
-                if replica.state in [ReplicaState.AVAILABLE, ReplicaState.COPYING, ReplicaState.TEMPORARY_UNAVAILABLE]:
-                    if replica.rse_id in rse_coverage:
-                        rse_coverage[replica.rse_id] += file['bytes']
-                    else:
-                        rse_coverage[replica.rse_id] = file['bytes']
+        bytes_, rse_coverage, blocklist = __get_rse_coverage(files=dataset['files'], replicas=replicas)
 
         if not preferred_rse_ids:
             rse_tuples = rseselector.select_rse(size=bytes_,
-                                                preferred_rse_ids=[x[0] for x in sorted(rse_coverage.items(), key=lambda tup: tup[1], reverse=True)],
+                                                preferred_rse_ids=[rse_id for rse_id, _ in rse_coverage.most_common()],
                                                 blocklist=list(blocklist),
                                                 prioritize_order_over_weight=True,
                                                 existing_rse_size=rse_coverage)
@@ -947,6 +925,31 @@ def __is_retry_required(lock, activity):
     return False
 
 
+def __get_rse_coverage(
+    files: "Iterable[dict[str, Any]]",
+    replicas: dict[tuple["InternalScope", str], "Sequence[models.CollectionReplica]"]
+) -> tuple[int, Counter, set[str]]:
+    """
+    Aggregate, in a single pass over the files, the bytes already present on each RSE.
+
+    :param files:     The files to aggregate.
+    :param replicas:  Dict holding all replicas.
+    :returns:         bytes_, rse_coverage, blocklist
+    """
+    bytes_ = 0
+    rse_coverage = Counter()  # {'rse_id': coverage }
+    blocklist = set()
+    for file in files:
+        file_bytes = file['bytes']
+        bytes_ += file_bytes
+        for replica in replicas[(file['scope'], file['name'])]:
+            if replica.state == ReplicaState.BEING_DELETED:
+                blocklist.add(replica.rse_id)
+            elif replica.state in __COVERAGE_STATES:
+                rse_coverage[replica.rse_id] += file_bytes
+    return bytes_, rse_coverage, blocklist
+
+
 @transactional_session
 def __create_lock_and_replica(file, dataset, rule, rse_id, staging_area, availability_write, locks_to_create, locks, source_rses, replicas_to_create, replicas, source_replicas, transfers_to_create, *, session: "Session", logger=logging.log):
     """
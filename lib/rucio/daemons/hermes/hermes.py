@@ -19,10 +19,11 @@
 import calendar
 import datetime
 import functools
+import io
 import json
 import logging
+import queue
 import random
-import re
 import smtplib
 import socket
 import ssl
@@ -51,7 +52,7 @@ from rucio.core.monitor import MetricManager
 from rucio.daemons.common import run_daemon
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable, Sequence
+    from collections.abc import Callable, Iterable, Sequence
     from types import FrameType
 
     from stomp.utils import Frame
@@ -64,6 +65,16 @@ logging.getLogger("requests").setLevel(logging.CRITICAL)
 METRICS = MetricManager(module=__name__)
 graceful_stop = threading.Event()
 DAEMON_NAME = "hermes"
+# timeout of the requests to InfluxDB and Elasticsearch, in seconds
+DEFAULT_REQUEST_TIMEOUT = 60
+
+# event_type -> (measurement, first of the nb/bytes columns) of the messages aggregated to InfluxDB
+INFLUX_EVENT_TYPES = {
+    "transfer-done": ("transfer", 0),
+    "transfer-failed": ("transfer", 2),
+    "deletion-done": ("deletion", 0),
+    "deletion-failed": ("deletion", 2),
+}
 
 RECONNECT_COUNTER = METRICS.counter(
     name="reconnect.{host}",
@@ -416,7 +427,6 @@ def submit_to_elastic(
 
     :returns:                  HTTP status code. 200 and 204 OK. Rest is failure.
     """
-    text = ""
     elastic_username = config_get("hermes", "elastic_username",
                                   raise_exception=False, default=None)
     elastic_password = config_get("hermes", "elastic_password",
@@ -425,10 +435,13 @@ def submit_to_elastic(
     if elastic_username and elastic_password:
         auth = HTTPBasicAuth(elastic_username, elastic_password)
 
-    for message in messages:
-        text += '{ "index":{ } }\n%s\n' % json.dumps(message, default=default)
+    text = "".join(
+        '{ "index":{ } }\n%s\n' % json.dumps(message, default=default)
+        for message in messages
+    )
     res = requests.post(
-        endpoint, data=text, headers={"Content-Type": "application/json"}, auth=auth
+        endpoint, data=text, headers={"Content-Type": "application/json"}, auth=auth,
+        timeout=config_get_int("hermes", "request_timeout", False, DEFAULT_REQUEST_TIMEOUT)
     )
     return res.status_code
 
@@ -450,14 +463,22 @@ def aggregate_to_influx(
 
     :returns:                  HTTP status code. 200 and 204 OK. Rest is failure.
     """
-    bins = {}
+    # The sums are kept in columns, one row per (timestamp, series), instead of nested dicts per bin
+    rows = {}  # {(timestamp, series): row}
+    measurements = []
+    columns = ([], [], [], [])  # nb_done, bytes_done, nb_failed, bytes_failed
+    series_keys = {}  # {labels: series}
+    timestamps = {}  # {transferred_at or created_at: timestamp}
     dtime = datetime.datetime.now()
     microsecond = dtime.microsecond
 
     for message in messages:
         event_type = message["event_type"]
+        if event_type not in INFLUX_EVENT_TYPES:
+            continue
+        measurement, column = INFLUX_EVENT_TYPES[event_type]
         payload = message["payload"]
-        if event_type in ["transfer-failed", "transfer-done"]:
+        if measurement == "transfer":
             if not payload["transferred_at"]:
                 logger(
                     logging.WARNING,
@@ -465,85 +486,345 @@ def aggregate_to_influx(
                     payload["reason"],
                 )
                 continue
-            transferred_at = time.strptime(
-                payload["transferred_at"], "%Y-%m-%d %H:%M:%S"
-            )
-            if bin_size == "1m":
-                transferred_at = int(calendar.timegm(transferred_at)) * 1000000000
-                transferred_at += microsecond
-            if transferred_at not in bins:
-                bins[transferred_at] = {}
-            src_rse, dest_rse, activity = (
-                payload["src-rse"],
-                payload["dst-rse"],
-                payload["activity"],
-            )
-            activity = re.sub(" ", r"\ ", activity)
-            key = "transfer,activity=%s,src_rse=%s,dst_rse=%s" % (
-                activity,
-                src_rse,
-                dest_rse,
-            )
-            if key not in bins[transferred_at]:
-                bins[transferred_at][key] = [0, 0, 0, 0]
-            if event_type == "transfer-done":
-                bins[transferred_at][key][0] += 1
-                bins[transferred_at][key][1] += payload["bytes"]
-            if event_type == "transfer-failed":
-                bins[transferred_at][key][2] += 1
-                bins[transferred_at][key][3] += payload["bytes"]
-        elif event_type in ["deletion-failed", "deletion-done"]:
-            created_at = message["created_at"]
-            if bin_size == "1m":
-                created_at = created_at.replace(
-                    second=0, microsecond=0, tzinfo=datetime.timezone.utc
-                ).timestamp()
-            created_at = int(created_at) * 1000000000
-            created_at += microsecond
-            if created_at not in bins:
-                bins[created_at] = {}
-            rse = payload["rse"]
-            key = "deletion,rse=%s" % (rse)
-            if key not in bins[created_at]:
-                bins[created_at][key] = [0, 0, 0, 0]
-            if event_type == "deletion-done":
-                bins[created_at][key][0] += 1
-                bins[created_at][key][1] += payload["bytes"]
-            if event_type == "deletion-failed":
-                bins[created_at][key][2] += 1
-                bins[created_at][key][3] += payload["bytes"]
-    points = ""
-    for timestamp in bins:
-        for entry in bins[timestamp]:
-            metrics = bins[timestamp][entry]
-            event_type = entry.split(",")[0]
-            point = (
-                "%s nb_%s_done=%s,bytes_%s_done=%s,nb_%s_failed=%s,bytes_%s_failed=%s %s"
-                % (
-                    entry,
-                    event_type,
-                    metrics[0],
-                    event_type,
-                    metrics[1],
-                    event_type,
-                    metrics[2],
-                    event_type,
-                    metrics[3],
-                    timestamp,
+            timestamp = timestamps.get(payload["transferred_at"])
+            if timestamp is None:
+                timestamp = time.strptime(
+                    payload["transferred_at"], "%Y-%m-%d %H:%M:%S"
                 )
+                if bin_size == "1m":
+                    timestamp = int(calendar.timegm(timestamp)) * 1000000000
+                    timestamp += microsecond
+                timestamps[payload["transferred_at"]] = timestamp
+            labels = (measurement, payload["activity"], payload["src-rse"], payload["dst-rse"])
+        else:
+            timestamp = timestamps.get(message["created_at"])
+            if timestamp is None:
+                timestamp = message["created_at"]
+                if bin_size == "1m":
+                    timestamp = timestamp.replace(
+                        second=0, microsecond=0, tzinfo=datetime.timezone.utc
+                    ).timestamp()
+                timestamp = int(timestamp) * 1000000000
+                timestamp += microsecond
+                timestamps[message["created_at"]] = timestamp
+            labels = (measurement, payload["rse"])
+
+        series = series_keys.get(labels)
+        if series is None:
+            if measurement == "transfer":
+                series = "transfer,activity=%s,src_rse=%s,dst_rse=%s" % (
+                    labels[1].replace(" ", "\\ "),
+                    labels[2],
+                    labels[3],
+                )
+            else:
+                series = "deletion,rse=%s" % labels[1]
+            series_keys[labels] = series
+        row = rows.get((timestamp, series))
+        if row is None:
+            row = rows[(timestamp, series)] = len(measurements)
+            measurements.append(measurement)
+            for values in columns:
+                values.append(0)
+        columns[column][row] += 1
+        columns[column + 1][row] += payload["bytes"]
+
+    points = io.StringIO()
+    nb_done, bytes_done, nb_failed, bytes_failed = columns
+    for (timestamp, series), row in rows.items():
+        event_type = measurements[row]
+        points.write(
+            "%s nb_%s_done=%s,bytes_%s_done=%s,nb_%s_failed=%s,bytes_%s_failed=%s %s\n"
+            % (
+                series,
+                event_type,
+                nb_done[row],
+                event_type,
+                bytes_done[row],
+                event_type,
+                nb_failed[row],
+                event_type,
+                bytes_failed[row],
+                timestamp,
             )
-            points += point
-            points += "\n"
+        )
     influx_token = config_get("hermes", "influxdb_token", False, None)
+    headers = {}
     if influx_token:
         headers = {"Authorization": "Token %s" % influx_token}
-    if points:
-        res = requests.post(endpoint, headers=headers, data=points)
+    if rows:
+        res = requests.post(endpoint, headers=headers, data=points.getvalue(),
+                            timeout=config_get_int("hermes", "request_timeout", False, DEFAULT_REQUEST_TIMEOUT))
         logger(logging.DEBUG, "%s", str(res.text))
         return res.status_code
     return 204
 
 
+def deliver_to_influx(
+        messages: "list[dict[str, Any]]",
+        endpoint: str,
+        logger: "LoggerFunction"
+) -> "list[dict[str, Any]]":
+    """
+    Deliver messages to InfluxDB.
+    For influxDB, bulk submission, either everything succeeds or fails.
+
+    :param messages:           The list of messages.
+    :param endpoint:           The InfluxDB endpoint were to send the messages.
+    :param logger:             The logger object.
+
+    :returns:                  List of the delivered messages.
+    """
+    logger(logging.DEBUG, "Will submit to influxDB")
+    state = aggregate_to_influx(
+        messages=messages,
+        bin_size="1m",
+        endpoint=endpoint,
+        logger=logger,
+    )
+    if state not in [204, 200]:
+        logger(
+            logging.ERROR,
+            "Failure to submit %s messages to influxDB. Returned status: %s",
+            len(messages),
+            state,
+        )
+        return []
+    return messages
+
+
+def deliver_to_elastic(
+        messages: "list[dict[str, Any]]",
+        endpoint: str,
+        logger: "LoggerFunction"
+) -> "list[dict[str, Any]]":
+    """
+    Deliver messages to ElasticSearch.
+    For elastic, bulk submission, either everything succeeds or fails.
+
+    :param messages:           The list of messages.
+    :param endpoint:           The ES endpoint were to send the messages.
+    :param logger:             The logger object.
+
+    :returns:                  List of the delivered messages.
+    """
+    state = submit_to_elastic(
+        messages=messages,
+        endpoint=endpoint,
+        logger=logger,
+    )
+    if state not in [200, 204]:
+        logger(
+            logging.ERROR,
+            "Failure to submit %s messages to elastic. Returned status: %s",
+            len(messages),
+            state,
+        )
+        return []
+    return messages
+
+
+def deliver_to_email(
+        messages: "list[dict[str, Any]]",
+        logger: "LoggerFunction"
+) -> "list[dict[str, Any]]":
+    """
+    Deliver messages by email.
+
+    :param messages:           The list of messages.
+    :param logger:             The logger object.
+
+    :returns:                  List of the delivered messages.
+    """
+    messages_sent = set(deliver_emails(messages=messages, logger=logger))
+    return [message for message in messages if message["id"] in messages_sent]
+
+
+def deliver_to_activemq_service(
+        messages: "list[dict[str, Any]]",
+        conns: "Sequence[stomp.Connection12]",
+        destination: str,
+        username: str,
+        password: str,
+        use_ssl: bool,
+        logger: "LoggerFunction"
+) -> "list[dict[str, Any]]":
+    """
+    Deliver messages to ActiveMQ.
+
+    :param messages:           The list of messages.
+    :param conns:              A list of connections.
+    :param destination:        The destination topic or queue.
+    :param username:           The username if no SSL connection.
+    :param password:           The username if no SSL connection.
+    :param use_ssl:            Boolean to choose if SSL connection is used.
+    :param logger:             The logger object.
+
+    :returns:                  List of the delivered messages.
+    """
+    messages_sent = set(deliver_to_activemq(
+        messages=messages,
+        conns=conns,
+        destination=destination,
+        username=username,
+        password=password,
+        use_ssl=use_ssl,
+        logger=logger,
+    ))
+    return [message for message in messages if message["id"] in messages_sent]
+
+
+def _deliver_service(
+        service: str,
+        deliver: "Callable[..., list[dict[str, Any]]]",
+        messages: "list[dict[str, Any]]",
+        logger: "LoggerFunction"
+) -> "list[dict[str, Any]]":
+    """
+    Deliver the messages of one service and report its throughput and lag.
+
+    :param service:            The name of the service.
+    :param deliver:            The delivery function of the service, returning the delivered messages.
+    :param messages:           The messages of the service.
+    :param logger:             The logger object.
+
+    :returns:                  List of the delivered messages.
+    """
+    t_time = time.time()
+    try:
+        delivered = deliver(messages=messages, logger=logger)
+    except Exception as error:
+        logger(logging.ERROR, "Error sending to %s : %s", service, str(error))
+        return []
+    duration = time.time() - t_time
+    logger(
+        logging.INFO,
+        "%s messages successfully submitted to %s in %s seconds",
+        len(delivered),
+        service,
+        duration,
+    )
+    METRICS.timer("delivery.{service}").labels(service=service).observe(duration)
+    METRICS.counter("delivered.{service}").labels(service=service).inc(len(delivered))
+    if delivered:
+        oldest = min(message["created_at"] for message in delivered)
+        METRICS.gauge("delivery_lag.{service}").labels(service=service).set(
+            (datetime.datetime.utcnow() - oldest).total_seconds()
+        )
+    return delivered
+
+
+class ServiceWorker:
+    """
+    Long-lived thread delivering the messages of one service, so that a slow service
+    does not delay the delivery to the others.
+
+    A worker holds at most one bulk of messages. While it delivers it, the cycles of
+    the daemon do not hand it new messages: they stay in the database until the worker
+    is idle again and has deleted the messages it delivered.
+    """
+
+    def __init__(self, service: str):
+        """
+        :param service:            The name of the service.
+        """
+        self.service = service
+        self.__bulks = queue.Queue(maxsize=1)
+        self.__idle = threading.Event()
+        self.__idle.set()
+        self.__thread = threading.Thread(target=self.__run, name="hermes-%s" % service, daemon=True)
+        self.__thread.start()
+
+    def is_idle(self) -> bool:
+        """
+        :returns:                  True if the worker can take a new bulk of messages.
+        """
+        return self.__idle.is_set()
+
+    def submit(
+            self,
+            deliver: "Callable[..., list[dict[str, Any]]]",
+            messages: "list[dict[str, Any]]",
+            logger: "LoggerFunction"
+    ) -> bool:
+        """
+        Hand a bulk of messages to the worker, if it is idle.
+
+        :param deliver:            The delivery function of the service, returning the delivered messages.
+        :param messages:           The messages of the service.
+        :param logger:             The logger object.
+
+        :returns:                  True if the worker took the messages, False if it is still busy.
+        """
+        if not self.__idle.is_set():
+            return False
+        self.__idle.clear()
+        self.__bulks.put((deliver, messages, logger))
+        return True
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until the worker is idle.
+
+        :param timeout:            The maximum time to wait, in seconds.
+
+        :returns:                  True if the worker is idle.
+        """
+        return self.__idle.wait(timeout)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the worker once it has delivered its current bulk.
+
+        :param timeout:            The maximum time to wait for the worker, in seconds.
+        """
+        self.__bulks.put(None)
+        self.__thread.join(timeout)
+
+    def __run(self) -> None:
+        while True:
+            bulk = self.__bulks.get()
+            if bulk is None:
+                return
+            deliver, messages, logger = bulk
+            try:
+                delivered = _deliver_service(self.service, deliver, messages, logger)
+                delete_delivered_messages(self.service, delivered, logger)
+            except Exception as error:
+                logger(logging.ERROR, "Error deleting the messages delivered to %s : %s", self.service, str(error))
+            finally:
+                self.__idle.set()
+
+
+def delete_delivered_messages(
+        service: str,
+        messages: "list[dict[str, Any]]",
+        logger: "LoggerFunction"
+) -> None:
+    """
+    Delete the messages delivered to a service.
+
+    :param service:            The name of the service.
+    :param messages:           The delivered messages.
+    :param logger:             The logger object.
+    """
+    if not messages:
+        return
+    logger(logging.INFO, "Deleting %s messages delivered to %s", len(messages), service)
+    to_delete = [
+        {
+            "id": message["id"],
+            "created_at": message["created_at"],
+            "updated_at": message["created_at"],
+            "payload": str(message["payload"]),
+            "event_type": message["event_type"],
+            "services": message["services"]
+        }
+        for message in messages
+    ]
+    delete_messages(messages=to_delete)
+
+
 def build_message_dict(
         bulk: int,
         thread: int,
@@ -551,6 +832,8 @@ def build_message_dict(
         message_dict: dict[str, list[dict[str, Any]]],
         logger: "LoggerFunction",
         service: Optional[str] = None,
+        skip_locked: bool = False,
+        excluded_services: Optional["Iterable[str]"] = None,
 ) -> None:
     """
     Retrieves messages from the database and builds a dictionary with the keys being the services, and the values a list of the messages (built up of dictionary / json information)
@@ -561,6 +844,8 @@ def build_message_dict(
     :param message_dict:       Either empty dictionary to be built, or build upon when using query_by_service.
     :param logger:             The logger object.
     :param service:            When passed, only returns messages table for this specific service.
+    :param skip_locked:        Skip the messages locked by another Hermes instead of failing on them.
+    :param excluded_services:  The services whose messages are not retrieved, e.g. still delivering a bulk.
 
     :returns:                  None, but builds on the dictionary message_dict passed to this fuction (for when querying multiple services).
     """
@@ -571,6 +856,8 @@ def build_message_dict(
         thread=thread,
         total_threads=total_threads,
         service_filter=service,
+        skip_locked=skip_locked,
+        excluded_services=excluded_services,
     )
 
     if messages:
@@ -617,6 +904,7 @@ def hermes(once: bool = False, bulk: int = 1000, sleep_time: int = 10) -> None:
     :param bulk:       The number of requests to process.
     :param sleep_time: Time between two cycles.
     """
+    service_workers = {}
     run_daemon(
         once=once,
         graceful_stop=graceful_stop,
@@ -626,11 +914,28 @@ def hermes(once: bool = False, bulk: int = 1000, sleep_time: int = 10) -> None:
         run_once_fnc=functools.partial(
             run_once,
             bulk=bulk,
+            service_workers=service_workers,
         ),
     )
+    for worker in service_workers.values():
+        worker.stop()
 
 
-def run_once(heartbeat_handler: "HeartbeatHandler", bulk: int, **_kwargs) -> bool:
+def run_once(
+        heartbeat_handler: "HeartbeatHandler",
+        bulk: int,
+        service_workers: "Optional[dict[str, ServiceWorker]]" = None,
+        **_kwargs
+) -> bool:
+    """
+    Retrieve a bulk of messages and deliver them to their services.
+
+    :param heartbeat_handler:  The heartbeat handler of the daemon.
+    :param bulk:               The number of messages to retrieve.
+    :param service_workers:    The long-lived workers of the services, by service, kept across the cycles.
+                               Without them, or if hermes/concurrent_delivery is disabled, the services
+                               are delivered one after the other.
+    """
 
     worker_number, total_workers, logger = heartbeat_handler.live()
     try:
@@ -675,10 +980,22 @@ def run_once(heartbeat_handler: "HeartbeatHandler", bulk: int, **_kwargs) -> boo
     worker_number, total_workers, logger = heartbeat_handler.live()
     message_dict = {}
     query_by_service = config_get_bool("hermes", "query_by_service", default=False)
+    skip_locked = config_get_bool("hermes", "skip_locked", raise_exception=False, default=False)
+    concurrent_delivery = service_workers is not None and config_get_bool(
+        "hermes", "concurrent_delivery", raise_exception=False, default=True
+    )
+    busy_services = set()
+    if concurrent_delivery:
+        busy_services = {service for service, worker in service_workers.items() if not worker.is_idle()}
+        if busy_services:
+            logger(logging.DEBUG, "Still delivering to %s", ", ".join(sorted(busy_services)))
 
     # query_by_service is a toggleable behaviour switch between collecting bulk number of messages across all services when false, to collecting bulk messages from each service when true.
+    # The messages of the busy services are not retrieved, so that the bulk is filled with the messages of the others.
     if query_by_service:
         for service in services_list:
+            if service in busy_services:
+                continue
             build_message_dict(
                 bulk=bulk,
                 thread=worker_number,
@@ -686,6 +1003,7 @@ def run_once(heartbeat_handler: "HeartbeatHandler", bulk: int, **_kwargs) -> boo
                 message_dict=message_dict,
                 logger=logger,
                 service=service,
+                skip_locked=skip_locked,
             )
     else:
         build_message_dict(
@@ -693,125 +1011,42 @@ def run_once(heartbeat_handler: "HeartbeatHandler", bulk: int, **_kwargs) -> boo
             thread=worker_number,
             total_threads=total_workers,
             message_dict=message_dict,
-            logger=logger
+            logger=logger,
+            skip_locked=skip_locked,
+            excluded_services=busy_services,
         )
 
     if message_dict:
-        to_delete = []
-
+        deliveries = {}
         if "influx" in message_dict and influx_endpoint:
-            # For influxDB, bulk submission, either everything succeeds or fails
-            t_time = time.time()
-            logger(logging.DEBUG, "Will submit to influxDB")
-            try:
-                state = aggregate_to_influx(
-                    messages=message_dict["influx"],
-                    bin_size="1m",
-                    endpoint=influx_endpoint,
-                    logger=logger,
-                )
-                if state in [204, 200]:
-                    logger(
-                        logging.INFO,
-                        "%s messages successfully submitted to influxDB in %s seconds",
-                        len(message_dict["influx"]),
-                        time.time() - t_time,
-                    )
-                    for message in message_dict["influx"]:
-                        to_delete.append(message)
-                else:
-                    logger(
-                        logging.ERROR,
-                        "Failure to submit %s messages to influxDB. Returned status: %s",
-                        len(message_dict["influx"]),
-                        state,
-                    )
-            except Exception as error:
-                logger(logging.ERROR, "Error sending to InfluxDB : %s", str(error))
-
+            deliveries["influx"] = functools.partial(
+                deliver_to_influx, endpoint=influx_endpoint
+            )
         if "elastic" in message_dict and elastic_endpoint:
-            # For elastic, bulk submission, either everything succeeds or fails
-            t_time = time.time()
-            try:
-                state = submit_to_elastic(
-                    messages=message_dict["elastic"],
-                    endpoint=elastic_endpoint,
-                    logger=logger,
-                )
-                if state in [200, 204]:
-                    logger(
-                        logging.INFO,
-                        "%s messages successfully submitted to elastic in %s seconds",
-                        len(message_dict["elastic"]),
-                        time.time() - t_time,
-                    )
-                    for message in message_dict["elastic"]:
-                        to_delete.append(message)
-                else:
-                    logger(
-                        logging.ERROR,
-                        "Failure to submit %s messages to elastic. Returned status: %s",
-                        len(message_dict["elastic"]),
-                        state,
-                    )
-            except Exception as error:
-                logger(logging.ERROR, "Error sending to Elastic : %s", str(error))
-
+            deliveries["elastic"] = functools.partial(
+                deliver_to_elastic, endpoint=elastic_endpoint
+            )
         if "email" in message_dict:
-            t_time = time.time()
-            try:
-                messages_sent = deliver_emails(
-                    messages=message_dict["email"], logger=logger
-                )
-                logger(
-                    logging.INFO,
-                    "%s messages successfully submitted by emails in %s seconds",
-                    len(message_dict["email"]),
-                    time.time() - t_time,
-                )
-                for message in message_dict["email"]:
-                    if message["id"] in messages_sent:
-                        to_delete.append(message)
-            except Exception as error:
-                logger(logging.ERROR, "Error sending email : %s", str(error))
-
+            deliveries["email"] = deliver_to_email
         if "activemq" in message_dict:
-            t_time = time.time()
-            try:
-                messages_sent = deliver_to_activemq(
-                    messages=message_dict["activemq"],
-                    conns=conns,  # type: ignore (argument could be None)
-                    destination=destination,  # type: ignore (argument could be None)
-                    username=username,  # type: ignore (argument could be None)
-                    password=password,  # type: ignore (argument could be None)
-                    use_ssl=use_ssl,  # type: ignore (argument could be None)
-                    logger=logger,
-                )
-                logger(
-                    logging.INFO,
-                    "%s messages successfully submitted to ActiveMQ in %s seconds",
-                    len(message_dict["activemq"]),
-                    time.time() - t_time,
-                )
-                for message in message_dict["activemq"]:
-                    if message["id"] in messages_sent:
-                        to_delete.append(message)
-            except Exception as error:
-                logger(logging.ERROR, "Error sending to ActiveMQ : %s", str(error))
-
-        logger(logging.INFO, "Deleting %s messages", len(to_delete))
-        to_delete = [
-            {
-                "id": message["id"],
-                "created_at": message["created_at"],
-                "updated_at": message["created_at"],
-                "payload": str(message["payload"]),
-                "event_type": message["event_type"],
-                "services": message["services"]
-            }
-            for message in to_delete
-        ]
-        delete_messages(messages=to_delete)
+            deliveries["activemq"] = functools.partial(
+                deliver_to_activemq_service,
+                conns=conns,  # type: ignore (argument could be None)
+                destination=destination,  # type: ignore (argument could be None)
+                username=username,  # type: ignore (argument could be None)
+                password=password,  # type: ignore (argument could be None)
+                use_ssl=use_ssl,  # type: ignore (argument could be None)
+            )
+
+        for service, deliver in deliveries.items():
+            if concurrent_delivery:
+                # The messages of a busy service stay in the database for a later cycle
+                if service not in service_workers:
+                    service_workers[service] = ServiceWorker(service)
+                service_workers[service].submit(deliver, message_dict[service], logger)
+            else:
+                delivered = _deliver_service(service, deliver, message_dict[service], logger)
+                delete_delivered_messages(service, delivered, logger)
 
     must_sleep = True
     return must_sleep
@@ -39,13 +39,13 @@ from rucio.common.types import InternalAccount, InternalScope, LoggerFunction
 from rucio.core.did import list_parent_dids, touch_dids
 from rucio.core.lock import touch_dataset_locks
 from rucio.core.monitor import MetricManager
-from rucio.core.replica import declare_bad_file_replicas, touch_collection_replicas, touch_replica
+from rucio.core.replica import declare_bad_file_replicas, touch_collection_replicas, touch_replica, touch_replicas
 from rucio.core.rse import get_rse_id
 from rucio.daemons.common import HeartbeatHandler, run_daemon
 from rucio.db.sqla.constants import BadFilesStatus, DIDType
 
 if TYPE_CHECKING:
-    from collections.abc import Set
+    from collections.abc import Iterable, Set
     from types import FrameType
 
     from stomp import Connection
@@ -57,6 +57,54 @@ logging.getLogger("stomp").setLevel(logging.CRITICAL)
 METRICS = MetricManager(module=__name__)
 graceful_stop = Event()
 
+LISTENER_NAME = 'rucio-tracer-kronos'
+
+# eventType -> (metric, metric for the aCT traces) of the traces updating the atime
+TRACE_METRICS = {
+    'get': ('dq2clients', 'dq2clients'),
+    'get_sm': ('panda_production', 'panda_production_act'),
+    'sm_get': ('panda_production', 'panda_production_act'),
+    'get_sm_a': ('panda_analysis', 'panda_analysis_act'),
+    'sm_get_a': ('panda_analysis', 'panda_analysis_act'),
+    'download': ('rucio_download', 'rucio_download'),
+    'touch': ('rucio_touch', 'rucio_touch'),
+}
+BAD_FILES_EVENT_TYPES = frozenset(['get_sm', 'get_sm_a', 'get'])
+BAD_FILES_EXCLUDED_CLIENT_STATES = frozenset(['DONE', 'FOUND_ROOT', 'ALREADY_DONE'])
+
+
+@functools.lru_cache(maxsize=1024)
+def _classify_event_type(event_type: str) -> Optional[tuple[str, str]]:
+    """
+    Classify the traces by their eventType.
+
+    :param event_type: The eventType of the trace.
+    :returns: The (metric, metric for the aCT traces) of the traces updating the atime, None for the other traces.
+    """
+    if not (event_type.startswith('get') or event_type.startswith('sm_get') or event_type in ('download', 'touch')):
+        return None
+    if event_type.endswith('_es'):
+        return None
+    return TRACE_METRICS.get(event_type, ('other_get', 'other_get'))
+
+
+def _combine_patterns(patterns: list[re.Pattern]) -> Optional[re.Pattern]:
+    """
+    Combine the bad file patterns into a single alternation, so that a trace reason is matched only once.
+
+    :param patterns: The compiled bad file patterns.
+    :returns: The combined pattern, None if there are no patterns or if they cannot be combined.
+    """
+    if not patterns:
+        return None
+    if len(patterns) == 1:
+        return patterns[0]
+    try:
+        return re.compile('|'.join('(?:%s)' % pattern.pattern for pattern in patterns))
+    except re.error:
+        # e.g. patterns with global inline flags cannot be part of an alternation
+        return None
+
 
 class AMQConsumer:
     """ActiveMQ message consumer"""
@@ -71,6 +119,8 @@ class AMQConsumer:
             excluded_usrdns: "Set[str]",
             dataset_queue: Queue,
             bad_files_patterns: list[re.Pattern],
+            aggregation_window: int = 0,
+            pending_replicas: "Optional[Iterable[dict]]" = None,
             logger: LoggerFunction = logging.log
     ):
         self.__broker = broker
@@ -86,12 +136,37 @@ class AMQConsumer:
         self.__excluded_usrdns = excluded_usrdns
         self.__dataset_queue = dataset_queue
         self.__bad_files_patterns = bad_files_patterns
+        self.__bad_files_pattern = _combine_patterns(bad_files_patterns)
+        # replica accesses are coalesced per (scope, name, rse_id) and flushed every aggregation_window seconds
+        self.__aggregation_window = aggregation_window
+        self.__pending_replicas = {}
+        self.__last_flush = time()
         self.__logger = logger
+        if pending_replicas:
+            self.__aggregate_replicas(pending_replicas)
+
+    @property
+    def pending_replicas(self) -> dict:
+        """
+        The replica accesses of acked traces which are not flushed yet, by (scope, name, rse_id).
+        """
+        return self.__pending_replicas
+
+    def flush(self) -> None:
+        """
+        Flush the pending replica accesses now, e.g. before the consumer is replaced or the daemon stops.
+        """
+        if self.__pending_replicas:
+            self.__flush_replicas()
 
     @METRICS.count_it
     def on_heartbeat_timeout(self) -> None:
         self.__conn.disconnect()
 
+    def on_heartbeat(self) -> None:
+        if self.__pending_replicas and time() - self.__last_flush >= self.__aggregation_window:
+            self.__flush_replicas()
+
     @METRICS.count_it
     def on_error(self, frame: "Frame") -> None:
         self.__logger(logging.ERROR, 'Message receive error: [%s] %s' % (self.__broker, frame.body))
@@ -142,6 +217,7 @@ class AMQConsumer:
         """
         replicas = []
         rses = []
+        suspicious_pfns = {}  # {(vo, reason, scheme): [pfns]}
         for report in self.__reports:
             if 'vo' not in report:
                 report['vo'] = DEFAULT_VO
@@ -149,19 +225,15 @@ class AMQConsumer:
             try:
                 # Identify suspicious files
                 try:
-                    if self.__bad_files_patterns and report['eventType'] in ['get_sm', 'get_sm_a', 'get'] and 'clientState' in report and report['clientState'] not in ['DONE', 'FOUND_ROOT', 'ALREADY_DONE']:
-                        for pattern in self.__bad_files_patterns:
-                            if 'stateReason' in report and report['stateReason'] and isinstance(report['stateReason'], str) and pattern.match(report['stateReason']):
-                                reason = report['stateReason'][:255]
-                                if 'url' not in report or not report['url']:
-                                    self.__logger(logging.ERROR, 'Missing url in the following trace : ' + str(report))
-                                else:
-                                    try:
-                                        pfn = report['url']
-                                        declare_bad_file_replicas([pfn, ], reason=reason, issuer=InternalAccount('root', vo=report['vo']), status=BadFilesStatus.SUSPICIOUS)
-                                        self.__logger(logging.INFO, 'Declare suspicious file %s with reason %s' % (report['url'], reason))
-                                    except Exception as error:
-                                        self.__logger(logging.ERROR, 'Failed to declare suspicious file' + str(error))
+                    if self.__bad_files_patterns and report['eventType'] in BAD_FILES_EVENT_TYPES and 'clientState' in report and report['clientState'] not in BAD_FILES_EXCLUDED_CLIENT_STATES:
+                        if 'stateReason' in report and report['stateReason'] and isinstance(report['stateReason'], str) and self.__is_bad_file_reason(report['stateReason']):
+                            reason = report['stateReason'][:255]
+                            if 'url' not in report or not report['url']:
+                                self.__logger(logging.ERROR, 'Missing url in the following trace : ' + str(report))
+                            else:
+                                # declare_bad_file_replicas only accepts PFNs of a single protocol
+                                scheme = report['url'].split(':')[0]
+                                suspicious_pfns.setdefault((report['vo'], reason, scheme), []).append(report['url'])
                 except Exception as error:
                     self.__logger(logging.ERROR, 'Problem with bad trace : %s . Error %s' % (str(report), str(error)))
 
@@ -175,29 +247,14 @@ class AMQConsumer:
                     report['scope'] = InternalScope(report['scope'], report['vo'])
 
                 # handle all events starting with get* and download and touch events.
-                if not report['eventType'].startswith('get') and not report['eventType'].startswith('sm_get') and not report['eventType'] == 'download' and not report['eventType'] == 'touch':
-                    continue
-                if report['eventType'].endswith('_es'):
+                trace_metrics = _classify_event_type(report['eventType'])
+                if trace_metrics is None:
                     continue
                 METRICS.counter('total_get').inc()
-                if report['eventType'] == 'get':
-                    METRICS.counter('dq2clients').inc()
-                elif report['eventType'] == 'get_sm' or report['eventType'] == 'sm_get':
-                    if report['eventVersion'] == 'aCT':
-                        METRICS.counter('panda_production_act').inc()
-                    else:
-                        METRICS.counter('panda_production').inc()
-                elif report['eventType'] == 'get_sm_a' or report['eventType'] == 'sm_get_a':
-                    if report['eventVersion'] == 'aCT':
-                        METRICS.counter('panda_analysis_act').inc()
-                    else:
-                        METRICS.counter('panda_analysis').inc()
-                elif report['eventType'] == 'download':
-                    METRICS.counter('rucio_download').inc()
-                elif report['eventType'] == 'touch':
-                    METRICS.counter('rucio_touch').inc()
-                else:
-                    METRICS.counter('other_get').inc()
+                metric, act_metric = trace_metrics
+                if metric != act_metric and report['eventVersion'] == 'aCT':
+                    metric = act_metric
+                METRICS.counter(metric).inc()
 
                 if report['eventType'] == 'download' or report['eventType'] == 'touch':
                     report['usrdn'] = report['account']
@@ -282,32 +339,96 @@ class AMQConsumer:
                         continue
                     self.__dataset_queue.put({'scope': did['scope'], 'name': did['name'], 'did_type': did['type'], 'rse_id': rse_id, 'accessed_at': datetime.utcfromtimestamp(report['traceTimeentryUnix'])})
 
-        if not len(replicas):
-            return
+        self.__declare_suspicious_replicas(suspicious_pfns)
+
+        self.__aggregate_replicas(replicas)
+        METRICS.counter('aggregated_replicas').inc(len(replicas))
+        if self.__pending_replicas and time() - self.__last_flush >= self.__aggregation_window:
+            self.__flush_replicas()
+
+    def __is_bad_file_reason(self, reason: str) -> bool:
+        """
+        Check if the reason of a failed trace matches one of the bad file patterns.
+
+        :param reason: The stateReason of the trace.
+        """
+        if self.__bad_files_pattern is not None:
+            return self.__bad_files_pattern.match(reason) is not None
+        return any(pattern.match(reason) for pattern in self.__bad_files_patterns)
+
+    def __declare_suspicious_replicas(self, suspicious_pfns: dict[tuple[str, str, str], list[str]]) -> None:
+        """
+        Declare the suspicious replicas of the current chunk, with one call per VO, reason and URL scheme.
+
+        :param suspicious_pfns: The PFNs to declare, grouped by (vo, reason, scheme).
+        """
+        for (vo, reason, _), pfns in suspicious_pfns.items():
+            pfns = list(dict.fromkeys(pfns))
+            try:
+                declare_bad_file_replicas(pfns, reason=reason, issuer=InternalAccount('root', vo=vo), status=BadFilesStatus.SUSPICIOUS)
+                self.__logger(logging.INFO, 'Declare suspicious files %s with reason %s' % (pfns, reason))
+            except Exception as error:
+                self.__logger(logging.ERROR, 'Failed to declare suspicious files %s: %s' % (pfns, str(error)))
+
+    def __aggregate_replicas(self, replicas: list[dict]) -> None:
+        """
+        Coalesce the replica accesses with the pending ones: keep the latest access time and count the accesses.
+
+        :param replicas: The replicas accessed by the traces of the current chunk, or the coalesced
+                         replicas of a failed flush, with their access_cnt.
+        """
+        for replica in replicas:
+            key = (replica['scope'], replica['name'], replica['rse_id'])
+            access_cnt = replica.get('access_cnt', 1)
+            pending = self.__pending_replicas.get(key)
+            if pending is None:
+                self.__pending_replicas[key] = dict(replica, access_cnt=access_cnt)
+                continue
+            pending['access_cnt'] += access_cnt
+            if replica['accessed_at'] > pending['accessed_at']:
+                pending.update(replica, access_cnt=pending['access_cnt'])
+
+    def __flush_replicas(self) -> None:
+        """
+        Bulk update atime of the pending replicas.
+
+        The replicas which are not updated or resubmitted because of an error are put back in the pending ones.
+        """
+        replicas = list(self.__pending_replicas.values())
+        self.__pending_replicas = {}
+        self.__last_flush = time()
 
         self.__logger(logging.DEBUG, "trying to update replicas: %s", replicas)
 
         stopwatch = Stopwatch()
+        done = 0
         try:
-            for replica in replicas:
-                # if touch replica hits a locked row put the trace back into queue for later retry
-                if not touch_replica(replica):
-                    resubmit = {'filename': replica['name'],
-                                'scope': replica['scope'].external,
-                                'remoteSite': replica['rse'],
-                                'traceTimeentryUnix': replica['traceTimeentryUnix'],
-                                'eventType': 'get',
-                                'usrdn': 'someuser',
-                                'clientState': 'DONE',
-                                'eventVersion': replica['eventVersion']}
-                    if replica['scope'].vo != DEFAULT_VO:
-                        resubmit['vo'] = replica['scope'].vo
-                    self.__conn.send(body=jdumps(resubmit), destination=self.__queue, headers={'appversion': 'rucio', 'resubmitted': '1'})
-                    METRICS.counter('sent_resubmitted').inc()
+            # if the bulk update hits a locked row, fall back to one update per replica
+            if touch_replicas(replicas):
+                done = len(replicas)
+            else:
+                METRICS.counter('bulk_update_locked').inc()
+                for replica in replicas:
+                    # if touch replica hits a locked row put the trace back into queue for later retry
+                    if not touch_replica(replica):
+                        resubmit = {'filename': replica['name'],
+                                    'scope': replica['scope'].external,
+                                    'remoteSite': replica['rse'],
+                                    'traceTimeentryUnix': replica.get('traceTimeentryUnix'),
+                                    'eventType': 'get',
+                                    'usrdn': 'someuser',
+                                    'clientState': 'DONE',
+                                    'eventVersion': replica.get('eventVersion')}
+                        if replica['scope'].vo != DEFAULT_VO:
+                            resubmit['vo'] = replica['scope'].vo
+                        self.__conn.send(body=jdumps(resubmit), destination=self.__queue, headers={'appversion': 'rucio', 'resubmitted': '1'})
+                        METRICS.counter('sent_resubmitted').inc()
+                    done += 1
             METRICS.timer('update_atime').observe(stopwatch.elapsed)
         except Exception:
-            self.__logger(logging.ERROR, "Cannot update replicas.", exc_info=True)
+            self.__logger(logging.ERROR, "Cannot update replicas, %d of them are kept for the next flush." % (len(replicas) - done), exc_info=True)
             METRICS.counter('update_error').inc()
+            self.__aggregate_replicas(replicas[done:])
 
         METRICS.counter('updated_replicas').inc()
 
@@ -334,9 +455,30 @@ def kronos_file(
             sleep_time=sleep_time,
         )
     )
+    # stop receiving traces before flushing the accesses of the acked ones
+    for conn in stomp_conn_mngr.connections:
+        if conn.is_connected():
+            conn.disconnect()
+        remaining = _flush_listener(conn)
+        if remaining:
+            logging.log(logging.ERROR, 'Lost %d replica accesses which could not be flushed' % len(remaining))
     stomp_conn_mngr.disconnect()
 
 
+def _flush_listener(conn: "Connection") -> Optional[dict]:
+    """
+    Flush the replica accesses pending in the kronos consumer of a connection.
+
+    :param conn: The connection.
+    :returns: The replica accesses which could not be flushed, None if the connection has no kronos consumer.
+    """
+    listener = conn.get_listener(LISTENER_NAME)
+    if not isinstance(listener, AMQConsumer):
+        return None
+    listener.flush()
+    return listener.pending_replicas
+
+
 def run_once_kronos_file(heartbeat_handler: HeartbeatHandler, stomp_conn_mngr: StompConnectionManager, dataset_queue: Queue, sleep_time: int, **kwargs) -> None:
     """
     Run the amq consumer once.
@@ -346,6 +488,7 @@ def run_once_kronos_file(heartbeat_handler: HeartbeatHandler, stomp_conn_mngr: S
     chunksize = config_get_int('tracer-kronos', 'chunksize')
     prefetch_size = config_get_int('tracer-kronos', 'prefetch_size')
     subscription_id = config_get('tracer-kronos', 'subscription_id')
+    aggregation_window = config_get_int('tracer-kronos', 'aggregation_window', raise_exception=False, default=0)
     # Load bad file patterns from config
     try:
         bad_files_patterns = []
@@ -374,7 +517,7 @@ def run_once_kronos_file(heartbeat_handler: HeartbeatHandler, stomp_conn_mngr: S
     ssl_key_file = config_get('tracer-kronos', 'ssl_key_file', raise_exception=False)
     ssl_cert_file = config_get('tracer-kronos', 'ssl_cert_file', raise_exception=False)
 
-    created_conns, _ = stomp_conn_mngr.re_configure(
+    created_conns, deleted_conns = stomp_conn_mngr.re_configure(
         brokers=brokers_alias,
         port=port,
         use_ssl=use_ssl,
@@ -387,24 +530,35 @@ def run_once_kronos_file(heartbeat_handler: HeartbeatHandler, stomp_conn_mngr: S
         logger=logger,
     )
 
+    # the traces of the accesses pending in the consumers of the deleted connections are already acked:
+    # flush them, and hand over the ones which could not be flushed to a new consumer
+    pending_replicas = []
+    for conn in deleted_conns:
+        pending_replicas.extend((_flush_listener(conn) or {}).values())
+
     for conn in created_conns:
         if not conn.is_connected():
             logger(logging.INFO, 'connecting to %s' % str(conn.transport._Transport__host_and_ports[0]))
             METRICS.counter('reconnect.{host}').labels(host=conn.transport._Transport__host_and_ports[0][0]).inc()
-            conn.set_listener('rucio-tracer-kronos', AMQConsumer(broker=conn.transport._Transport__host_and_ports[0],
-                                                                 conn=conn,
-                                                                 queue=config_get('tracer-kronos', 'queue'),
-                                                                 chunksize=chunksize,
-                                                                 subscription_id=subscription_id,
-                                                                 excluded_usrdns=excluded_usrdns,
-                                                                 dataset_queue=dataset_queue,
-                                                                 bad_files_patterns=bad_files_patterns,
-                                                                 logger=logger))
+            conn.set_listener(LISTENER_NAME, AMQConsumer(broker=conn.transport._Transport__host_and_ports[0],
+                                                         conn=conn,
+                                                         queue=config_get('tracer-kronos', 'queue'),
+                                                         chunksize=chunksize,
+                                                         subscription_id=subscription_id,
+                                                         excluded_usrdns=excluded_usrdns,
+                                                         dataset_queue=dataset_queue,
+                                                         bad_files_patterns=bad_files_patterns,
+                                                         aggregation_window=aggregation_window,
+                                                         pending_replicas=pending_replicas,
+                                                         logger=logger))
+            pending_replicas = []
             if not use_ssl:
                 conn.connect(username, password)
             else:
                 conn.connect()
             conn.subscribe(destination=config_get('tracer-kronos', 'queue'), ack='client-individual', id=subscription_id, headers={'activemq.prefetchSize': prefetch_size})
+    if pending_replicas:
+        logger(logging.ERROR, 'Lost %d replica accesses which could not be flushed' % len(pending_replicas))
 
 
 def kronos_dataset(dataset_queue: Queue, once: bool = False, sleep_time: int = 60) -> None:
@@ -41,7 +41,7 @@ from rucio.common.logging import setup_logging
 from rucio.common.stopwatch import Stopwatch
 from rucio.common.types import InternalAccount, InternalScope, LoggerFunction
 from rucio.common.utils import chunks
-from rucio.core.did import get_metadata, list_new_dids, set_new_dids
+from rucio.core.did import get_metadata_bulk, list_new_dids, set_new_dids
 from rucio.core.monitor import MetricManager
 from rucio.core.rse import get_rse_id, list_rse_attributes, list_rses, rse_exists
 from rucio.core.rse_expression_parser import parse_expression
@@ -61,6 +61,8 @@ graceful_stop = threading.Event()
 DAEMON_NAME = "transmogrifier"
 
 RULES_COMMENT_LENGTH = 255
+# Subscription filter keys with few distinct values, evaluated once per value
+INDEXED_FILTER_KEYS = frozenset(["scope", "account", "did_type", "datatype", "project"])
 
 
 def __get_rule_dict(rule_dict: dict, subscription: dict) -> dict:
@@ -286,96 +288,161 @@ def get_subscriptions(logger: LoggerFunction = logging.log) -> list[dict]:
     return subscriptions
 
 
-def __is_matching_subscription(
+def __compile_subscription_filter(
         subscription: dict[str, Any],
+        logger: LoggerFunction = logging.log
+) -> Optional[dict[str, Any]]:
+    """
+    Internal method to parse the filter of a subscription and compile its regular expressions.
+
+    :param subscription: The subscription dictionary.
+    :param logger: The logger.
+    :return: The compiled filter, or None if the filter is invalid.
+    """
+    compiled = {
+        "pattern": None,
+        "excluded_pattern": None,
+        "min_avg_file_size": None,
+        "max_avg_file_size": None,
+        "split_rule": False,
+        "checks": {},  # {key: frozenset of values or list of compiled regexes}
+    }
+    try:
+        filter_string = loads(subscription["filter"])
+        for key, values in filter_string.items():
+            if key in ["pattern", "excluded_pattern"]:
+                compiled[key] = re.compile(values)
+            elif key in ["split_rule", "min_avg_file_size", "max_avg_file_size"]:
+                compiled[key] = values
+            else:
+                if not isinstance(values, list):
+                    values = [values]
+                if key in ["account", "did_type"]:
+                    compiled["checks"][key] = frozenset(values)
+                else:
+                    compiled["checks"][key] = [re.compile(str(value)) for value in values]
+    except (ValueError, re.error) as error:
+        logger(logging.ERROR, "%s : Subscription will be skipped", error)
+        return None
+    return compiled
+
+
+def __get_filter_value(key: str, did: dict[str, Any], metadata: dict[str, Any]) -> Optional[str]:
+    """
+    Internal method to get the value of a DID checked by a subscription filter key.
+
+    :param key: The filter key.
+    :param did: The DID dictionary
+    :param metadata: The metadata dictionary for the DID
+    :return: The value, or None if the DID has no such metadata.
+    """
+    if key == "scope":
+        return did["scope"].internal
+    if key == "account":
+        return metadata["account"].internal
+    if key == "did_type":
+        return metadata["did_type"].name
+    if key in metadata:
+        return str(metadata[key])
+    return None
+
+
+def __passes_filter_check(check: Any, value: Optional[str]) -> bool:
+    """
+    Internal method to check a value against a compiled filter key.
+
+    :param check: The set of accepted values or the list of compiled regexes.
+    :param value: The value of the DID.
+    :return: True/False
+    """
+    if value is None:
+        return False
+    if isinstance(check, frozenset):
+        return value in check
+    return any(regex.match(value) for regex in check)
+
+
+def build_subscription_index(
+        subscriptions: list[dict[str, Any]],
+        logger: LoggerFunction = logging.log
+) -> dict[str, Any]:
+    """
+    Compile the subscriptions into a matcher index. The keys with few distinct values
+    (INDEXED_FILTER_KEYS) are evaluated once per distinct value and cached in the index,
+    so that each DID is only fully checked against the subscriptions which can match it.
+
+    :param subscriptions: The list of active subscriptions, ordered by priority.
+    :param logger: The logger.
+    :return: The subscription index.
+    """
+    entries = []  # [(subscription, compiled filter)]
+    checks_by_key = {}  # {key: [(position, check)]}
+    for subscription in subscriptions:
+        compiled = __compile_subscription_filter(subscription, logger=logger)
+        if compiled is None:
+            continue
+        for key, check in compiled["checks"].items():
+            if key in INDEXED_FILTER_KEYS:
+                checks_by_key.setdefault(key, []).append((len(entries), check))
+        entries.append((subscription, compiled))
+    return {"entries": entries, "checks_by_key": checks_by_key, "rejected": {}}
+
+
+def get_matching_subscriptions(
+        subscription_index: dict[str, Any],
+        did: dict[str, Any],
+        metadata: dict[str, Any]
+) -> list[tuple[dict[str, Any], dict[str, Any]]]:
+    """
+    Get the subscriptions matching a DID.
+
+    :param subscription_index: The index built by build_subscription_index.
+    :param did: The DID dictionary
+    :param metadata: The metadata dictionary for the DID
+    :return: The list of (subscription, compiled filter) matching the DID, ordered by priority.
+    """
+    if metadata["hidden"]:
+        return []
+    rejected = set()
+    for key, checks in subscription_index["checks_by_key"].items():
+        value = __get_filter_value(key, did, metadata)
+        if (key, value) not in subscription_index["rejected"]:
+            subscription_index["rejected"][(key, value)] = frozenset(position for position, check in checks if not __passes_filter_check(check, value))
+        rejected.update(subscription_index["rejected"][(key, value)])
+    return [(subscription, compiled) for position, (subscription, compiled) in enumerate(subscription_index["entries"])
+            if position not in rejected and __is_matching_subscription(compiled, did, metadata)]
+
+
+def __is_matching_subscription(
+        compiled: dict[str, Any],
         did: dict[str, Any],
         metadata: dict[str, Any]
 ) -> bool:
     """
-    Internal method to identify if a DID matches a subscription.
+    Internal method to identify if a DID matches the non-indexed keys of a subscription filter.
 
-    :param subscription: The subscription dictionary.
+    :param compiled: The compiled filter of the subscription.
     :param did: The DID dictionary
     :param metadata: The metadata dictionary for the DID
     :return: True/False
     """
-    if metadata["hidden"]:
+    if compiled["pattern"] and not compiled["pattern"].match(did["name"]):
         return False
-    try:
-        filter_string = loads(subscription["filter"])
-    except ValueError as error:
-        logging.error("%s : Subscription will be skipped", error)
+    if compiled["excluded_pattern"] and compiled["excluded_pattern"].match(did["name"]):
         return False
-    # Loop over the keys of filter_string for subscription
-    for key in filter_string:
-        values = filter_string[key]
-        if key == "pattern":
-            if not re.match(values, did["name"]):
-                return False
-        elif key == "excluded_pattern":
-            if re.match(values, did["name"]):
-                return False
-        elif key == "split_rule":
-            pass
-        elif key == "scope":
-            match_scope = False
-            for scope in values:
-                if re.match(scope, did["scope"].internal):
-                    match_scope = True
-                    break
-            if not match_scope:
-                return False
-        elif key == "account":
-            match_account = False
-            if not isinstance(values, list):
-                values = [values]
-            for account in values:
-                if account == metadata["account"].internal:
-                    match_account = True
-                    break
-            if not match_account:
-                return False
-        elif key == "did_type":
-            match_did_type = False
-            if not isinstance(values, list):
-                values = [values]
-            for did_type in values:
-                if did_type == metadata["did_type"].name:
-                    match_did_type = True
-                    break
-            if not match_did_type:
-                return False
-        elif key in ["min_avg_file_size", "max_avg_file_size"]:
-            length = metadata["length"]
-            size = metadata["bytes"]
-            if length and size:
-                avg_file_size = size / length
-                if key == "min_avg_file_size" and avg_file_size < values:
-                    return False
-                if key == "max_avg_file_size" and avg_file_size > values:
-                    return False
-            else:
-                # If the DID is evaluated at the creation, length and bytes are not set yet
-                # In that case, just ignore min_avg_file_size and max_avg_file_size filter
-                continue
-        else:
-            if not isinstance(values, list):
-                values = [
-                    values,
-                ]
-            has_metadata = False
-            for meta in metadata:
-                if str(meta) == str(key):
-                    has_metadata = True
-                    match_meta = False
-                    for value in values:
-                        if re.match(str(value), str(metadata[meta])):
-                            match_meta = True
-                            break
-                    if not match_meta:
-                        return False
-            if not has_metadata:
-                return False
+    length = metadata["length"]
+    size = metadata["bytes"]
+    # If the DID is evaluated at the creation, length and bytes are not set yet
+    # In that case, just ignore min_avg_file_size and max_avg_file_size filter
+    if length and size:
+        avg_file_size = size / length
+        if compiled["min_avg_file_size"] is not None and avg_file_size < compiled["min_avg_file_size"]:
+            return False
+        if compiled["max_avg_file_size"] is not None and avg_file_size > compiled["max_avg_file_size"]:
+            return False
+    for key, check in compiled["checks"].items():
+        if key not in INDEXED_FILTER_KEYS and not __passes_filter_check(check, __get_filter_value(key, did, metadata)):
+            return False
     return True
 
 
@@ -457,6 +524,50 @@ def select_algorithm(
     return selected_rses
 
 
+def __add_rule_for_dids(
+    dids: list[dict[str, Any]],
+    logger: LoggerFunction,
+    **rule_kwargs
+) -> dict[tuple["InternalScope", str], str]:
+    """
+    Internal method to create the same rule on several DIDs. The rules are first created in a single
+    transaction. If this fails, they are created one DID at a time, so that an error only affects the faulty DID.
+
+    :param dids: The list of DIDs.
+    :param logger: The logger.
+    :param rule_kwargs: The parameters of the rule passed to add_rule.
+    :return: A dictionary with the created rule id per (scope, name).
+    """
+    dids = [{"scope": did["scope"], "name": did["name"]} for did in dids]
+    if len(dids) > 1:
+        try:
+            rule_ids = add_rule(dids=dids, **rule_kwargs)
+            return {(did["scope"], did["name"]): rule_id for did, rule_id in zip(dids, rule_ids)}
+        except Exception as error:
+            logger(logging.DEBUG, "Bulk creation of %d rules on %s failed, creating them one by one : %s", len(dids), rule_kwargs["rse_expression"], str(error))
+
+    created_rules = {}
+    for did in dids:
+        try:
+            rule_ids = add_rule(dids=[did], **rule_kwargs)
+            created_rules[(did["scope"], did["name"])] = rule_ids[0]
+        except (
+            InvalidReplicationRule,
+            InvalidRuleWeight,
+            InvalidRSEExpression,
+            StagingAreaRuleRequiresLifetime,
+            DuplicateRule,
+        ) as error:
+            # Errors that won't be retried
+            logger(logging.ERROR, str(error))
+            METRICS.counter("addnewrule.errortype.{exception}").labels(exception=str(error.__class__.__name__)).inc()
+        except Exception:
+            # Errors that will be retried
+            METRICS.counter("addnewrule.errortype.{exception}").labels(exception="unknown").inc()
+            logger(logging.ERROR, "Unexpected error", exc_info=True)
+    return created_rules
+
+
 def transmogrifier(bulk: int = 5, once: bool = False, sleep_time: int = 60) -> None:
     """
     Creates a Transmogrifier Worker that gets a list of new DIDs for a given hash,
@@ -489,21 +600,20 @@ def run_once(heartbeat_handler: "HeartbeatHandler", bulk: int, **_kwargs) -> boo
     identifiers = []
     #  List all the active subscriptions
     subscriptions = get_subscriptions(logger=logger)
+    subscription_index = build_subscription_index(subscriptions, logger=logger)
 
-    #  Loop over all the new DIDs
     #  Get the new DIDs based on the is_new flag
     logger(logging.DEBUG, "Listing new dids")
+    collections = []
     for did in list_new_dids(
         thread=worker_number,
         total_threads=total_workers,
         chunk_size=bulk,
         did_type=None,
     ):
-        _, _, logger = heartbeat_handler.live()
-        did_success = True
-        if not (
-            did["did_type"] == DIDType.DATASET or did["did_type"] == DIDType.CONTAINER
-        ):
+        if did["did_type"] == DIDType.DATASET or did["did_type"] == DIDType.CONTAINER:
+            collections.append(did)
+        else:
             identifiers.append(
                 {
                     "scope": did["scope"],
@@ -511,175 +621,165 @@ def run_once(heartbeat_handler: "HeartbeatHandler", bulk: int, **_kwargs) -> boo
                     "did_type": did["did_type"],
                 }
             )
+
+    #  Get the metadata of all the new collections at once
+    metadata_stopwatch = Stopwatch()
+    metadata = {}
+    if collections:
+        for meta in get_metadata_bulk([{"scope": did["scope"], "name": did["name"]} for did in collections], plugin="DID_COLUMN"):
+            metadata[(meta["scope"], meta["name"])] = meta
+    logger(logging.DEBUG, "Time to get the metadata of %i DIDs : %f", len(collections), metadata_stopwatch.elapsed)
+
+    #  Match the DIDs against the subscriptions
+    did_success = {}  # {(scope, name): success}
+    matched_dids = {}  # {subscription id: [dids]}
+    for did in collections:
+        did_key = (did["scope"], did["name"])
+        if did_key not in metadata:
+            logger(logging.WARNING, "%s:%s does not exist anymore", did["scope"], did["name"])
             continue
-        metadata = get_metadata(did["scope"], did["name"])
-
-        #  Loop over all the subscriptions
-        for subscription in subscriptions:
-            #  Check if the DID match the subscription
-            if __is_matching_subscription(subscription, did, metadata) is True:
-                filter_string = loads(subscription["filter"])
-                split_rule = filter_string.get("split_rule", False)
-                stime = time.time()
-                logger(
-                    logging.INFO,
-                    "%s:%s matches subscription %s"
-                    % (did["scope"], did["name"], subscription["name"]),
+        did_success[did_key] = True
+        for subscription, _ in get_matching_subscriptions(subscription_index, did, metadata[did_key]):
+            logger(
+                logging.INFO,
+                "%s:%s matches subscription %s"
+                % (did["scope"], did["name"], subscription["name"]),
+            )
+            matched_dids.setdefault(subscription["id"], []).append(did)
+
+    #  Loop over the subscriptions by priority and create their rules for all the matching DIDs
+    for subscription, compiled_filter in subscription_index["entries"]:
+        if subscription["id"] not in matched_dids:
+            continue
+        _, _, logger = heartbeat_handler.live()
+        split_rule = compiled_filter["split_rule"]
+        stime = time.time()
+        rules = loads(subscription["replication_rules"])
+        created_rules = {(did["scope"], did["name"]): {} for did in matched_dids[subscription["id"]]}
+        for cnt, rule_dict in enumerate(rules):
+            #  Get all the rule and subscription parameters
+            rule_dict = __get_rule_dict(rule_dict, subscription)
+            ignore_availability = rule_dict.get("ignore_availability", False)
+            chained_idx = rule_dict.get("chained_idx", None)
+
+            #  Group the DIDs getting the same rule, to create them together
+            rules_to_create = {}  # {(rse_expression, copies, weight, source_replica_expression): [dids]}
+            for did in matched_dids[subscription["id"]]:
+                did_key = (did["scope"], did["name"])
+                created_rules[did_key][cnt + 1] = []
+                weight = rule_dict.get("weight", None)
+                source_replica_expression = rule_dict.get(
+                    "source_replica_expression", None
                 )
-                rules = loads(subscription["replication_rules"])
-                created_rules = {}
-                for cnt, rule_dict in enumerate(rules):
-                    created_rules[cnt + 1] = []
-                    #  Get all the rule and subscription parameters
-                    rule_dict = __get_rule_dict(rule_dict, subscription)
-                    weight = rule_dict.get("weight", None)
-                    ignore_availability = rule_dict.get("ignore_availability", False)
-                    source_replica_expression = rule_dict.get(
-                        "source_replica_expression", None
-                    )
-                    copies = rule_dict["copies"]
-                    success = False
-
-                    chained_idx = rule_dict.get("chained_idx", None)
-                    #  By default selected_rses contains only the rse_expression
-                    #  It is overwritten in 2 cases : Chained subscription and split_rule
-                    selected_rses = [rule_dict.get("rse_expression")]
-                    if chained_idx:
-                        #  In the case of chained subscription, don't use rseselector but use the rses returned by the algorithm
-                        params = {}
-                        params['rse_expression'] = rule_dict.get("rse_expression")
-                        params['subscription_id'] = subscription["id"]
-                        params['subscription_name'] = subscription["name"]
-                        params['blocklisted_rse_ids'] = blocklisted_rse_ids
-                        if rule_dict.get("associated_site_idx", None):
-                            params["associated_site_idx"] = rule_dict.get(
-                                "associated_site_idx", None
-                            )
-                        logger(
-                            logging.DEBUG,
-                            "Chained subscription identified. Will use %s",
-                            str(created_rules[chained_idx]),
+                copies = rule_dict["copies"]
+
+                #  By default selected_rses contains only the rse_expression
+                #  It is overwritten in 2 cases : Chained subscription and split_rule
+                selected_rses = [rule_dict.get("rse_expression")]
+                if chained_idx:
+                    #  In the case of chained subscription, don't use rseselector but use the rses returned by the algorithm
+                    params = {}
+                    params['rse_expression'] = rule_dict.get("rse_expression")
+                    params['subscription_id'] = subscription["id"]
+                    params['subscription_name'] = subscription["name"]
+                    params['blocklisted_rse_ids'] = blocklisted_rse_ids
+                    if rule_dict.get("associated_site_idx", None):
+                        params["associated_site_idx"] = rule_dict.get(
+                            "associated_site_idx", None
                         )
-                        algorithm = rule_dict.get("algorithm", None)
-                        selected_rses = select_algorithm(
-                            algorithm,
-                            created_rules[chained_idx],
-                            params,
-                            logger
-                        )
-                        copies = 1
-                    elif split_rule:
-                        (
-                            selected_rses,
-                            create_rule,
-                            wont_reevaluate,
-                        ) = __split_rule_select_rses(
-                            subscription_id=subscription["id"],
-                            subscription_name=subscription["name"],
-                            scope=did["scope"],
-                            name=did["name"],
-                            account=rule_dict.get("account"),
-                            weight=weight,
-                            rse_expression=rule_dict.get("rse_expression"),
-                            copies=copies,
-                            blocklisted_rse_ids=blocklisted_rse_ids,
-                            logger=logger,
+                    logger(
+                        logging.DEBUG,
+                        "Chained subscription identified. Will use %s",
+                        str(created_rules[did_key][chained_idx]),
+                    )
+                    algorithm = rule_dict.get("algorithm", None)
+                    selected_rses = select_algorithm(
+                        algorithm,
+                        created_rules[did_key][chained_idx],
+                        params,
+                        logger
+                    )
+                    copies = 1
+                elif split_rule:
+                    (
+                        selected_rses,
+                        create_rule,
+                        wont_reevaluate,
+                    ) = __split_rule_select_rses(
+                        subscription_id=subscription["id"],
+                        subscription_name=subscription["name"],
+                        scope=did["scope"],
+                        name=did["name"],
+                        account=rule_dict.get("account"),
+                        weight=weight,
+                        rse_expression=rule_dict.get("rse_expression"),
+                        copies=copies,
+                        blocklisted_rse_ids=blocklisted_rse_ids,
+                        logger=logger,
+                    )
+                    copies = 1
+                    if not create_rule:
+                        continue
+                    # The DID won't be reevaluated at the next cycle
+                    did_success[did_key] = did_success[did_key] and wont_reevaluate
+
+                logger(logging.DEBUG, 'selected_rses : %s' % selected_rses)
+                for rse in selected_rses:
+                    if isinstance(selected_rses, dict):
+                        #  selected_rses is a dictionary only when split_rule is True or for chained subscriptions
+                        source_replica_expression = selected_rses[rse].get(
+                            "source_replica_expression",
+                            None,
                         )
-                        copies = 1
-                        if not create_rule:
+                        weight = selected_rses[rse].get("weight", None)
+                    logger(
+                        logging.INFO,
+                        "Will insert one rule for %s:%s on %s",
+                        did["scope"], did["name"], rse,
+                    )
+                    if rse in block_listed and rule_dict.get("wildcard"):
+                        if ignore_availability:
+                            logger(logging.WARNING, "RSE %s is unavailable, but wildcard number of copies is used with ignore_availability option. Creating a rule", rse)
+                        else:
+                            logger(logging.INFO, "RSE %s is unavailable and wildcard number of copies is used. Skipping rule creation", rse)
                             continue
-                        # The DID won't be reevaluated at the next cycle
-                        did_success = did_success and wont_reevaluate
-
-                    nb_rule = 0
-                    #  Try to create the rule
-                    logger(logging.DEBUG, 'selected_rses : %s' % selected_rses)
-                    for rse in selected_rses:
-                        if isinstance(selected_rses, dict):
-                            #  selected_rses is a dictionary only when split_rule is True or for chained subscriptions
-                            source_replica_expression = selected_rses[rse].get(
-                                "source_replica_expression",
-                                None,
-                            )
-                            weight = selected_rses[rse].get("weight", None)
-                        logger(
-                            logging.INFO,
-                            "Will insert one rule for %s:%s on %s",
-                            did["scope"], did["name"], rse,
-                        )
-                        if rse in block_listed and rule_dict.get("wildcard"):
-                            if ignore_availability:
-                                logger(logging.WARNING, "RSE %s is unavailable, but wildcard number of copies is used with ignore_availability option. Creating a rule", rse)
-                            else:
-                                logger(logging.INFO, "RSE %s is unavailable and wildcard number of copies is used. Skipping rule creation", rse)
-                                continue
-                        try:
-                            rule_ids = add_rule(
-                                dids=[
-                                    {
-                                        "scope": did["scope"],
-                                        "name": did["name"],
-                                    }
-                                ],
-                                account=rule_dict.get("account"),
-                                copies=copies,
-                                rse_expression=rse,
-                                grouping=rule_dict.get("grouping", "DATASET"),
-                                weight=weight,
-                                lifetime=rule_dict.get("lifetime", None),
-                                locked=rule_dict.get("locked", None),
-                                subscription_id=subscription["id"],
-                                source_replica_expression=source_replica_expression,
-                                activity=rule_dict.get("activity"),
-                                purge_replicas=rule_dict.get("purge_replicas", False),
-                                ignore_availability=ignore_availability,
-                                comment=rule_dict.get("comment"),
-                                delay_injection=rule_dict.get("delay_injection"),
-                            )
-                            created_rules[cnt + 1].append(rule_ids[0])
-                            nb_rule += 1
-                            if nb_rule == copies:
-                                success = True
-                            if split_rule:
-                                success = True
-
-                        except (
-                            InvalidReplicationRule,
-                            InvalidRuleWeight,
-                            InvalidRSEExpression,
-                            StagingAreaRuleRequiresLifetime,
-                            DuplicateRule,
-                        ) as error:
-                            # Errors that won't be retried
-                            success = True
-                            logger(logging.ERROR, str(error))
-                            METRICS.counter("addnewrule.errortype.{exception}").labels(exception=str(error.__class__.__name__)).inc()
-                        except Exception:
-                            # Errors that will be retried
-                            METRICS.counter("addnewrule.errortype.{exception}").labels(exception="unknown").inc()
-                            logger(logging.ERROR, "Unexpected error", exc_info=True)
-
-                    METRICS.counter("addnewrule.done").inc(nb_rule)
-                    METRICS.counter("addnewrule.activity.{activity}").labels(activity="".join(rule_dict.get("activity").split())).inc(nb_rule)
-                    success = True
-
-                    did_success = did_success and success
-                    if not success:
-                        logger(
-                            logging.ERROR,
-                            "Rule for %s:%s on %s cannot be inserted",
-                            did["scope"],
-                            did["name"],
-                            rule_dict.get("rse_expression"),
-                        )
-                    else:
-                        logger(
-                            logging.INFO,
-                            "%s rule(s) inserted in %f seconds",
-                            str(nb_rule), time.time() - stime,
-                        )
+                    rules_to_create.setdefault((rse, copies, weight, source_replica_expression), []).append(did)
+
+            #  Try to create the rules
+            nb_rule = 0
+            for (rse, copies, weight, source_replica_expression), dids in rules_to_create.items():
+                rule_ids = __add_rule_for_dids(
+                    dids,
+                    logger=logger,
+                    account=rule_dict.get("account"),
+                    copies=copies,
+                    rse_expression=rse,
+                    grouping=rule_dict.get("grouping", "DATASET"),
+                    weight=weight,
+                    lifetime=rule_dict.get("lifetime", None),
+                    locked=rule_dict.get("locked", None),
+                    subscription_id=subscription["id"],
+                    source_replica_expression=source_replica_expression,
+                    activity=rule_dict.get("activity"),
+                    purge_replicas=rule_dict.get("purge_replicas", False),
+                    ignore_availability=ignore_availability,
+                    comment=rule_dict.get("comment"),
+                    delay_injection=rule_dict.get("delay_injection"),
+                )
+                for did_key, rule_id in rule_ids.items():
+                    created_rules[did_key][cnt + 1].append(rule_id)
+                nb_rule += len(rule_ids)
+
+            METRICS.counter("addnewrule.done").inc(nb_rule)
+            METRICS.counter("addnewrule.activity.{activity}").labels(activity="".join(rule_dict.get("activity").split())).inc(nb_rule)
+            logger(
+                logging.INFO,
+                "%s rule(s) inserted in %f seconds",
+                str(nb_rule), time.time() - stime,
+            )
 
-        if did_success:
+    for did in collections:
+        if did_success.get((did["scope"], did["name"])):
             if did["did_type"] == str(DIDType.FILE):
                 METRICS.counter(name="files_processed").inc()
             elif did["did_type"] == str(DIDType.DATASET):
@@ -697,7 +797,7 @@ def run_once(heartbeat_handler: "HeartbeatHandler", bulk: int, **_kwargs) -> boo
 
     #  Mark the DIDs as processed
     flag_stopwatch = Stopwatch()
-    for identifier in chunks(identifiers, 100):
+    for identifier in chunks(identifiers, 1000):
         set_new_dids(identifier, None)
     logger(logging.DEBUG, "Time to set the new flag : %f", flag_stopwatch.elapsed)
 
@@ -72,6 +72,14 @@ def build_database() -> None:
 
     models.register_models(engine)
 
+    json_indexed_keys = config_get_list('metadata', 'json_indexed_keys', raise_exception=False, default=[], check_config_table=False)
+    if json_indexed_keys:
+        from rucio.core.did_meta_plugins.json_meta import create_json_meta_indexes
+        if json_implemented():
+            print('Creating the indexes of the JSON metadata keys:', ', '.join(create_json_meta_indexes(keys=json_indexed_keys)) or 'already existing')
+        else:
+            print('JSON metadata is not supported by the database, not creating the indexes of metadata/json_indexed_keys')
+
     # Put the database under version control
     alembic_cfg = Config(config_get('alembic', 'cfg'))
     command.stamp(alembic_cfg, "head")
@@ -12,10 +12,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+
 from dogpile.cache import make_region
 
-from rucio.common.config import is_client
+from rucio.common.cache import FileCache
+from rucio.common.config import config_get, config_get_int, is_client
 from rucio.common.constants import DEFAULT_VO
+from rucio.common.utils import get_tmp_dir
 from rucio.rse import rsemanager
 
 if is_client():
@@ -29,10 +33,41 @@ else:
 def get_rse_client(rse, vo=DEFAULT_VO, **kwarg):
     '''
     get_rse_client
+
+    Uses the on-disk RSE_FILE_CACHE when enabled: fresh entries are returned without
+    contacting the server, and expired ones are validated with their ETag.
     '''
     from rucio.client.rseclient import RSEClient
-    client = RSEClient(vo=vo)
-    return client.get_rse(rse)
+    if RSE_FILE_CACHE is None:
+        return RSEClient(vo=vo).get_rse(rse)
+
+    key = '{}:{}:{}'.format(config_get('client', 'rucio_host', False, ''), rse, vo)
+    entry = RSE_FILE_CACHE.get(key)
+    if entry is not None and not RSE_FILE_CACHE.is_expired(entry):
+        return entry.value
+    rse_info, etag = RSEClient(vo=vo).get_rse_with_etag(rse, etag=entry.etag if entry is not None else None)
+    if rse_info is None:
+        rse_info = entry.value
+    RSE_FILE_CACHE.set(key, rse_info, etag)
+    return rse_info
+
+
+def get_rse_file_cache():
+    '''
+    Returns the on-disk cache of the RSE info of the clients, or None if rse_info_cache_ttl is 0.
+
+    The cache is in the rse_info_cache_dir of the client section, by default in
+    $RUCIO_HOME/cache/rse_info, or next to the tokens if RUCIO_HOME is not set.
+    '''
+    expiration_time = config_get_int('client', 'rse_info_cache_ttl', False, 900)
+    if expiration_time <= 0:
+        return None
+    if 'RUCIO_HOME' in os.environ:
+        default_directory = os.path.join(os.environ['RUCIO_HOME'], 'cache', 'rse_info')
+    else:
+        default_directory = os.path.join(get_tmp_dir(), '.rucio_cache', 'rse_info')
+    directory = os.path.expanduser(os.path.expandvars(config_get('client', 'rse_info_cache_dir', False, default_directory)))
+    return FileCache(directory, expiration_time)
 
 
 def get_signed_url_client(rse, service, op, url, vo=DEFAULT_VO):
@@ -75,6 +110,7 @@ if rsemanager.CLIENT_MODE:   # pylint:disable=no-member
         'dogpile.cache.memory',
         expiration_time=900)
     setattr(rsemanager, 'RSE_REGION', RSE_REGION)
+    RSE_FILE_CACHE = get_rse_file_cache()
 
 
 if rsemanager.SERVER_MODE:   # pylint:disable=no-member
@@ -12,16 +12,170 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import errno
 import logging
+import mmap
 import os
 import os.path
 import shutil
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from subprocess import call
+from typing import TYPE_CHECKING, Optional
 
 from rucio.common import exception
-from rucio.common.checksum import adler32
+from rucio.common.checksum import CHECKSUM_BLOCK_SIZE, adler32
+from rucio.common.config import config_get_int
 from rucio.rse.protocols import protocol
 
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from rucio.common.checksum import ChecksumCalculator
+
+# ioctl cloning a file on file systems with reflinks, e.g. Btrfs and XFS (fcntl.FICLONE from Python 3.12)
+FICLONE = 0x40049409
+# errors of copy_file_range and sendfile when the file systems do not support them for the files,
+# ENOTSOCK for the platforms where sendfile only writes to sockets, e.g. macOS
+_UNSUPPORTED_COPY_ERRNOS = (errno.EXDEV, errno.ENOSYS, errno.EOPNOTSUPP, errno.EINVAL, errno.ENOTSOCK)
+
+
+def _clone(source_fd: int, dest_fd: int) -> bool:
+    """
+    Makes the destination share the blocks of the source, if the file system supports reflinks.
+
+    :returns: True if the file was cloned.
+    """
+    if not sys.platform.startswith('linux'):
+        return False
+    import fcntl
+    try:
+        fcntl.ioctl(dest_fd, getattr(fcntl, 'FICLONE', FICLONE), source_fd)
+        return True
+    except OSError:
+        return False
+
+
+def _copy_range(source_fd: int, dest_fd: int, offset: int, length: int) -> None:
+    """
+    Copies a range of the source to the same offset of the destination, in the kernel.
+
+    copy_file_range lets network and parallel file systems copy on the servers. If the file
+    systems do not support it, sendfile is used, then reads and writes. Outside Linux,
+    sendfile only writes to sockets and reads and writes are used directly. The position of
+    dest_fd is changed.
+    """
+    end = offset + length
+    if hasattr(os, 'copy_file_range'):
+        method = 'copy_file_range'
+    elif sys.platform.startswith('linux'):
+        method = 'sendfile'
+    else:
+        method = 'pwrite'
+    while offset < end:
+        try:
+            if method == 'copy_file_range':
+                copied = os.copy_file_range(source_fd, dest_fd, end - offset, offset, offset)
+            elif method == 'sendfile':
+                os.lseek(dest_fd, offset, os.SEEK_SET)
+                copied = os.sendfile(dest_fd, source_fd, offset, end - offset)
+            else:
+                copied = os.pwrite(dest_fd, os.pread(source_fd, min(end - offset, CHECKSUM_BLOCK_SIZE), offset), offset)
+        except (OSError, AttributeError) as error:
+            if method == 'pwrite' or (isinstance(error, OSError) and error.errno not in _UNSUPPORTED_COPY_ERRNOS):
+                raise
+            method = 'sendfile' if method == 'copy_file_range' else 'pwrite'
+            continue
+        if copied == 0:
+            if method == 'pwrite':
+                raise OSError(errno.EIO, 'Source file shrank during the copy')
+            # some file systems report their files as empty to copy_file_range and sendfile
+            method = 'sendfile' if method == 'copy_file_range' else 'pwrite'
+            continue
+        offset += copied
+
+
+def copy_file(
+        source: str,
+        dest: str,
+        checksum_calculator: Optional["ChecksumCalculator"] = None,
+        streams: int = 1,
+        chunk_size: int = 256 * 1024 * 1024,
+        parallel_threshold: int = 1024 * 1024 * 1024
+) -> None:
+    """
+    Copies a file and its permission bits without moving its content through Python.
+
+    The destination is cloned when the file system supports reflinks. Otherwise the content is
+    copied by the kernel, by chunks copied in parallel for files of at least parallel_threshold
+    bytes if streams is greater than 1.
+
+    When checksum_calculator is given, the source is mapped in memory and fed to it during the
+    same pass: each block is checksummed right before the kernel copies it from the page cache,
+    or while the parallel streams copy the chunks.
+
+    :param source: path of the source file
+    :param dest: path of the destination file, or of the directory where to copy it
+    :param checksum_calculator: calculator to feed with the content of the file
+    :param streams: the maximum number of threads copying the chunks of a large file
+    :param chunk_size: the size of the chunks copied by the threads
+    :param parallel_threshold: the minimum size of a file copied in parallel
+    """
+    if os.path.isdir(dest):
+        dest = os.path.join(dest, os.path.basename(source))
+    if os.path.exists(dest) and os.path.samefile(source, dest):
+        raise shutil.SameFileError('{!r} and {!r} are the same file'.format(source, dest))
+
+    with open(source, 'rb') as source_file, open(dest, 'wb') as dest_file:
+        source_fd, dest_fd = source_file.fileno(), dest_file.fileno()
+        size = os.fstat(source_fd).st_size
+
+        if size:
+            mapped = mmap.mmap(source_fd, 0, access=mmap.ACCESS_READ) if checksum_calculator is not None else None
+            try:
+                if _clone(source_fd, dest_fd):
+                    if mapped is not None:
+                        _checksum_blocks(checksum_calculator, mapped)
+                elif streams > 1 and size >= parallel_threshold:
+                    os.ftruncate(dest_fd, size)
+                    with ThreadPoolExecutor(max_workers=streams) as executor:
+                        futures = [executor.submit(_copy_chunk, source, dest, offset, min(chunk_size, size - offset))
+                                   for offset in range(0, size, chunk_size)]
+                        if mapped is not None:
+                            _checksum_blocks(checksum_calculator, mapped)
+                        for future in futures:
+                            future.result()
+                elif mapped is not None:
+                    _checksum_blocks(checksum_calculator, mapped, partial(_copy_range, source_fd, dest_fd))
+                else:
+                    _copy_range(source_fd, dest_fd, 0, size)
+            finally:
+                if mapped is not None:
+                    mapped.close()
+    shutil.copymode(source, dest)
+
+
+def _checksum_blocks(
+        checksum_calculator: "ChecksumCalculator",
+        mapped: mmap.mmap,
+        copy_block: Optional["Callable[[int, int], None]"] = None
+) -> None:
+    # copies each block right after checksumming it, while it is in the page cache
+    with memoryview(mapped) as view:
+        for offset in range(0, len(view), CHECKSUM_BLOCK_SIZE):
+            block = view[offset:offset + CHECKSUM_BLOCK_SIZE]
+            checksum_calculator.update(block)
+            if copy_block is not None:
+                copy_block(offset, len(block))
+            block.release()
+
+
+def _copy_chunk(source: str, dest: str, offset: int, length: int) -> None:
+    # each thread has its own descriptors, sendfile writes at the position of the destination
+    with open(source, 'rb') as source_file, open(dest, 'r+b') as dest_file:
+        _copy_range(source_file.fileno(), dest_file.fileno(), offset, length)
+
 
 class Default(protocol.RSEProtocol):
     """ Implementing access to RSEs using the local filesystem."""
@@ -69,7 +223,7 @@ class Default(protocol.RSEProtocol):
             :raises SourceNotFound: if the source file was not found on the referred storage.
          """
         try:
-            shutil.copy(self.pfn2path(pfn), dest)
+            self._copy_file(self.pfn2path(pfn), dest, self.checksum_calculator)
         except OSError as e:
             try:  # To check if the error happened local or remote
                 with open(dest, 'wb'):
@@ -85,6 +239,19 @@ class Default(protocol.RSEProtocol):
             else:
                 raise exception.ServiceUnavailable(e)
 
+    def _copy_file(self, source, dest, checksum_calculator=None):
+        """ Copies a file with copy_file, in parallel streams for large files if configured.
+
+            :param source: path of the source file
+            :param dest: path of the destination file
+            :param checksum_calculator: calculator to feed with the content of the file
+        """
+        copy_file(source, dest,
+                  checksum_calculator=checksum_calculator,
+                  streams=config_get_int('posix', 'parallel_copy_streams', False, 1),
+                  chunk_size=config_get_int('posix', 'parallel_copy_chunk_size', False, 256 * 1024 * 1024),
+                  parallel_threshold=config_get_int('posix', 'parallel_copy_threshold', False, 1024 * 1024 * 1024))
+
     def put(self, source, target, source_dir=None, transfer_timeout=None):
         """
             Allows to store files inside the referred RSE.
@@ -108,7 +275,7 @@ class Default(protocol.RSEProtocol):
             dirs = os.path.dirname(target)
             if not os.path.exists(dirs):
                 os.makedirs(dirs)
-            shutil.copy(sf, target)
+            self._copy_file(sf, target)
         except OSError as e:
             if e.errno == 2:
                 raise exception.SourceNotFound(e)
@@ -117,7 +284,7 @@ class Default(protocol.RSEProtocol):
                 for p in self.rse['prefix'].split('/'):
                     path += p + '/'
                     os.mkdir(path)
-                shutil.copy(sf, self.pfn2path(target))
+                self._copy_file(sf, self.pfn2path(target))
             else:
                 raise exception.DestinationNotAccessible(e)
 
@@ -38,12 +38,16 @@ if getattr(rsemanager, 'SERVER_MODE', None) or TYPE_CHECKING:
 if TYPE_CHECKING:
     from collections.abc import Iterable
 
+    from rucio.common.checksum import ChecksumCalculator
     from rucio.common.types import DIDDict
 
 
 class RSEProtocol(ABC):
     """ This class is virtual and acts as a base to inherit new protocols from. It further provides some common functionality which applies for the majority of the protocols."""
 
+    # When set by the caller, the protocols seeing the bytes of a get update it with every block they write
+    checksum_calculator: Optional["ChecksumCalculator"] = None
+
     def __init__(
             self,
             protocol_attr: dict[str, Any],
@@ -287,6 +291,29 @@ class RSEProtocol(ABC):
          """
         raise NotImplementedError
 
+    def get_range(
+            self,
+            path: str,
+            dest: str,
+            offset: int,
+            length: int,
+            transfer_timeout: Optional[int] = None
+    ) -> None:
+        """
+            Provides access to a byte range of a file stored inside the connected RSE.
+            Protocols implementing it allow the parallel download of the parts of a file.
+
+            :param path: Physical file name of requested file
+            :param dest: Name and path of the existing file at the client, where the range is written at the same offset
+            :param offset: The offset of the first byte of the range
+            :param length: The number of bytes of the range
+            :param transfer_timeout: Transfer timeout (in seconds)
+
+            :raises ServiceUnavailable: if some generic error occurred in the library.
+            :raises SourceNotFound: if the source file was not found on the referred storage.
+         """
+        raise NotImplementedError
+
     @abstractmethod
     def put(
             self,
@@ -302,6 +302,8 @@ class Default(protocol.RSEProtocol):
                         print('Malformed HTTP response (missing content-length header).')
                     for chunk in result.iter_content(chunksize):
                         file_out.write(chunk)
+                        if self.checksum_calculator is not None:
+                            self.checksum_calculator.update(chunk)
                         if length:
                             nchunk += 1
             elif result.status_code in [404, ]:
@@ -316,6 +318,49 @@ class Default(protocol.RSEProtocol):
         except requests.exceptions.ReadTimeout as error:
             raise exception.ServiceUnavailable(error)
 
+    def get_range(self, pfn, dest, offset, length, transfer_timeout=None):
+        """ Provides access to a byte range of a file stored inside the connected RSE.
+
+            :param pfn: Physical file name of requested file
+            :param dest: Name and path of the existing file at the client, where the range is written at the same offset
+            :param offset: The offset of the first byte of the range
+            :param length: The number of bytes of the range
+            :param transfer_timeout: Transfer timeout (in seconds)
+
+            :raises ServiceUnavailable, SourceNotFound, RSEAccessDenied
+        """
+        path = self.path2pfn(pfn)
+        chunksize = 1024 * 1024
+        transfer_timeout = self.timeout if transfer_timeout is None else transfer_timeout
+        headers = {'Range': 'bytes=%d-%d' % (offset, offset + length - 1)}
+
+        try:
+            result = self.session.get(path, verify=False, stream=True, headers=headers, timeout=transfer_timeout, cert=self.cert)
+            if result.status_code in [206, ]:
+                with open(dest, 'r+b') as file_out:
+                    file_out.seek(offset)
+                    received = 0
+                    for chunk in result.iter_content(chunksize):
+                        file_out.write(chunk)
+                        received += len(chunk)
+                if received != length:
+                    raise exception.ServiceUnavailable('Received %d bytes instead of %d for the range at offset %d' % (received, length, offset))
+            elif result.status_code in [200, ]:
+                # the server ignored the range, the caller has to fall back to a full get
+                result.close()
+                raise NotImplementedError('The server does not support range requests')
+            elif result.status_code in [404, ]:
+                raise exception.SourceNotFound()
+            elif result.status_code in [401, 403]:
+                raise exception.RSEAccessDenied()
+            else:
+                # catchall exception
+                raise exception.RucioException(result.status_code, result.text)
+        except requests.exceptions.ConnectionError as error:
+            raise exception.ServiceUnavailable(error)
+        except requests.exceptions.ReadTimeout as error:
+            raise exception.ServiceUnavailable(error)
+
     def put(self, source, target, source_dir=None, transfer_timeout=None, progressbar=False):
         """ Allows to store files inside the referred RSE.
 
@@ -501,6 +501,8 @@ class RSE(ErrorHandlingMethodView):
                       type: integer
                     availability_delete:
                       description: "If the RSE is deletable."
+          304:
+            description: "Not modified, the RSE properties match the ETag of the If-None-Match header"
           401:
             description: "Invalid Auth Token"
           404:
@@ -511,7 +513,9 @@ class RSE(ErrorHandlingMethodView):
         try:
             rse = get_rse(rse=rse, vo=request.environ['vo'])
             rse['availability'] = Availability(rse['availability_read'], rse['availability_write'], rse['availability_delete']).integer
-            return Response(render_json(**rse), content_type="application/json")
+            response = Response(render_json(**rse), content_type="application/json")
+            response.add_etag()
+            return response.make_conditional(request)
         except RSENotFound as error:
             return generate_http_error_flask(404, error)
 
@@ -11,6 +11,10 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import json
+import os
+import time
+from datetime import datetime
 from unittest.mock import Mock
 
 import pytest
@@ -19,7 +23,7 @@ from dogpile.cache.backends.null import NullBackend
 from dogpile.cache.util import function_key_generator
 
 import rucio.common.cache as cache
-from rucio.common.cache import CacheKey, MemcacheRegion
+from rucio.common.cache import CacheKey, FileCache, MemcacheRegion
 
 
 class TestCache:
@@ -94,3 +98,41 @@ class TestCache:
         def test_value(self):
             expected = "get_test_test2"
             assert CacheKey.value(self.section, self.option) == expected
+
+    class TestFileCache:
+        def test_set_get(self, tmp_path):
+            file_cache = FileCache(str(tmp_path / 'rse_info'), expiration_time=60)
+            assert file_cache.get('MOCK:def') is None
+
+            file_cache.set('MOCK:def', {'rse': 'MOCK', 'protocols': []}, etag='"abc"')
+            entry = FileCache(str(tmp_path / 'rse_info'), expiration_time=60).get('MOCK:def')
+            assert entry.value == {'rse': 'MOCK', 'protocols': []}
+            assert entry.etag == '"abc"'
+            assert not file_cache.is_expired(entry)
+            assert file_cache.is_expired(entry._replace(created_at=time.time() - 61))
+
+            file_cache.set('MOCK:def', {'rse': 'MOCK', 'protocols': [{'scheme': 'root'}]})
+            assert file_cache.get('MOCK:def').value == {'rse': 'MOCK', 'protocols': [{'scheme': 'root'}]}
+            assert file_cache.get('MOCK:def').etag is None
+            # only the entry is left, the temporary files are renamed
+            assert len(os.listdir(tmp_path / 'rse_info')) == 1
+
+        def test_corrupted_entry(self, tmp_path):
+            file_cache = FileCache(str(tmp_path), expiration_time=60)
+            file_cache.set('MOCK:def', {'rse': 'MOCK'})
+            with open(file_cache._path('MOCK:def'), 'wb') as f:
+                f.write(b'not a cache entry')
+            assert file_cache.get('MOCK:def') is None
+
+        def test_json_entry(self, tmp_path):
+            file_cache = FileCache(str(tmp_path), expiration_time=60)
+            value = {'rse': 'MOCK', 'updated_at': datetime(2024, 1, 2, 3, 4, 5), 'protocols': [{'scheme': 'root', 'port': 1094}]}
+            file_cache.set('MOCK:def', value, etag='"abc"')
+            with open(file_cache._path('MOCK:def')) as f:
+                assert json.load(f)['value']['updated_at'] == 'Tue, 02 Jan 2024 03:04:05 UTC'
+            assert file_cache.get('MOCK:def').value == value
+
+            # values which cannot be stored as JSON are not cached
+            file_cache.set('MOCK:def', object())
+            assert file_cache.get('MOCK:def').value == value
+            assert len(os.listdir(tmp_path)) == 1
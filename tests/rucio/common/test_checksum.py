@@ -12,11 +12,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import hashlib
+import os
+import zlib
 from unittest.mock import Mock
 
 import pytest
 
-from rucio.common.checksum import GLOBALLY_SUPPORTED_CHECKSUMS, adler32, crc32, is_checksum_valid, md5, set_preferred_checksum, sha256
+from rucio.common.checksum import CHECKSUM_BLOCK_SIZE, GLOBALLY_SUPPORTED_CHECKSUMS, ChecksumCalculator, adler32, calculate_checksums, checksum_files, crc32, is_checksum_valid, md5, set_preferred_checksum, sha256
 from rucio.common.exception import ChecksumCalculationError
 
 
@@ -82,3 +85,40 @@ class TestChecksumCalculation:
 
     def test_crc32(self, test_file_to_checksum):
         assert crc32(test_file_to_checksum) == 'C843500'
+
+    def test_calculate_checksums(self, test_file_to_checksum):
+        assert calculate_checksums(test_file_to_checksum, ['adler32', 'md5', 'sha256', 'crc32']) == {
+            'adler32': '198d03ff',
+            'md5': '31d50dd6285b9ff9f8611d0762265d04',
+            'sha256': 'd1b81a303d340fb689c6b6f4f474d9e04f314ed9ad8925686e4106452b53181b',
+            'crc32': 'C843500',
+        }
+
+    def test_checksum_calculator_blocks(self):
+        calculator = ChecksumCalculator(['adler32', 'md5'])
+        calculator.update(b'hello ')
+        calculator.update(b'test\n')
+        assert calculator.bytes == 11
+        assert calculator.hexdigests() == {'adler32': '198d03ff', 'md5': '31d50dd6285b9ff9f8611d0762265d04'}
+
+    def test_checksum_calculator_not_streamable(self):
+        with pytest.raises(ValueError):
+            ChecksumCalculator(['merkle_sha256'])
+
+    def test_checksum_files(self, tmp_path, test_file_to_checksum):
+        empty_file = tmp_path / 'empty'
+        empty_file.write_bytes(b'')
+        large_file = tmp_path / 'large'
+        large_file.write_bytes(os.urandom(3 * CHECKSUM_BLOCK_SIZE // 2))
+        paths = [str(test_file_to_checksum), str(empty_file), str(large_file)]
+
+        checksums = checksum_files(paths, ['adler32', 'md5'], max_workers=2)
+        assert checksums[str(test_file_to_checksum)] == {'adler32': '198d03ff', 'md5': '31d50dd6285b9ff9f8611d0762265d04'}
+        assert checksums[str(empty_file)] == {'adler32': '00000001', 'md5': 'd41d8cd98f00b204e9800998ecf8427e'}
+        large_content = large_file.read_bytes()
+        assert checksums[str(large_file)] == {'adler32': '%08x' % zlib.adler32(large_content), 'md5': hashlib.md5(large_content).hexdigest()}
+
+    def test_checksum_files_no_file(self, test_file_to_checksum):
+        with pytest.raises(ChecksumCalculationError) as e:
+            checksum_files([str(test_file_to_checksum), 'no_file'], ['adler32'])
+        assert e.value.filepath == 'no_file'
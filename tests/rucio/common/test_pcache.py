@@ -0,0 +1,100 @@
+# Copyright European Organization for Nuclear Research (CERN) since 2012
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+import pytest
+
+from rucio.common.pcache import Pcache, PcacheIndex, unitize
+
+
+@pytest.mark.parametrize('size, expected', [
+    (0, '0B'),
+    (1023, '1023B'),
+    (1024, '1K'),
+    (1536, '1.5K'),
+    (5 * 1024 ** 3, '5G'),
+    (1024 ** 9, '1024Y'),
+])
+def test_unitize(size, expected):
+    assert unitize(size) == expected
+
+
+def _add_entry(pcache_dir, name, size):
+    entry = os.path.join(pcache_dir, 'CACHE', name, '')
+    os.makedirs(entry)
+    with open(os.path.join(entry, 'data'), 'wb') as f:
+        f.write(b'x' * size)
+    return entry
+
+
+class TestPcacheIndex:
+    def test_touch(self, tmp_path):
+        index = PcacheIndex(str(tmp_path / 'index.sqlite'))
+        assert index.created
+        assert index.total_size() == 0
+        assert index.least_recently_used(10) == []
+
+        for path, size in [('/cache/a/', 10), ('/cache/b/', 20), ('/cache/c/', 30)]:
+            index.touch(path, size)
+        # a new use of an entry updates its size and makes it the most recently used
+        index.touch('/cache/a/', 15)
+        assert index.total_size() == 65
+        assert index.least_recently_used(2) == ['/cache/b/', '/cache/c/']
+        assert index.least_recently_used(10) == ['/cache/b/', '/cache/c/', '/cache/a/']
+
+        index.remove('/cache/b/')
+        assert index.total_size() == 45
+        index.close()
+
+        index = PcacheIndex(str(tmp_path / 'index.sqlite'))
+        assert not index.created
+        assert index.least_recently_used(10) == ['/cache/c/', '/cache/a/']
+        index.clear()
+        assert index.total_size() == 0
+        index.close()
+
+    def test_reconcile(self, tmp_path):
+        pcache_dir = str(tmp_path)
+        index = PcacheIndex(str(tmp_path / 'index.sqlite'))
+        first = _add_entry(pcache_dir, 'first', 10)
+        second = _add_entry(pcache_dir, 'second', 20)
+        index.touch(first, 5)
+        index.touch(os.path.join(pcache_dir, 'CACHE', 'deleted', ''), 100)
+
+        assert index.reconcile(pcache_dir) == 30
+        assert index.total_size() == 30
+        # the known entry keeps its access time, the missing one is removed
+        assert index.least_recently_used(10) == [second, first]
+        index.close()
+
+
+def test_clean_cache_by_index(tmp_path):
+    pcache = Pcache()
+    pcache.pcache_dir = str(tmp_path)
+    pcache.log_file = str(tmp_path / 'pcache.log')
+    pcache.bytes_max = 100
+    pcache.hysterisis = 0.5
+    entries = [_add_entry(pcache.pcache_dir, 'entry_%d' % i, 20) for i in range(6)]
+    for entry in entries:
+        pcache.index_call('touch', entry, 20)
+    assert pcache.get_cache_size() == 120
+    assert pcache.over_limit()
+
+    pcache.clean_cache_by_index()
+    # the least recently used entries are deleted, until the cache is under the hysterisis
+    assert pcache.get_cache_size() == 40
+    assert pcache.index_call('least_recently_used', 10) == entries[4:]
+    assert [os.path.exists(entry) for entry in entries] == [False] * 4 + [True] * 2
+    pcache.index.close()
@@ -12,9 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import datetime
+import json
+
 import pytest
 
-from rucio.common.utils import ScopeExtractionAlgorithms, _encode_params_as_url_query_string, build_url, invert_dict
+from rucio.common.utils import ScopeExtractionAlgorithms, _encode_params_as_url_query_string, build_url, invert_dict, parse_response
 
 
 class TestUtils:
@@ -66,3 +69,17 @@ class TestUtils:
     )
     def test_default_scope_extraction_algorithm(self, did, scope, name):
         assert ScopeExtractionAlgorithms.extract_scope_default(did=did, scopes=None) == (scope, name)
+
+    def test_parse_response_datetime_fields(self):
+        line = b'{"name": "file", "created_at": "Mon, 02 Mar 2020 12:01:38 UTC", "note": "Tue, 03 Mar 2020 12:01:38 UTC", "nested": {"updated_at": "Mon, 02 Mar 2020 12:01:38 UTC"}}'
+        # the generic parser converts every string holding a date
+        generic = parse_response(line)
+        assert generic['note'] == datetime.datetime(2020, 3, 3, 12, 1, 38)
+        assert generic['nested']['updated_at'] == datetime.datetime(2020, 3, 2, 12, 1, 38)
+        # only the given fields are converted
+        parsed = parse_response(line, datetime_fields=['created_at'])
+        assert parsed['created_at'] == datetime.datetime(2020, 3, 2, 12, 1, 38)
+        assert parsed['note'] == 'Tue, 03 Mar 2020 12:01:38 UTC'
+        assert parsed['nested'] == {'updated_at': 'Mon, 02 Mar 2020 12:01:38 UTC'}
+        assert parse_response(line, datetime_fields=()) == json.loads(line)
+        assert parse_response('[{"created_at": "Mon, 02 Mar 2020 12:01:38 UTC"}, 1]', datetime_fields=['created_at']) == [{'created_at': datetime.datetime(2020, 3, 2, 12, 1, 38)}, 1]
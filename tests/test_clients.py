@@ -13,6 +13,7 @@
 # limitations under the License.
 
 from datetime import datetime, timedelta
+from functools import partial
 
 import pytest
 
@@ -180,6 +181,34 @@ class TestBaseClient:
         # The client did back-off multiple times before succeeding: 2 * 0.25s (authentication) + 2 * 0.25s (request) = 1s
         assert datetime.utcnow() - start_time > timedelta(seconds=0.9)
 
+    def test_run_concurrently(self, vo):
+        """ CLIENTS (BASECLIENT): Ensure concurrent calls share the connection pool and return their results in order"""
+        from rucio.client.baseclient import DEFAULT_POOL_MAXSIZE, BaseClient
+
+        class EchoPath(MockServer.Handler):
+            def do_GET(self):
+                self.send_code_and_message(200, {'x-rucio-auth-token': 'sometoken'}, self.path)
+
+        def failing_call():
+            raise RucioException('failed call')
+
+        with MockServer(EchoPath) as server:
+            creds = {'username': 'ddmlab', 'password': 'secret'}
+            client = BaseClient(rucio_host=server.base_url, auth_host=server.base_url, account='root', auth_type='userpass', creds=creds, vo=vo)
+            assert client.session.get_adapter(server.base_url)._pool_maxsize == DEFAULT_POOL_MAXSIZE
+
+            calls = [partial(client._send_request, '%s/%d' % (server.base_url, index), method=HTTPMethod.GET) for index in range(20)]
+            results = client.run_concurrently(calls, max_workers=4)
+            assert [result.text for result in results] == ['/%d' % index for index in range(20)]
+
+            results = client.run_concurrently([calls[0], failing_call, calls[1]], return_exceptions=True)
+            assert results[0].text == '/0'
+            assert isinstance(results[1], RucioException)
+            assert results[2].text == '/1'
+            with pytest.raises(RucioException):
+                client.run_concurrently([calls[0], failing_call])
+            assert client.run_concurrently([]) == []
+
 
 class TestRucioClients:
     """ To test Clients"""
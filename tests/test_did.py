@@ -16,6 +16,7 @@ from datetime import datetime, timedelta
 
 import pytest
 
+import rucio.core.did
 from rucio.common import exception
 from rucio.common.exception import DataIdentifierAlreadyExists, DataIdentifierNotFound, DuplicateContent, FileAlreadyExists, FileConsistencyMismatch, InvalidPath, ScopeNotFound, UnsupportedOperation, UnsupportedStatus
 from rucio.common.types import InternalScope
@@ -32,7 +33,10 @@ from rucio.core.did import (
     get_did_atime,
     get_metadata,
     get_users_following_did,
+    list_child_datasets,
+    list_did_tree,
     list_dids,
+    list_files,
     list_new_dids,
     remove_did_from_followed,
     set_metadata,
@@ -319,6 +323,39 @@ class TestDIDCore:
         for dataset in non_existing_datasets:
             assert (dataset['scope'], dataset['name']) not in parent_datasets
 
+    @pytest.mark.parametrize('recursive_cte', [True, False])
+    def test_list_did_tree(self, mock_scope, root_account, rse_factory, did_factory, recursive_cte, monkeypatch):
+        """ DATA IDENTIFIERS (CORE): Expand a container tree in one query or level by level """
+        monkeypatch.setattr(rucio.core.did, '_supports_recursive_cte', lambda session: recursive_cte)
+        _, rse_id = rse_factory.make_mock_rse()
+        top_container = did_factory.make_container()
+        sub_container = did_factory.make_container()
+        attach_dids(dids=[sub_container], account=root_account, **top_container)
+        datasets = [did_factory.make_dataset() for _ in range(3)]
+        attach_dids(dids=datasets[:1], account=root_account, **top_container)
+        attach_dids(dids=datasets[1:], account=root_account, **sub_container)
+        files = []
+        for dataset in datasets:
+            new_files = [{'scope': mock_scope, 'name': did_name_generator('file'), 'bytes': 1, 'adler32': '0cc737eb'} for _ in range(2)]
+            attach_dids(rse_id=rse_id, dids=new_files, account=root_account, **dataset)
+            files.extend(new_files)
+
+        tree = list(list_did_tree(**top_container))
+        assert len(tree) == 1 + len(datasets) + len(files)
+        assert {(row['child_scope'], row['child_name']) for row in tree if row['child_type'] == DIDType.CONTAINER} == {(sub_container['scope'], sub_container['name'])}
+
+        leaves = list(list_did_tree(did_type=DIDType.FILE, **top_container))
+        assert sorted(row['child_name'] for row in leaves) == sorted(file_['name'] for file_ in files)
+
+        listed_files = list(list_files(long=True, **top_container))
+        assert sorted(file_['name'] for file_ in listed_files) == sorted(file_['name'] for file_ in files)
+        assert all('lumiblocknr' in file_ for file_ in listed_files)
+
+        # a dataset reachable through two containers is listed once
+        attach_dids(dids=datasets[1:2], account=root_account, **top_container)
+        child_datasets = list_child_datasets(**top_container)
+        assert sorted(dataset['name'] for dataset in child_datasets) == sorted(dataset['name'] for dataset in datasets)
+
 
 class TestDIDGateway:
 
@@ -15,15 +15,20 @@
 from copy import deepcopy
 
 import pytest
+from sqlalchemy import inspect, text
 
+import rucio.core.did_meta_plugins
 from rucio.client.didclient import DIDClient
-from rucio.common.exception import KeyNotFound
+from rucio.common.exception import InvalidMetadata, KeyNotFound
 from rucio.common.utils import generate_uuid
-from rucio.core.did import add_did, delete_dids, get_metadata_bulk, set_dids_metadata_bulk, set_metadata_bulk
+from rucio.core.did import add_did, attach_dids, delete_dids, get_metadata_bulk, set_dids_metadata_bulk, set_metadata_bulk
 from rucio.core.did_meta_plugins import get_metadata, list_dids, set_metadata
 from rucio.core.did_meta_plugins.elasticsearch_meta import ElasticDidMeta
+from rucio.core.did_meta_plugins.json_meta import JSONDidMeta, create_json_meta_indexes
 from rucio.core.did_meta_plugins.mongo_meta import MongoDidMeta
 from rucio.core.did_meta_plugins.postgres_meta import ExternalPostgresJSONDidMeta
+from rucio.db.sqla import models
+from rucio.db.sqla.session import get_engine
 from rucio.db.sqla.util import json_implemented
 from rucio.tests.common import did_name_generator, skip_rse_tests_with_accounts
 
@@ -213,6 +218,81 @@ class TestDidMetaJSON:
         # assert [{'scope': (tmp_scope), 'name': tmp_dsn4}] == results
         assert [tmp_dsn4] == results
 
+    @pytest.mark.dirty
+    def test_list_did_meta_across_plugins(self, mock_scope, root_account):
+        """ DID Meta (JSON): List DIDs with filter keys of the base and the JSON plugins """
+        skip_without_json()
+
+        meta_key = 'my_key_%s' % generate_uuid()
+        meta_value = 'my_value_%s' % generate_uuid()
+        datasets = sorted(did_name_generator('dataset') for _ in range(3))
+        container = did_name_generator('container')
+        for dsn in datasets:
+            add_did(scope=mock_scope, name=dsn, did_type="DATASET", account=root_account)
+        add_did(scope=mock_scope, name=container, did_type="CONTAINER", account=root_account)
+        for name in datasets[:2] + [container]:
+            set_metadata(scope=mock_scope, name=name, key=meta_key, value=meta_value)
+
+        assert list(list_dids(mock_scope, {meta_key: meta_value, 'type': 'dataset'})) == datasets[:2]
+        assert list(list_dids(mock_scope, {meta_key: meta_value, 'type': 'all'}, limit=1)) == [min(datasets[:2] + [container])]
+        assert list(list_dids(mock_scope, {meta_key: meta_value, 'type': 'all'}, offset=1, limit=1)) == [sorted(datasets[:2] + [container])[1]]
+        assert list(list_dids(mock_scope, {meta_key: meta_value, 'type': 'dataset'}, ignore_case=True, offset=1)) == datasets[1:2]
+        dids = list(list_dids(mock_scope, [{meta_key: meta_value, 'type': 'container'}, {meta_key: meta_value, 'type': 'collection'}], long=True))
+        assert [did['name'] for did in dids] == sorted(datasets[:2] + [container])
+        assert {did['did_type'] for did in dids} == {'DATASET', 'CONTAINER'}
+
+    @pytest.mark.dirty
+    def test_list_did_meta_recursive(self, mock_scope, root_account):
+        """ DID Meta (JSON): List DIDs recursively in the matching collections """
+        skip_without_json()
+
+        meta_key = 'my_key_%s' % generate_uuid()
+        meta_value = 'my_value_%s' % generate_uuid()
+        container = did_name_generator('container')
+        datasets = sorted(did_name_generator('dataset') for _ in range(2))
+        add_did(scope=mock_scope, name=container, did_type="CONTAINER", account=root_account)
+        for dsn in datasets:
+            add_did(scope=mock_scope, name=dsn, did_type="DATASET", account=root_account)
+        attach_dids(scope=mock_scope, name=container, dids=[{'scope': mock_scope, 'name': dsn} for dsn in datasets], account=root_account)
+        for name in [container, datasets[0]]:
+            set_metadata(scope=mock_scope, name=name, key=meta_key, value=meta_value)
+
+        plugin = JSONDidMeta()
+        assert sorted(plugin.list_dids(mock_scope, {'name': container, meta_key: meta_value})) == [container]
+        assert sorted(plugin.list_dids(mock_scope, {'name': container, meta_key: meta_value}, recursive=True)) == [container, datasets[0]]
+
+    def test_create_json_meta_indexes_invalid_key(self):
+        """ DID Meta (JSON): Only word keys can be indexed """
+        with pytest.raises(InvalidMetadata):
+            create_json_meta_indexes(keys=["key'); DROP TABLE did_meta; --"])
+        with pytest.raises(InvalidMetadata):
+            create_json_meta_indexes(keys=['Run', 'run'])
+
+    def test_create_json_meta_indexes(self):
+        """ DID Meta (JSON): The indexes of the metadata keys are created once """
+        skip_without_json()
+
+        key = 'key_%s' % generate_uuid()[:8]
+        engine = get_engine()
+        if engine.dialect.name == 'oracle':
+            index_name = 'did_meta_json_idx'
+        else:
+            index_name = 'did_meta_%s_idx' % key
+        try:
+            created = create_json_meta_indexes(keys=[key, key])
+            assert created in ([index_name], [])
+            indexes = {index['name'].lower() for index in inspect(engine).get_indexes(models.DidMeta.__tablename__, schema=models.DidMeta.__table__.schema)}
+            assert index_name in indexes
+            assert create_json_meta_indexes(keys=[key]) == []
+        finally:
+            if index_name != 'did_meta_json_idx':
+                schema = '%s.' % models.DidMeta.__table__.schema if models.DidMeta.__table__.schema else ''
+                with engine.begin() as conn:
+                    if engine.dialect.name == 'mysql':
+                        conn.execute(text('ALTER TABLE %s%s DROP INDEX %s, DROP COLUMN meta_%s' % (schema, models.DidMeta.__tablename__, index_name, key)))
+                    else:
+                        conn.execute(text('DROP INDEX %s%s' % (schema, index_name)))
+
 
 @pytest.fixture(params=["with-auth", "no-auth"])
 def mongo_meta(request):
@@ -738,6 +818,38 @@ class TestDidMetaClient:
             assert did4 in results
 
 
+class _SortedListPlugin:
+    """ Plugin listing fixed DIDs in name order, recording the calls """
+
+    def __init__(self, key, names):
+        self.key, self.names, self.calls = key, names, []
+
+    def manages_key(self, key, *, session=None):
+        return key == self.key
+
+    def list_dids_sorted(self, scope, filters, did_type='collection', ignore_case=False, *, session=None):
+        self.calls.append({'filters': filters, 'ignore_case': ignore_case})
+        for name in sorted(self.names):
+            yield {'scope': scope, 'name': name, 'did_type': 'DATASET', 'bytes': None, 'length': None}
+
+
+def test_list_dids_across_plugins_pagination(mock_scope, monkeypatch):
+    """ DID Meta: Paginate the DIDs intersected across plugins """
+    base = _SortedListPlugin('base_key', ['a', 'b', 'c', 'd', 'e'])
+    other = _SortedListPlugin('other_key', ['b', 'c', 'd', 'e', 'f'])
+    monkeypatch.setattr(rucio.core.did_meta_plugins, 'METADATA_PLUGIN_MODULES', [base, other])
+
+    filters = [{'base_key': 1, 'other_key': 2}, {'other_key': 3}]
+    assert list(list_dids(mock_scope, filters)) == ['b', 'c', 'd', 'e']
+    assert list(list_dids(mock_scope, filters, offset=1, limit=2)) == ['c', 'd']
+    assert list(list_dids(mock_scope, filters, offset=10)) == []
+
+    list(list_dids(mock_scope, filters, ignore_case=True))
+    assert base.calls[-1]['ignore_case'] and other.calls[-1]['ignore_case']
+    assert base.calls[-1]['filters'] == [{}]
+    assert other.calls[-1]['filters'] == [{'other_key': 3}]
+
+
 @pytest.fixture
 def testdid(vo, mock_scope, root_account):
     did_name = did_name_generator('dataset')
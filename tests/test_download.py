@@ -16,13 +16,15 @@ import logging
 import os
 import shutil
 import tarfile
+import time
 from tempfile import NamedTemporaryFile, TemporaryDirectory
+from threading import Lock
 from unittest.mock import ANY, MagicMock, patch
 from zipfile import ZipFile
 
 import pytest
 
-from rucio.client.downloadclient import DownloadClient
+from rucio.client.downloadclient import DownloadClient, HostConcurrencyLimiter
 from rucio.common.checksum import md5
 from rucio.common.config import config_add_section, config_set
 from rucio.common.exception import InputValidationError, NoFilesDownloaded, RucioException
@@ -827,3 +829,71 @@ def test_download_dataset(download_client, rse_factory, did_factory):
         # Default behavior is to create a subdir for the dataset
         for f in dataset:
             assert os.path.exists(os.path.join(tmp_dir, f['dataset_name'], f['did_name']))
+
+
+def test_host_concurrency_limiter():
+    """CLIENT(USER): The concurrency limit of a host adapts to its failures"""
+    limiter = HostConcurrencyLimiter(max_per_host=4)
+    assert limiter.limit('host') == 4
+    for _ in range(2):
+        limiter.acquire('host')
+        limiter.release('host', success=False)
+    assert limiter.limit('host') == 1
+    limiter.acquire('host')
+    limiter.release('host', success=True)
+    assert limiter.limit('host') == 2
+    assert limiter.limit('other_host') == 4
+
+    # an operation not supported by the protocol is not a failure of the host
+    with pytest.raises(NotImplementedError):
+        with limiter.slot('other_host'):
+            raise NotImplementedError
+    with pytest.raises(RucioException):
+        with limiter.slot('host'):
+            raise RucioException
+    assert (limiter.limit('other_host'), limiter.limit('host')) == (4, 1)
+
+
+def test_download_ranges(tmp_path):
+    """CLIENT(USER): Large files are downloaded in ranges over parallel streams, each holding a slot of the host"""
+    class RangedProtocol:
+        def __init__(self):
+            self.get = MagicMock()
+            self.ranges = []
+            self.active = 0
+            self.max_active = 0
+            self.lock = Lock()
+
+        def get_range(self, pfn, dest, offset, length, transfer_timeout=None):
+            with self.lock:
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+            time.sleep(0.05)
+            self.ranges.append((offset, length))
+            with open(pfn, 'rb') as source, open(dest, 'r+b') as dest_file:
+                source.seek(offset)
+                dest_file.seek(offset)
+                dest_file.write(source.read(length))
+            with self.lock:
+                self.active -= 1
+
+    source = tmp_path / 'source'
+    source.write_bytes(os.urandom(1000))
+    protocol = RangedProtocol()
+
+    with patch.object(DownloadClient, '__init__', return_value=None):
+        download_client = DownloadClient()
+    download_client.logger = logging.log
+    download_client.host_limiter = HostConcurrencyLimiter(max_per_host=2)
+    download_client.multistream_threshold = 100
+    download_client.multistream_chunk_size = 200
+    download_client.max_streams = 4
+
+    download_client._get_file(protocol, str(source), str(tmp_path / 'dest'), 1000, None, 'host')
+    assert (tmp_path / 'dest').read_bytes() == source.read_bytes()
+    assert sorted(protocol.ranges) == [(0, 200), (200, 200), (400, 200), (600, 200), (800, 200)]
+    assert protocol.max_active == 2
+    protocol.get.assert_not_called()
+
+    download_client._get_file(protocol, str(source), str(tmp_path / 'dest'), 50, None, 'host')
+    protocol.get.assert_called_once()
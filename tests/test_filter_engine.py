@@ -15,14 +15,17 @@
 import operator
 import unittest
 from datetime import datetime, timedelta
+from unittest.mock import MagicMock
 
 import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
 
 from rucio.common.exception import DuplicateCriteriaInDIDFilter
 from rucio.common.utils import generate_uuid
 from rucio.core.did import add_did
 from rucio.core.did_meta_plugins import set_metadata
-from rucio.core.did_meta_plugins.filter_engine import FilterEngine
+from rucio.core.did_meta_plugins.filter_engine import FilterEngine, list_sorted_by_key
 from rucio.db.sqla import models
 from rucio.db.sqla.util import json_implemented
 
@@ -141,6 +144,36 @@ class TestFilterEngineDummy:
             filters = FilterEngine(input_length_expression, strict_coerce=False).filters
             assert isinstance(filters[0][0][2], type_expected)
 
+    def test_translation_cache(self):
+        FilterEngine('testkeyint1 = 0', strict_coerce=False).filters[0].append(('testkeyint2', operator.eq, 1))
+        assert FilterEngine('testkeyint1 = 0', strict_coerce=False).filters == [[('testkeyint1', operator.eq, 0)]]
+        assert isinstance(FilterEngine({'testkeyint1': False}, strict_coerce=False).filters[0][0][2], bool)
+        assert isinstance(FilterEngine({'testkeyint1': 0}, strict_coerce=False).filters[0][0][2], int)
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                FilterEngine({'name.gt': 'test'}, strict_coerce=False)
+
+    def test_postgres_query_parameters(self):
+        filters = [{'name': 'file_*'}, {'run.gte': 3, 'project': "data18' OR 1=1 --"}]
+        query, params = FilterEngine(filters, strict_coerce=False).create_postgres_query(
+            additional_filters=[('scope', operator.eq, 'mock')])
+        assert query == ("name LIKE %(p0)s AND scope = %(p1)s OR "
+                         "(data->>%(p2)s::text)::float >= %(p3)s AND data->>%(p4)s::text = %(p5)s AND scope = %(p6)s")
+        assert params == {'p0': 'file\\_%', 'p1': 'mock', 'p2': 'run', 'p3': 3.0, 'p4': 'project', 'p5': "data18' OR 1=1 --", 'p6': 'mock'}
+
+
+    def test_list_sorted_by_key_collation(self):
+        session = MagicMock()
+        session.bind.dialect.name = 'postgresql'
+        session.execute.return_value = iter(['row_1', 'row_2'])
+        stmt = select(models.DataIdentifier.name).where(models.DataIdentifier.scope == 'mock')
+        assert list(list_sorted_by_key(stmt, models.DataIdentifier.name, session=session, page_size=5)) == ['row_1', 'row_2']
+        # one query, sorted once with the binary collation and streamed
+        session.execute.assert_called_once()
+        executed = session.execute.call_args.args[0]
+        assert executed.get_execution_options()['yield_per'] == 5
+        assert 'ORDER BY dids.name COLLATE "C"' in str(executed.compile(dialect=postgresql.dialect()))
+
 
 class TestFilterEngineReal:
 
@@ -149,6 +182,13 @@ class TestFilterEngineReal:
         add_did(scope=scope, name=did_name, did_type=did_type, account=account)
         return did_name
 
+    def test_list_sorted_by_key(self, db_session, mock_scope, root_account):
+        names = sorted(self._create_tmp_did(mock_scope, root_account) for _ in range(5))
+        stmt = select(models.DataIdentifier.name).where(models.DataIdentifier.scope == mock_scope,
+                                                         models.DataIdentifier.name.in_(names))
+        rows = list(list_sorted_by_key(stmt, models.DataIdentifier.name, session=db_session, page_size=2))
+        assert [row.name for row in rows] == names
+
     def test_operators_equal_not_equal(self, db_session, mock_scope, root_account):
         # Plugin: DID
         #
@@ -16,6 +16,8 @@
 Hermes Test
 """
 
+import logging
+import threading
 import time
 from datetime import datetime
 from json import loads
@@ -300,3 +302,195 @@ def test_hermes(core_config_mock, caches_mock, monkeypatch):
 
     # Checking email
     assert service_dict["email"] == 0
+
+
+@pytest.mark.noparallel(reason="truncates the messages table")
+@pytest.mark.parametrize(
+    "core_config_mock",
+    [
+        {
+            "table_content": [
+                ("hermes", "services_list", "elastic,email"),
+                ("hermes", "elastic_endpoint", "http://elasticsearch:9200/ddm_events/doc/_bulk"),
+                ("hermes", "concurrent_delivery", True),
+            ]
+        }
+    ],
+    indirect=True,
+)
+@pytest.mark.parametrize(
+    "caches_mock",
+    [
+        {
+            "caches_to_mock": [
+                "rucio.core.config.REGION",
+            ]
+        }
+    ],
+    indirect=True,
+)
+def test_hermes_concurrent_delivery(core_config_mock, caches_mock, monkeypatch):
+    """HERMES (DAEMON): Test that a slow service does not delay the others, and that the messages are only deleted for the services which delivered them."""
+    truncate_messages()
+    for i in range(3):
+        add_message("blahblah", {"bytes": 2, "created_at": datetime.utcnow().replace(microsecond=0)})
+        add_message("email", {"to": ["spamspamspam@cern.ch"], "subject": "Subject %i" % i, "body": "Body"})
+
+    release_elastic = threading.Event()
+
+    def slow_failing_elastic(messages, endpoint, logger):
+        release_elastic.wait(30)
+        return 500
+
+    def wait_for_emails():
+        deadline = time.time() + 30
+        while any(message["services"] == "email" for message in retrieve_messages(50, old_mode=False)):
+            assert time.time() < deadline
+            time.sleep(0.1)
+
+    with monkeypatch.context() as m:
+        m.setattr(hermes, "submit_to_elastic", slow_failing_elastic)
+        m.setattr(hermes, "deliver_emails", lambda messages, logger: [message["id"] for message in messages])
+        daemon = threading.Thread(target=hermes.hermes, kwargs={"once": False, "sleep_time": 1})
+        daemon.start()
+        try:
+            # the emails of the following cycles are delivered while elastic is still busy with the first bulk
+            wait_for_emails()
+            add_message("email", {"to": ["spamspamspam@cern.ch"], "subject": "Subject 3", "body": "Body"})
+            wait_for_emails()
+            assert not release_elastic.is_set()
+        finally:
+            hermes.graceful_stop.set()
+            release_elastic.set()
+            daemon.join()
+            hermes.graceful_stop.clear()
+
+    messages = retrieve_messages(50, old_mode=False)
+    assert len(messages) == 3
+    assert all(message["services"] == "elastic" for message in messages)
+    truncate_messages()
+
+
+@pytest.mark.noparallel(reason="truncates the messages table")
+@pytest.mark.parametrize(
+    "core_config_mock",
+    [
+        {
+            "table_content": [
+                ("hermes", "services_list", "elastic,email"),
+                ("hermes", "elastic_endpoint", "http://elasticsearch:9200/ddm_events/doc/_bulk"),
+                ("hermes", "concurrent_delivery", True),
+            ]
+        }
+    ],
+    indirect=True,
+)
+@pytest.mark.parametrize(
+    "caches_mock",
+    [
+        {
+            "caches_to_mock": [
+                "rucio.core.config.REGION",
+            ]
+        }
+    ],
+    indirect=True,
+)
+def test_hermes_busy_service_backlog(core_config_mock, caches_mock, monkeypatch):
+    """HERMES (DAEMON): Test that the backlog of a busy service does not fill the bulks retrieved for the others."""
+    truncate_messages()
+    # the oldest messages are a backlog of elastic messages, larger than the bulk
+    for _ in range(6):
+        add_message("blahblah", {"bytes": 2, "created_at": datetime.utcnow().replace(microsecond=0)})
+    for i in range(3):
+        add_message("email", {"to": ["spamspamspam@cern.ch"], "subject": "Subject %i" % i, "body": "Body"})
+
+    release_elastic = threading.Event()
+    elastic_bulks = []
+
+    def slow_elastic(messages, endpoint, logger):
+        elastic_bulks.append(len(messages))
+        release_elastic.wait(30)
+        return 200
+
+    emails = []
+    heartbeat_handler = MagicMock()
+    heartbeat_handler.live.return_value = (0, 1, logging.log)
+    service_workers = {}
+    with monkeypatch.context() as m:
+        m.setattr(hermes, "submit_to_elastic", slow_elastic)
+        m.setattr(hermes, "deliver_emails", lambda messages, logger: emails.extend(messages) or [message["id"] for message in messages])
+        try:
+            # elastic stays busy with its first bulk over the following cycles
+            hermes.run_once(heartbeat_handler, bulk=3, service_workers=service_workers)
+            for _ in range(2):
+                hermes.run_once(heartbeat_handler, bulk=3, service_workers=service_workers)
+                service_workers["email"].wait(30)
+            assert not service_workers["elastic"].is_idle()
+            assert elastic_bulks == [3]
+            assert sorted(email["payload"]["subject"] for email in emails) == ["Subject 0", "Subject 1", "Subject 2"]
+
+            release_elastic.set()
+            service_workers["elastic"].wait(30)
+            hermes.run_once(heartbeat_handler, bulk=3, service_workers=service_workers)
+            service_workers["elastic"].wait(30)
+            assert elastic_bulks == [3, 3]
+        finally:
+            release_elastic.set()
+            for worker in service_workers.values():
+                worker.stop(timeout=30)
+
+    assert retrieve_messages(50, old_mode=False) == []
+    truncate_messages()
+
+
+def test_service_worker_takes_one_bulk(monkeypatch):
+    """HERMES (DAEMON): Test that a busy service worker does not take new messages."""
+    deleted = []
+    monkeypatch.setattr(hermes, "delete_delivered_messages", lambda service, messages, logger: deleted.append(messages))
+    release = threading.Event()
+
+    def deliver(messages, logger):
+        release.wait(30)
+        return messages
+
+    worker = hermes.ServiceWorker("elastic")
+    try:
+        first = [{"id": 1, "created_at": datetime.utcnow()}]
+        assert worker.submit(deliver, first, logging.log)
+        assert not worker.is_idle()
+        assert not worker.submit(deliver, [{"id": 2, "created_at": datetime.utcnow()}], logging.log)
+        release.set()
+        assert worker.wait(30)
+        assert deleted == [first]
+    finally:
+        release.set()
+        worker.stop(timeout=30)
+
+
+def test_aggregate_to_influx(monkeypatch):
+    """HERMES (DAEMON): Test the aggregation of transfer and deletion messages to InfluxDB line protocol."""
+    created_at = datetime(2024, 1, 1, 12, 30, 15)
+    transfer = {"transferred_at": "2024-01-01 12:30:15", "activity": "User Subscriptions", "src-rse": "RSE_A", "dst-rse": "RSE_B", "reason": ""}
+    messages = [
+        {"event_type": "transfer-done", "created_at": created_at, "payload": dict(transfer, bytes=10)},
+        {"event_type": "transfer-done", "created_at": created_at, "payload": dict(transfer, bytes=5)},
+        {"event_type": "transfer-failed", "created_at": created_at, "payload": dict(transfer, bytes=7)},
+        {"event_type": "transfer-failed", "created_at": created_at, "payload": dict(transfer, transferred_at=None, bytes=7)},
+        {"event_type": "deletion-done", "created_at": created_at, "payload": {"rse": "RSE_A", "bytes": 3}},
+        {"event_type": "deletion-failed", "created_at": created_at.replace(second=45), "payload": {"rse": "RSE_A", "bytes": 4}},
+        {"event_type": "blahblah", "created_at": created_at, "payload": {}},
+    ]
+    post_mock = MagicMock()
+    post_mock.return_value.status_code = 204
+    monkeypatch.setattr(hermes.requests, "post", post_mock)
+    monkeypatch.setattr(hermes, "config_get", lambda *args, **kwargs: None)
+
+    assert hermes.aggregate_to_influx(messages, bin_size="1m", endpoint="http://influxdb", logger=lambda *args, **kwargs: None) == 204
+    points = post_mock.call_args.kwargs["data"].splitlines()
+    assert len(points) == 2
+    assert points[0].startswith(
+        "transfer,activity=User\\ Subscriptions,src_rse=RSE_A,dst_rse=RSE_B "
+        "nb_transfer_done=2,bytes_transfer_done=15,nb_transfer_failed=1,bytes_transfer_failed=7 1704112215"
+    )
+    assert points[1].startswith("deletion,rse=RSE_A nb_deletion_done=1,bytes_deletion_done=3,nb_deletion_failed=1,bytes_deletion_failed=4 1704112200")
@@ -121,6 +121,36 @@ class TestJudgeEvaluator:
         for file in files:
             assert len(get_replica_locks(scope=file['scope'], name=file['name'])) == 2
 
+    @pytest.mark.noparallel(reason="uses mock scope and predefined RSEs; runs judge evaluator")
+    @pytest.mark.parametrize("file_config_mock", [
+        {"overrides": [('rules', 'bulk_attach_evaluation', 'True')]},
+    ], indirect=True)
+    def test_judge_add_files_to_dataset_bulk(self, file_config_mock):
+        """ JUDGE EVALUATOR: Test the judge bulk attach evaluation with several rules on the dataset"""
+        scope = InternalScope('mock', **self.vo)
+        dataset = 'dataset_' + str(uuid())
+        add_did(scope, dataset, DIDType.DATASET, self.jdoe)
+
+        rule_id_1 = add_rule(dids=[{'scope': scope, 'name': dataset}], account=self.jdoe, copies=2, rse_expression=self.T1, grouping='DATASET', weight=None, lifetime=None, locked=False, subscription_id=None)[0]
+        rule_id_2 = add_rule(dids=[{'scope': scope, 'name': dataset}], account=self.jdoe, copies=1, rse_expression=self.rse4, grouping='NONE', weight=None, lifetime=None, locked=False, subscription_id=None)[0]
+
+        files = create_files(20, scope, self.rse1_id)
+        attach_dids(scope, dataset, files, self.jdoe)
+
+        # Fake judge
+        re_evaluator(once=True, did_limit=None)
+
+        # Check if the Locks are created properly
+        for file in files:
+            locks = get_replica_locks(scope=file['scope'], name=file['name'])
+            assert len([lock for lock in locks if lock['rule_id'] == rule_id_1]) == 2
+            assert [lock['rse_id'] for lock in locks if lock['rule_id'] == rule_id_2] == [self.rse4_id]
+        rule_1 = get_rule(rule_id_1)
+        rule_2 = get_rule(rule_id_2)
+        assert rule_1['locks_ok_cnt'] + rule_1['locks_replicating_cnt'] == 2 * len(files)
+        assert rule_2['locks_replicating_cnt'] == len(files)
+        assert len(get_replica_locks_for_rule_id(rule_id_2)) == len(files)
+
     @pytest.mark.noparallel(reason="uses mock scope and predefined RSEs; runs judge evaluator")
     def test_judge_add_dataset_to_container(self):
         """ JUDGE EVALUATOR: Test the judge when adding dataset to container"""
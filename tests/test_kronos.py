@@ -0,0 +1,157 @@
+# Copyright European Organization for Nuclear Research (CERN) since 2012
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Kronos Test
+"""
+
+import re
+from datetime import datetime
+from json import dumps
+from queue import Queue
+from unittest.mock import MagicMock
+
+import pytest
+
+from rucio.common.exception import DatabaseException
+from rucio.common.types import InternalScope
+from rucio.daemons.tracer import kronos
+
+
+def _consumer(conn=None, chunksize=10, bad_files_patterns=(), **kwargs):
+    return kronos.AMQConsumer(broker=('localhost', 61613), conn=conn or MagicMock(), queue='/queue/trace', chunksize=chunksize,
+                              subscription_id='rucio-tracer-kronos', excluded_usrdns=set(), dataset_queue=Queue(),
+                              bad_files_patterns=list(bad_files_patterns), **kwargs)
+
+
+def _frame(msg_id, report):
+    frame = MagicMock()
+    frame.headers = {'message-id': msg_id, 'appversion': 'rucio'}
+    frame.body = dumps(report)
+    return frame
+
+
+def _replica(name, accessed_at, rse_id='rse_id'):
+    return {'scope': InternalScope('mock', vo='def'), 'name': name, 'rse': 'MOCK', 'rse_id': rse_id, 'accessed_at': accessed_at}
+
+
+def test_flush_keeps_replicas_on_error(monkeypatch):
+    """ KRONOS: Replica accesses which fail to be flushed are kept for the next flush """
+    consumer = _consumer(pending_replicas=[_replica('file_1', datetime(2024, 1, 1)), _replica('file_1', datetime(2024, 1, 2)), _replica('file_2', datetime(2024, 1, 1))])
+    assert consumer.pending_replicas[(InternalScope('mock', vo='def'), 'file_1', 'rse_id')]['access_cnt'] == 2
+
+    def fail(replicas):
+        raise DatabaseException('connection lost')
+    monkeypatch.setattr(kronos, 'touch_replicas', fail)
+    consumer.flush()
+    pending = consumer.pending_replicas[(InternalScope('mock', vo='def'), 'file_1', 'rse_id')]
+    assert len(consumer.pending_replicas) == 2
+    assert (pending['access_cnt'], pending['accessed_at']) == (2, datetime(2024, 1, 2))
+
+    # the bulk update hits a locked row, and the second replica fails: only this one is kept
+    monkeypatch.setattr(kronos, 'touch_replicas', lambda replicas: False)
+    touched = []
+
+    def touch_replica(replica):
+        if replica['name'] == 'file_2':
+            raise DatabaseException('connection lost')
+        touched.append(replica['name'])
+        return True
+    monkeypatch.setattr(kronos, 'touch_replica', touch_replica)
+    consumer.flush()
+    assert touched == ['file_1']
+    assert list(consumer.pending_replicas) == [(InternalScope('mock', vo='def'), 'file_2', 'rse_id')]
+
+    flushed = []
+    monkeypatch.setattr(kronos, 'touch_replicas', lambda replicas: flushed.extend(replicas) or True)
+    consumer.flush()
+    assert [replica['name'] for replica in flushed] == ['file_2']
+    assert consumer.pending_replicas == {}
+
+
+@pytest.mark.parametrize('has_consumer', [True, False])
+def test_flush_listener(monkeypatch, has_consumer):
+    """ KRONOS: The consumer of a connection is flushed before the connection is dropped """
+    consumer = _consumer(pending_replicas=[_replica('file_1', datetime(2024, 1, 1))])
+    conn = MagicMock()
+    conn.get_listener.return_value = consumer if has_consumer else None
+    flushed = []
+    monkeypatch.setattr(kronos, 'touch_replicas', lambda replicas: flushed.extend(replicas) or True)
+
+    remaining = kronos._flush_listener(conn)
+    conn.get_listener.assert_called_once_with(kronos.LISTENER_NAME)
+    if has_consumer:
+        assert remaining == {}
+        assert [replica['name'] for replica in flushed] == ['file_1']
+    else:
+        assert remaining is None
+        assert flushed == []
+
+
+@pytest.mark.parametrize('event_type, expected', [
+    ('get', ('dq2clients', 'dq2clients')),
+    ('get_sm', ('panda_production', 'panda_production_act')),
+    ('sm_get_a', ('panda_analysis', 'panda_analysis_act')),
+    ('download', ('rucio_download', 'rucio_download')),
+    ('touch', ('rucio_touch', 'rucio_touch')),
+    ('get_other', ('other_get', 'other_get')),
+    ('sm_get_other', ('other_get', 'other_get')),
+    ('get_sm_es', None),
+    ('put_sm', None),
+    ('upload', None),
+])
+def test_classify_event_type(event_type, expected):
+    """ KRONOS: The traces are classified by their eventType """
+    assert kronos._classify_event_type(event_type) == expected
+
+
+def test_combine_patterns():
+    """ KRONOS: The bad file patterns are matched with one combined pattern """
+    assert kronos._combine_patterns([]) is None
+    single = re.compile('.*No such file.*')
+    assert kronos._combine_patterns([single]) is single
+
+    combined = kronos._combine_patterns([re.compile('.*No such file.*'), re.compile('Checksum mismatch')])
+    assert combined.match('[ERROR] No such file or directory')
+    assert combined.match('Checksum mismatch for file')
+    assert not combined.match('Connection refused')
+
+    # global inline flags are only allowed at the start of a pattern
+    assert kronos._combine_patterns([re.compile('a'), re.compile('(?i)b')]) is None
+
+
+def test_declare_suspicious_replicas_by_scheme(monkeypatch):
+    """ KRONOS: The suspicious replicas of a chunk are declared per VO, reason and URL scheme """
+    declared = []
+    monkeypatch.setattr(kronos, 'declare_bad_file_replicas', lambda pfns, reason, issuer, status: declared.append((issuer.vo, reason, sorted(pfns))))
+    conn = MagicMock()
+    consumer = _consumer(conn=conn, chunksize=5, bad_files_patterns=[re.compile('.*No such file.*'), re.compile('.*Checksum mismatch.*')])
+
+    reports = [
+        {'eventType': 'get_sm', 'clientState': 'FAILED', 'stateReason': 'No such file', 'url': 'root://site.org:1094//rucio/file_1'},
+        {'eventType': 'get_sm', 'clientState': 'FAILED', 'stateReason': 'No such file', 'url': 'root://site.org:1094//rucio/file_2'},
+        {'eventType': 'get_sm', 'clientState': 'FAILED', 'stateReason': 'No such file', 'url': 'davs://site.org:443/rucio/file_3'},
+        {'eventType': 'get_sm', 'clientState': 'FAILED', 'stateReason': 'Checksum mismatch', 'url': 'root://site.org:1094//rucio/file_4'},
+        # not a bad file reason, and an excluded client state
+        {'eventType': 'get_sm', 'clientState': 'DONE', 'stateReason': 'No such file', 'url': 'root://site.org:1094//rucio/file_5'},
+    ]
+    for index, report in enumerate(reports):
+        consumer.on_message(_frame('message_%d' % index, report))
+
+    assert sorted(declared) == [
+        ('def', 'Checksum mismatch', ['root://site.org:1094//rucio/file_4']),
+        ('def', 'No such file', ['davs://site.org:443/rucio/file_3']),
+        ('def', 'No such file', ['root://site.org:1094//rucio/file_1', 'root://site.org:1094//rucio/file_2']),
+    ]
+    assert conn.ack.call_count == len(reports)
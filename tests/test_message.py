@@ -15,9 +15,11 @@
 import json
 import random
 import string
+from unittest.mock import MagicMock
 
 import pytest
 from sqlalchemy import select
+from sqlalchemy.dialects import mysql, oracle, postgresql
 
 from rucio.common.constants import MAX_MESSAGE_LENGTH
 from rucio.common.exception import InvalidObject, RucioException
@@ -27,6 +29,39 @@ from rucio.db.sqla.models import Message
 from rucio.db.sqla.session import get_session
 
 
+def _dialect(module, version, **kwargs):
+    dialect = module.dialect(**kwargs)
+    dialect.server_version_info = version
+    return dialect
+
+
+@pytest.mark.parametrize("dialect, skip_locked, lock, subquery", [
+    (_dialect(postgresql, (14, 0)), True, 'FOR UPDATE SKIP LOCKED', False),
+    (_dialect(postgresql, (14, 0)), False, 'FOR UPDATE NOWAIT', True),
+    (_dialect(oracle, (19, 0)), True, 'FOR UPDATE SKIP LOCKED', True),
+    (_dialect(mysql, (8, 0, 36)), True, 'FOR UPDATE SKIP LOCKED', False),
+    (_dialect(mysql, (8, 0, 36)), False, None, True),
+    (_dialect(mysql, (5, 7, 44)), True, None, True),
+    (_dialect(mysql, (10, 5, 0), is_mariadb=True), True, None, True),
+    (_dialect(mysql, (10, 6, 0), is_mariadb=True), True, 'FOR UPDATE SKIP LOCKED', False),
+])
+def test_retrieve_messages_statement(dialect, skip_locked, lock, subquery):
+    """ MESSAGE (CORE): Test the locking of the messages retrieved on each database """
+    session = MagicMock()
+    session.bind.dialect = dialect
+    session.execute.return_value.all.return_value = []
+    assert retrieve_messages(10, skip_locked=skip_locked, excluded_services=['elastic'], session=session) == []
+
+    statement = str(session.execute.call_args.args[0].compile(dialect=dialect))
+    if lock:
+        assert lock in statement
+    else:
+        assert 'FOR UPDATE' not in statement
+    # the locked rows are skipped by the limited query itself
+    assert ('IN (SELECT' in statement) == subquery
+    assert 'messages.services NOT IN' in statement
+
+
 @pytest.mark.noparallel(reason='fails when run in parallel')
 @pytest.mark.parametrize("core_config_mock", [{"table_content": [
     ('hermes', 'services_list', 'influx,activemq,elastic,email'),
@@ -99,6 +134,29 @@ def test_bulk_insert_and_pop_messages(core_config_mock, caches_mock):
     assert retrieve_messages() == []
 
 
+@pytest.mark.noparallel(reason='fails when run in parallel')
+@pytest.mark.parametrize("core_config_mock", [{"table_content": [
+    ('hermes', 'services_list', 'activemq'),
+]}], indirect=True)
+@pytest.mark.parametrize("caches_mock", [{"caches_to_mock": [
+    'rucio.core.config.REGION',
+]}], indirect=True)
+def test_retrieve_messages_skip_locked(core_config_mock, caches_mock):
+    """ MESSAGE (CORE): Test retrieving messages in creation order with skip_locked and deleting them by chunks """
+
+    truncate_messages()
+    add_messages([{"event_type": "test", "payload": {"number": cnt}} for cnt in range(1200)])
+
+    list_messages = retrieve_messages(1100, skip_locked=True)
+    assert len(list_messages) == 1100
+    assert [(msg['created_at'], msg['id']) for msg in list_messages] == sorted((msg['created_at'], msg['id']) for msg in list_messages)
+    delete_messages([{"id": msg["id"], "created_at": msg["created_at"], "updated_at": msg["created_at"],
+                      "payload": str(msg["payload"]), "event_type": msg["event_type"]} for msg in list_messages])
+
+    assert len(retrieve_messages(1100, skip_locked=True)) == 100
+    truncate_messages()
+
+
 @pytest.mark.noparallel(reason='fails when run in parallel')
 @pytest.mark.parametrize("core_config_mock", [{"table_content": [
     ('hermes', 'services_list', 'influx,activemq,elastic,email'),
@@ -12,8 +12,18 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+import re
+import subprocess
+import sys
+
+import rucio
 from rucio.common.utils import execute
 
+# microseconds, the import of the CLI took about 400 ms when it imported the client stack
+CLI_IMPORT_TIME_BUDGET = 150000
+CLI_LAZY_MODULES = ['rucio.cli.bin_legacy.rucio', 'rucio.client.client', 'rucio.client.richclient', 'rich.console', 'requests', 'paramiko', 'sqlalchemy']
+
 
 class TestModuleImport:
     def test_import(self):
@@ -26,3 +36,20 @@ class TestModuleImport:
         assert 'ImportError' not in out
         assert 'Exception' not in err
         assert 'Exception' not in out
+
+    def test_cli_import_time(self):
+        """
+        RUCIO: Test that `rucio --version` only imports the CLI entry point, within the import time budget.
+        """
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join([os.path.dirname(os.path.dirname(rucio.__file__)), os.environ.get('PYTHONPATH', '')]))
+        cmd = [sys.executable, '-X', 'importtime', '-c', 'from rucio.cli.command import main; main(["--version"], prog_name="rucio")']
+        result = subprocess.run(cmd, env=env, capture_output=True, text=True, check=True)
+        assert 'rucio' in result.stdout
+
+        # lines of the form "import time: <self us> | <cumulative us> | <indentation><module>"
+        imports = re.findall(r'^import time:\s+\d+ \|\s+(\d+) \| ( *)(\S+)$', result.stderr, re.MULTILINE)
+        modules = {name for _, _, name in imports}
+        assert 'rucio.cli.command' in modules
+        assert not modules.intersection(CLI_LAZY_MODULES)
+        rucio_import_time = sum(int(cumulative) for cumulative, indentation, name in imports if not indentation and name.startswith('rucio'))
+        assert rucio_import_time < CLI_IMPORT_TIME_BUDGET
@@ -31,7 +31,22 @@ from rucio.common.exception import AccessDenied, DatabaseException, DataIdentifi
 from rucio.common.utils import clean_pfns, generate_uuid, parse_response
 from rucio.core.config import set as cconfig_set
 from rucio.core.did import add_did, attach_dids, get_did, get_did_access_cnt, get_did_atime, list_files, set_status
-from rucio.core.replica import add_bad_dids, add_replica, add_replicas, delete_replicas, get_bad_pfns, get_replica, get_replica_atime, get_replicas_state, get_rse_coverage_of_dataset, list_replicas, set_tombstone, touch_replica, update_replica_state
+from rucio.core.replica import (
+    add_bad_dids,
+    add_replica,
+    add_replicas,
+    delete_replicas,
+    get_bad_pfns,
+    get_replica,
+    get_replica_atime,
+    get_replicas_state,
+    get_rse_coverage_of_dataset,
+    list_replicas,
+    set_tombstone,
+    touch_replica,
+    touch_replicas,
+    update_replica_state,
+)
 from rucio.core.rse import add_protocol, add_rse_attribute, del_rse_attribute
 from rucio.daemons.badreplicas.minos import minos
 from rucio.daemons.badreplicas.minos_temporary_expiration import minos_tu_expiration
@@ -339,6 +354,31 @@ class TestReplicaCore:
             touch_replica({'scope': file_item['scope'], 'name': file_item['name'], 'rse_id': rse_id})
         assert get_did_access_cnt(scope=mock_scope, name=file_item['name']) == 5
 
+    def test_touch_replicas_bulk(self, rse_factory, mock_scope, root_account):
+        """ REPLICA (CORE): Touch several replicas at once with coalesced access counts """
+        _, rse1_id = rse_factory.make_mock_rse()
+        _, rse2_id = rse_factory.make_mock_rse()
+        files = [{'scope': mock_scope, 'name': did_name_generator('file'), 'bytes': 1, 'adler32': '0cc737eb'} for _ in range(3)]
+        add_replicas(rse_id=rse1_id, files=files, account=root_account, ignore_availability=True)
+        add_replicas(rse_id=rse2_id, files=files[:1], account=root_account, ignore_availability=True)
+
+        now = datetime.utcnow()
+        now -= timedelta(microseconds=now.microsecond)
+        earlier = now - timedelta(hours=1)
+        assert touch_replicas([{'scope': files[0]['scope'], 'name': files[0]['name'], 'rse_id': rse1_id, 'accessed_at': earlier, 'access_cnt': 3},
+                               {'scope': files[0]['scope'], 'name': files[0]['name'], 'rse_id': rse2_id, 'accessed_at': now, 'access_cnt': 2},
+                               {'scope': files[1]['scope'], 'name': files[1]['name'], 'rse_id': rse1_id, 'accessed_at': now}])
+
+        assert get_replica_atime({'scope': files[0]['scope'], 'name': files[0]['name'], 'rse_id': rse1_id}) == earlier
+        assert get_replica_atime({'scope': files[0]['scope'], 'name': files[0]['name'], 'rse_id': rse2_id}) == now
+        assert get_did_atime(scope=mock_scope, name=files[0]['name']) == now
+        assert get_did_access_cnt(scope=mock_scope, name=files[0]['name']) == 5
+        assert get_did_access_cnt(scope=mock_scope, name=files[1]['name']) == 1
+        assert get_replica_atime({'scope': files[2]['scope'], 'name': files[2]['name'], 'rse_id': rse1_id}) is None
+
+        touch_replica({'scope': files[1]['scope'], 'name': files[1]['name'], 'rse_id': rse1_id, 'access_cnt': 4})
+        assert get_did_access_cnt(scope=mock_scope, name=files[1]['name']) == 5
+
     def test_list_replicas_all_states(self, rse_factory, mock_scope, root_account):
         """ REPLICA (CORE): list file replicas with all_states"""
         _, rse1_id = rse_factory.make_mock_rse()
@@ -372,6 +372,22 @@ def test_get_rse_account_usage(rse_factory, rest_client, auth_token):
     assert response.status_code == 200
 
 
+def test_get_rse_etag(rse_factory, rest_client, auth_token):
+    """ RSE (REST): Test the validation of the RSE properties with their ETag """
+    headers_dict = {'X-Rucio-Type': 'user', 'X-Rucio-Account': 'root'}
+    rse, _ = rse_factory.make_rse()
+    response = rest_client.get(f'/rses/{rse}', headers=headers(auth(auth_token), hdrdict(headers_dict)))
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+
+    response = rest_client.get(f'/rses/{rse}', headers=headers(auth(auth_token), hdrdict(headers_dict), hdrdict({'If-None-Match': etag})))
+    assert response.status_code == 304
+    assert not response.get_data()
+
+    response = rest_client.get(f'/rses/{rse}', headers=headers(auth(auth_token), hdrdict(headers_dict), hdrdict({'If-None-Match': '"outdated"'})))
+    assert response.status_code == 200
+
+
 @pytest.mark.dirty
 def test_delete_rse_attribute(vo, rest_client, auth_token):
     """ RSE (REST): Test the deletion of a RSE attribute """
@@ -12,12 +12,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import errno
 import os
 import shutil
+import sys
 
 import pytest
 
+from rucio.common.checksum import ChecksumCalculator, calculate_checksums
 from rucio.rse import rsemanager as mgr
+from rucio.rse.protocols import posix
+from rucio.rse.protocols.posix import copy_file
 from rucio.tests.common import load_test_conf_file, skip_rse_tests_with_accounts
 
 from .rsemgr_api_test import MgrTestCases
@@ -84,3 +89,39 @@ class TestRsePOSIXSymlink(MgrTestCases):
     def setup_obj(self, setup_rse_and_files, vo):
         rse_settings, tmpdir, user = setup_rse_and_files
         self.init(tmpdir=tmpdir, rse_settings=rse_settings, user=user, vo=vo)
+
+
+@pytest.mark.parametrize('streams', [1, 3])
+def test_copy_file(tmp_path, streams):
+    """POSIX (RSE/PROTOCOLS): Copy a file in the kernel while computing its checksums"""
+    source = tmp_path / 'source'
+    source.write_bytes(os.urandom(9 * 1024 * 1024 + 7))
+    source.chmod(0o640)
+    calculator = ChecksumCalculator(['adler32', 'md5'])
+
+    copy_file(str(source), str(tmp_path / 'dest'), calculator, streams=streams, chunk_size=2 * 1024 * 1024, parallel_threshold=1)
+
+    assert (tmp_path / 'dest').read_bytes() == source.read_bytes()
+    assert (tmp_path / 'dest').stat().st_mode == source.stat().st_mode
+    assert calculator.hexdigests() == calculate_checksums(str(source), ['adler32', 'md5'])
+
+
+@pytest.mark.parametrize('platform', ['linux', 'darwin'])
+def test_copy_file_without_copy_file_range(tmp_path, monkeypatch, platform):
+    """POSIX (RSE/PROTOCOLS): Copy a file with reads and writes where sendfile only writes to sockets"""
+    sendfile_calls = []
+
+    def sendfile(*args):
+        sendfile_calls.append(args)
+        raise OSError(errno.ENOTSOCK, os.strerror(errno.ENOTSOCK))
+    monkeypatch.delattr(os, 'copy_file_range', raising=False)
+    monkeypatch.setattr(os, 'sendfile', sendfile)
+    monkeypatch.setattr(sys, 'platform', platform)
+    monkeypatch.setattr(posix, '_clone', lambda source_fd, dest_fd: False)
+    source = tmp_path / 'source'
+    source.write_bytes(os.urandom(3 * 1024 * 1024 + 7))
+
+    copy_file(str(source), str(tmp_path / 'dest'), streams=1)
+
+    assert (tmp_path / 'dest').read_bytes() == source.read_bytes()
+    assert bool(sendfile_calls) == (platform == 'linux')
@@ -160,3 +160,20 @@ class TestRSESelectorDynamic:
         rse_selector.select_rse(10, [rse2_id], copies=1)
         rses = rse_selector.select_rse(5, [], copies=2)
         assert len(rses) == 2
+
+    def test_4(self, random_account, test_rses):
+        # blocklisted and already covered RSEs are taken into account in a single selection
+        rse1_name, rse1_id, rse1, rse2_name, rse2_id, rse2 = test_rses
+        set_local_account_limit(account=random_account, rse_id=rse1_id, bytes_=20)
+        set_local_account_limit(account=random_account, rse_id=rse2_id, bytes_=20)
+        rse_selector = RSESelector(random_account, [rse1, rse2], None, 1)
+        rses = rse_selector.select_rse(5, [rse2_id, rse1_id], prioritize_order_over_weight=True, existing_rse_size={rse2_id: 5})
+        assert rses == [(rse2_id, False, True)]
+        rses = rse_selector.select_rse(5, [rse2_id, rse1_id], blocklist=[rse2_id], prioritize_order_over_weight=True)
+        assert rses == [(rse1_id, False, True)]
+        rses = rse_selector.select_rse(5, iter([rse1_id, rse2_id]), copies=2, prioritize_order_over_weight=True)
+        assert rses == [(rse1_id, False, True), (rse2_id, False, True)]
+        with pytest.raises(InsufficientTargetRSEs):
+            rse_selector.select_rse(5, [], copies=2, blocklist=[rse1_id])
+        with pytest.raises(InsufficientAccountLimit):
+            rse_selector.select_rse(15, [], copies=1)
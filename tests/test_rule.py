@@ -52,7 +52,7 @@ from rucio.core.replica import add_replica, get_replica
 from rucio.core.request import get_request_by_did
 from rucio.core.rse import add_rse, add_rse_attribute, del_rse, del_rse_attribute, get_rse_id, set_rse_limits, update_rse
 from rucio.core.rse_counter import get_counter as get_rse_counter
-from rucio.core.rule import add_rule, add_rules, delete_rule, get_rule, list_rules, move_rule, reduce_rule, update_rule
+from rucio.core.rule import add_rule, add_rules, delete_rule, delete_rules, get_rule, list_rules, move_rule, reduce_rule, update_rule
 from rucio.core.scope import add_scope
 from rucio.daemons.abacus.account import account_update
 from rucio.daemons.abacus.rse import rse_update
@@ -392,6 +392,36 @@ class TestCore:
             rse_locks = [lock['rse_id'] for lock in get_replica_locks(scope=file['scope'], name=file['name'])]
             assert (rse_locks[0] == rse_locks[1])
 
+    def test_add_rules_datasets_shared_files(self, mock_scope, did_factory, jdoe_account, root_account):
+        """ REPLICATION RULE (CORE): Add replication rules with the same RSE expression to datasets sharing files"""
+        shared_files = create_files(2, mock_scope, self.rse3_id)
+        files1 = create_files(2, mock_scope, self.rse3_id)
+        dataset1 = did_factory.random_dataset_did()
+        add_did(did_type=DIDType.DATASET, account=jdoe_account, **dataset1)
+        attach_dids(dids=files1 + shared_files, account=jdoe_account, **dataset1)
+
+        files2 = create_files(2, mock_scope, self.rse3_id)
+        dataset2 = did_factory.random_dataset_did()
+        add_did(did_type=DIDType.DATASET, account=jdoe_account, **dataset2)
+        attach_dids(dids=files2 + shared_files, account=jdoe_account, **dataset2)
+
+        rule_ids = add_rules(dids=[dataset1, dataset2],
+                             rules=[{'account': jdoe_account, 'copies': 1, 'rse_expression': self.rse1, 'grouping': 'DATASET'},
+                                    {'account': root_account, 'copies': 1, 'rse_expression': self.rse1, 'grouping': 'DATASET'}])
+
+        assert all(len(ids) == 2 for ids in rule_ids.values())
+        for ids in rule_ids.values():
+            for rule_id in ids:
+                rule = get_rule(rule_id)
+                assert rule['state'] == RuleState.REPLICATING
+                assert rule['locks_replicating_cnt'] == 4
+
+        for file in files1 + files2:
+            assert get_replica(rse_id=self.rse1_id, scope=file['scope'], name=file['name'])['lock_cnt'] == 2
+        for file in shared_files:
+            assert len(get_replica_locks(scope=file['scope'], name=file['name'])) == 4
+            assert get_replica(rse_id=self.rse1_id, scope=file['scope'], name=file['name'])['lock_cnt'] == 4
+
     def test_add_rule_container_none(self, mock_scope, did_factory, jdoe_account):
         """ REPLICATION RULE (CORE): Add a replication rule on a container, NONE Grouping"""
         container = did_factory.random_container_did()
@@ -610,6 +640,32 @@ class TestCore:
             # TODO Need to check transfer queue here, this is actually not the check of this test case
         pytest.raises(RuleNotFound, delete_rule, uuid())
 
+    def test_delete_rules(self, mock_scope, did_factory, jdoe_account):
+        """ REPLICATION RULE (CORE): Test to delete several rules at once with set-based statements"""
+        files = create_files(3, mock_scope, self.rse1_id)
+        dataset = did_factory.random_dataset_did()
+        add_did(did_type=DIDType.DATASET, account=jdoe_account, **dataset)
+        attach_dids(dids=files, account=jdoe_account, **dataset)
+
+        rule_id_1 = add_rule(dids=[dataset], account=jdoe_account, copies=1, rse_expression=self.rse1, grouping='NONE', weight='fakeweight', lifetime=None, locked=False, subscription_id=None)[0]
+        rule_id_2 = add_rule(dids=[dataset], account=jdoe_account, copies=2, rse_expression=self.T1, grouping='DATASET', weight='fakeweight', lifetime=None, locked=False, subscription_id=None)[0]
+        rule_id_3 = add_rule(dids=[dataset], account=jdoe_account, copies=1, rse_expression=self.rse3, grouping='NONE', weight='fakeweight', lifetime=None, locked=False, subscription_id=None)[0]
+
+        delete_rules([rule_id_1, rule_id_2], purge_replicas=True)
+        for rule_id in (rule_id_1, rule_id_2):
+            pytest.raises(RuleNotFound, get_rule, rule_id)
+        for file in files:
+            rse_locks = get_replica_locks(scope=file['scope'], name=file['name'])
+            assert [lock['rule_id'] for lock in rse_locks] == [rule_id_3]
+            replica = get_replica(rse_id=self.rse1_id, scope=file['scope'], name=file['name'])
+            assert replica['lock_cnt'] == 0
+            assert replica['tombstone'] == OBSOLETE
+        assert len(list(get_dataset_locks(scope=dataset['scope'], name=dataset['name']))) == 0
+
+        pytest.raises(RuleNotFound, delete_rules, [rule_id_3, uuid()])
+        delete_rules([rule_id_3])
+        pytest.raises(RuleNotFound, get_rule, rule_id_3)
+
     def test_locked_rule(self, mock_scope, did_factory, jdoe_account):
         """ REPLICATION RULE (CORE): Delete a locked replication rule"""
         files = create_files(3, mock_scope, self.rse1_id)
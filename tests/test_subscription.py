@@ -28,9 +28,9 @@ from rucio.core import subscription as subscription_core
 from rucio.core.account import add_account
 from rucio.core.did import add_did, attach_dids, list_new_dids, set_new_dids, set_status
 from rucio.core.rse import add_rse_attribute, update_rse
-from rucio.core.rule import add_rule
+from rucio.core.rule import add_rule, list_rules
 from rucio.core.scope import add_scope
-from rucio.daemons.transmogrifier.transmogrifier import get_subscriptions, run
+from rucio.daemons.transmogrifier.transmogrifier import build_subscription_index, get_matching_subscriptions, get_subscriptions, run
 from rucio.db.sqla import models
 from rucio.db.sqla.constants import AccountType, DatabaseOperationType, DIDType, RuleState
 from rucio.db.sqla.session import db_session, read_session
@@ -223,6 +223,40 @@ class TestSubscriptionCoreGateway:
         for rule in list_subscription_rule_states(account='root', name=subscription_name, vo=vo):
             assert rule[3] == 2
 
+    @pytest.mark.noparallel(reason='runs transmogrifier. Cannot be run at the same time with other tests running it')
+    def test_run_transmogrifier_bulk(self, vo, rse_factory, root_account):
+        """ SUBSCRIPTION (DAEMON): Test the transmogrifier on several DIDs matching the same subscription """
+        new_dids = [did for did in list_new_dids(did_type=None, thread=None, total_threads=None, chunk_size=100000, session=None)]
+        set_new_dids(new_dids, None)
+
+        rse, _ = rse_factory.make_mock_rse()
+        tmp_scope = InternalScope('mock_' + uuid()[:8], vo=vo)
+        with db_session(DatabaseOperationType.WRITE) as session:
+            add_scope(tmp_scope, root_account, session=session)
+        dsns = [did_name_generator('dataset') for _ in range(3)]
+        for dsn in dsns:
+            add_did(scope=tmp_scope, name=dsn, did_type=DIDType.DATASET, account=root_account)
+
+        subid = add_subscription(name=uuid(),
+                                 account='root',
+                                 filter_={'scope': [tmp_scope.external, ], 'did_type': ['DATASET', ]},
+                                 replication_rules=[{'rse_expression': rse, 'copies': 1, 'activity': self.activity}],
+                                 lifetime=None,
+                                 retroactive=False,
+                                 dry_run=False,
+                                 comments='This is a comment',
+                                 issuer='root',
+                                 vo=vo)
+        # A duplicate rule on one of the DIDs must not prevent the creation of the other rules
+        add_rule(dids=[{'scope': tmp_scope, 'name': dsns[0]}], account=root_account, copies=1, rse_expression=rse, grouping='DATASET', weight=None, lifetime=None, locked=False, subscription_id=None)
+
+        run(threads=1, bulk=1000000, once=True)
+        for dsn in dsns:
+            assert len(list(list_rules(filters={'scope': tmp_scope, 'name': dsn}))) == 1
+        assert len(list(list_rules(filters={'subscription_id': subid}))) == 2
+        new_dids = [(did['scope'], did['name']) for did in list_new_dids(did_type=None, thread=None, total_threads=None, chunk_size=100000, session=None)]
+        assert not [dsn for dsn in dsns if (tmp_scope, dsn) in new_dids]
+
 
 def test_create_and_update_and_list_subscription(rse_factory, rest_client, auth_token):
     """ SUBSCRIPTION (REST): Test the creation of a new subscription, update it, list it """
@@ -511,6 +545,33 @@ class TestSubscriptionClient:
         assert states[0] == 'INACTIVE'
 
 
+def test_subscription_index_matching(vo):
+    """ SUBSCRIPTION (DAEMON): Test the matching of DIDs against the compiled subscription index """
+    account = InternalAccount('root', vo=vo)
+    scope = InternalScope('data18', vo=vo)
+    subscriptions = [{'id': 'by_scope_pattern', 'filter': '{"scope": ["data1[78]"], "pattern": "AOD\\\\.", "did_type": ["DATASET"]}'},
+                     {'id': 'by_metadata', 'filter': '{"account": "root", "datatype": ["AOD", "ESD"], "excluded_pattern": ".*_tmp$"}'},
+                     {'id': 'by_project', 'filter': '{"project": "mc.*", "min_avg_file_size": 10}'},
+                     {'id': 'invalid_regex', 'filter': '{"pattern": "["}'},
+                     {'id': 'invalid_json', 'filter': '{'}]
+    subscription_index = build_subscription_index(subscriptions)
+    assert len(subscription_index['entries']) == 3
+
+    def matching(name, **kwargs):
+        metadata = {'hidden': False, 'account': account, 'did_type': DIDType.DATASET, 'length': None, 'bytes': None, 'datatype': 'AOD', 'project': 'data18'}
+        metadata.update(kwargs)
+        return [subscription['id'] for subscription, _ in get_matching_subscriptions(subscription_index, {'scope': scope, 'name': name}, metadata)]
+
+    assert matching('AOD.123') == ['by_scope_pattern', 'by_metadata']
+    assert matching('AOD.123_tmp') == ['by_scope_pattern']
+    assert matching('AOD.123', did_type=DIDType.CONTAINER, datatype='HITS') == []
+    assert matching('AOD.123', hidden=True) == []
+    assert matching('EVNT.123', project='mc16', length=2, bytes=100) == ['by_metadata', 'by_project']
+    assert matching('EVNT.123', project='mc16', length=20, bytes=100) == ['by_metadata']
+    # The results of the indexed keys are cached per value
+    assert ('datatype', 'AOD') in subscription_index['rejected']
+
+
 @pytest.mark.noparallel(reason='uses daemon')
 class TestDaemon:
     def test_run_transmogrifier_chained_subscription_associated_sites_algo(self, rse_factory, vo, rucio_client, root_account):
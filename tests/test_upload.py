@@ -16,20 +16,22 @@ import json
 import logging
 import os
 import shutil
+import threading
+import time
 from random import choice
 from string import ascii_uppercase
 from tempfile import TemporaryDirectory
 from typing import TYPE_CHECKING
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import pytest
 
 from rucio.client.client import Client
-from rucio.client.uploadclient import UploadClient
+from rucio.client.uploadclient import UploadClient, _ReplicaRegistrationBatch
 from rucio.common.checksum import adler32, md5
 from rucio.common.config import config_add_section, config_set
 from rucio.common.constants import RseAttr
-from rucio.common.exception import InputValidationError, NoFilesUploaded, NotAllFilesUploaded, ResourceTemporaryUnavailable
+from rucio.common.exception import DataIdentifierAlreadyExists, DataIdentifierNotFound, InputValidationError, NoFilesUploaded, NotAllFilesUploaded, ResourceTemporaryUnavailable
 from rucio.common.types import InternalScope
 from rucio.common.utils import execute, generate_uuid
 from rucio.core.rse import add_protocol, add_rse_attribute
@@ -140,6 +142,42 @@ def test_upload_multi(rse, scope, upload_client, download_client, file_factory):
     assert adler32(local_file2) == adler32(downloaded_file2)
 
 
+@pytest.mark.parametrize("file_config_mock", [
+    {"overrides": [('upload', 'max_workers_per_rse', '2')]},
+], indirect=True)
+def test_upload_parallel(file_config_mock, rse_factory, scope, upload_client, rucio_client, file_factory):
+    """CLIENT(USER): Files uploaded in parallel to an RSE are all registered and summarized"""
+    rse, _ = rse_factory.make_posix_rse()
+    dataset = did_name_generator('dataset')
+    paths = [file_factory.file_generator() for _ in range(5)]
+    items: list[FileToUploadDict] = [{
+        'path': path,
+        'rse': rse,
+        'did_scope': scope,
+        'did_name': os.path.basename(path),
+        'dataset_scope': scope,
+        'dataset_name': dataset,
+        'guid': generate_uuid(),
+    } for path in paths]
+    summary_path = file_factory.base_dir / 'summary'
+
+    status = upload_client.upload(items=items, summary_file_path=summary_path)
+    assert status == 0
+
+    with open(summary_path) as json_file:
+        summary = json.load(json_file)
+    assert sorted(summary) == sorted(f"{scope}:{item['did_name']}" for item in items)
+    for item in items:
+        file_summary = summary[f"{scope}:{item['did_name']}"]
+        assert (file_summary['rse'], file_summary['guid']) == (rse, item['guid'])
+        assert file_summary['adler32'] == adler32(item['path'])
+        assert file_summary['pfn']
+
+    assert sorted(f['name'] for f in rucio_client.list_files(scope=scope, name=dataset)) == sorted(item['did_name'] for item in items)
+    replicas = rucio_client.list_replicas(dids=[{'scope': scope, 'name': item['did_name']} for item in items], all_states=True)
+    assert sorted((replica['name'], replica['states']) for replica in replicas) == sorted((item['did_name'], {rse: 'AVAILABLE'}) for item in items)
+
+
 def test_upload_file_already_exists_single(rse, scope, upload_client, file_factory):
     traces = []
     local_file = file_factory.file_generator()
@@ -749,3 +787,94 @@ def test_upload_recursive(structure, is_valid_container, rse_factory, scope, upl
                 upload_client._collect_files_recursive(items)
         else:
             upload_client._collect_files_recursive(items)
+
+
+def test_replica_registration_batch():
+    """CLIENT(USER): The registrations following the uploads are done in bulk, and one by one on failure"""
+    client = MagicMock()
+
+    def attach_dids_to_dids(attachments):
+        if any(did['name'] == 'bad_file' for attachment in attachments for did in attachment['dids']):
+            raise DataIdentifierNotFound()
+    client.attach_dids_to_dids.side_effect = attach_dids_to_dids
+
+    registrations = _ReplicaRegistrationBatch(client, batch_size=3)
+    files = [{'did_scope': 'user.root', 'did_name': name, 'basename': name, 'rse': 'MOCK', 'dataset_scope': 'user.root', 'dataset_name': 'dataset'}
+             for name in ('file_1', 'bad_file', 'file_2', 'file_3')]
+    for file in files:
+        registrations.add(file, replica={'scope': file['did_scope'], 'name': file['did_name'], 'state': 'A'}, attach=True)
+    assert client.update_replicas_states.call_count == 1
+    registrations.flush()
+
+    assert [len(call.kwargs['files']) for call in client.update_replicas_states.call_args_list] == [3, 1]
+    # the failed bulk attachment is retried file by file
+    assert client.attach_dids_to_dids.call_count == 1 + 3 + 1
+    assert [registrations.succeeded(file) for file in files] == [True, False, True, True]
+
+
+def test_replica_registration_batch_lock():
+    """CLIENT(USER): The registrations of a full batch do not block the uploads adding to the next one"""
+    client = MagicMock()
+    release = threading.Event()
+    client.update_replicas_states.side_effect = lambda rse, files: release.wait(30)
+
+    registrations = _ReplicaRegistrationBatch(client, batch_size=2)
+    files = [{'did_scope': 'user.root', 'did_name': 'file_%d' % i, 'basename': 'file_%d' % i, 'rse': 'MOCK'} for i in range(3)]
+
+    def add(file):
+        registrations.add(file, replica={'scope': file['did_scope'], 'name': file['did_name'], 'state': 'A'}, attach=False)
+    registering = threading.Thread(target=lambda: [add(file) for file in files[:2]])
+    registering.start()
+    try:
+        deadline = time.time() + 30
+        while not client.update_replicas_states.called:
+            assert time.time() < deadline
+            time.sleep(0.01)
+        adding = threading.Thread(target=add, args=(files[2],))
+        adding.start()
+        adding.join(5)
+        assert not adding.is_alive()
+    finally:
+        release.set()
+        registering.join()
+    registrations.flush()
+    assert [len(call.kwargs['files']) for call in client.update_replicas_states.call_args_list] == [2, 1]
+
+
+def test_register_files_in_bulk():
+    """CLIENT(USER): The files registered before their upload are looked up and added in bulk"""
+    with patch.object(UploadClient, '__init__', return_value=None):
+        upload_client = UploadClient()
+    upload_client.logger = logging.log
+    upload_client._registration_lock = threading.Lock()
+    upload_client.client = client = MagicMock()
+    client.account = 'root'
+    client.list_scopes_for_account.return_value = ['user.root']
+    client.get_metadata_bulk.return_value = [{'scope': 'user.root', 'name': 'existing_elsewhere', 'adler32': '0abc'},
+                                             {'scope': 'user.root', 'name': 'existing_here', 'adler32': 'abc'}]
+    client.list_replicas.return_value = [{'scope': 'user.root', 'name': 'existing_elsewhere', 'rses': {'OTHER': []}},
+                                         {'scope': 'user.root', 'name': 'existing_here', 'rses': {'MOCK': []}}]
+
+    def file(name, adler32='abc', dataset=True):
+        file = {'did_scope': 'user.root', 'did_name': name, 'rse': 'MOCK', 'bytes': 1, 'adler32': adler32, 'md5': 'md5', 'meta': {'guid': generate_uuid()}, 'state': 'C'}
+        if dataset:
+            file.update(dataset_scope='user.root', dataset_name='dataset', dataset_did_str='user.root:dataset')
+        return file
+    files = [file('new'), file('existing_elsewhere'), file('existing_here'), file('no_dataset', dataset=False)]
+    registered_dataset_dids = set()
+
+    upload_client._register_files(files, registered_dataset_dids)
+    client.list_scopes_for_account.assert_called_once()
+    client.add_dataset.assert_called_once()
+    assert registered_dataset_dids == {'user.root:dataset'}
+    client.get_metadata_bulk.assert_called_once_with([{'scope': 'user.root', 'name': f['did_name']} for f in files])
+    client.add_replicas.assert_called_once()
+    assert [replica['name'] for replica in client.add_replicas.call_args.kwargs['files']] == ['new', 'existing_elsewhere', 'no_dataset']
+    # only the new file without dataset gets its own rule
+    client.add_replication_rule.assert_called_once()
+    assert client.add_replication_rule.call_args.args[0] == [{'scope': 'user.root', 'name': 'no_dataset'}]
+
+    client.get_metadata_bulk.return_value = [{'scope': 'user.root', 'name': 'existing_here', 'adler32': 'def'}]
+    with pytest.raises(DataIdentifierAlreadyExists):
+        upload_client._register_files([file('existing_here')], registered_dataset_dids)
+    assert client.add_dataset.call_count == 1
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# Copyright European Organization for Nuclear Research (CERN) since 2012
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark the checksum computation of many files.
+
+Compares one pass per file and per algorithm, as done with the functions of
+CHECKSUM_ALGO_DICT, with the single pass over concurrent files of checksum_files.
+The files are generated in a temporary directory, or the given files are used.
+"""
+
+import os.path
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+
+# Ensure package imports work when executed from any cwd
+base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(base_path, 'lib'))
+
+from rucio.common.checksum import CHECKSUM_ALGO_DICT, STREAMING_CHECKSUMS, checksum_files  # noqa: E402
+
+
+def _timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def _separate_passes(paths, algorithms):
+    return {path: {algorithm: CHECKSUM_ALGO_DICT[algorithm](path) for algorithm in algorithms} for path in paths}
+
+
+def run(paths, algorithms, max_workers):
+    total_bytes = sum(os.path.getsize(path) for path in paths)
+    print('%d files, %.1f MB, checksums: %s' % (len(paths), total_bytes / 1e6, ', '.join(algorithms)))
+
+    results = {}
+    for label, function, kwargs in (
+        ('one pass per algorithm', _separate_passes, {}),
+        ('checksum_files, 1 thread', checksum_files, {'max_workers': 1}),
+        ('checksum_files, %s threads' % (max_workers or 'default'), checksum_files, {'max_workers': max_workers}),
+    ):
+        duration, results[label] = _timed(function, paths, algorithms, **kwargs)
+        print('%-32s %8.3f s %10.1f MB/s' % (label, duration, total_bytes / 1e6 / duration))
+
+    if len({repr(sorted(result.items())) for result in results.values()}) != 1:
+        print('The checksums differ between the methods')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(prog='benchmark_checksum.py', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('paths', nargs='*', help='Files to checksum. By default, files are generated.')
+    parser.add_argument('--files', type=int, default=16, help='Number of files to generate')
+    parser.add_argument('--size', type=int, default=64, help='Size of the generated files in MB')
+    parser.add_argument('--algorithms', default='adler32,md5', help='Comma separated checksums, among %s' % ', '.join(STREAMING_CHECKSUMS))
+    parser.add_argument('--threads', type=int, default=None, help='Number of threads of checksum_files')
+    args = parser.parse_args()
+    algorithms = args.algorithms.split(',')
+
+    if args.paths:
+        run(args.paths, algorithms, args.threads)
+    else:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            paths = []
+            for index in range(args.files):
+                path = os.path.join(tmp_dir, 'file_%d' % index)
+                with open(path, 'wb') as f:
+                    f.write(os.urandom(args.size * 1000 * 1000))
+                paths.append(path)
+            run(paths, algorithms, args.threads)
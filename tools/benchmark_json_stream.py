@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# Copyright European Organization for Nuclear Research (CERN) since 2012
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark the decoding of a synthetic x-json-stream replica listing by the client.
+
+Compares the generic decoding, reading 512 bytes at a time and testing every
+string for a date, with the decoding of the replica listing, reading
+JSON_STREAM_CHUNK_SIZE bytes at a time without dates.
+"""
+
+import io
+import json
+import os.path
+import sys
+import time
+from argparse import ArgumentParser
+
+# Ensure package imports work when executed from any cwd
+base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(base_path, 'lib'))
+
+import requests  # noqa: E402
+
+from rucio.client.baseclient import JSON_STREAM_CHUNK_SIZE  # noqa: E402
+from rucio.common.utils import EXTRA_MODULES, parse_response  # noqa: E402
+
+
+def _replica_stream(lines):
+    buffer = io.BytesIO()
+    for index in range(lines):
+        name = 'file_%08d' % index
+        replica = {
+            'scope': 'user.root', 'name': name, 'bytes': 1024 ** 2 + index, 'adler32': '%08x' % index, 'md5': None,
+            'rses': {'SITE_DISK': ['root://xrootd.site.org:1094//rucio/user/root/%s' % name]},
+            'pfns': {'root://xrootd.site.org:1094//rucio/user/root/%s' % name: {
+                'domain': 'wan', 'rse': 'SITE_DISK', 'priority': 1, 'volatile': False, 'type': 'DISK', 'client_extract': False}},
+            'states': {'SITE_DISK': 'AVAILABLE'},
+        }
+        buffer.write(json.dumps(replica).encode() + b'\n')
+    return buffer.getvalue()
+
+
+def _response(data):
+    response = requests.Response()
+    response.raw = io.BytesIO(data)
+    response.headers['content-type'] = 'application/x-json-stream'
+    return response
+
+
+def _generic(data):
+    return sum(1 for line in _response(data).iter_lines() if line and parse_response(line))
+
+
+def _replica_listing(data):
+    return sum(1 for line in _response(data).iter_lines(chunk_size=JSON_STREAM_CHUNK_SIZE) if line and parse_response(line, datetime_fields=()))
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(prog='benchmark_json_stream.py', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lines', type=int, default=1000000, help='Number of replicas in the stream')
+    args = parser.parse_args()
+
+    data = _replica_stream(args.lines)
+    print('%d replicas, %.1f MB, orjson: %s' % (args.lines, len(data) / 1e6, 'yes' if EXTRA_MODULES['orjson'] else 'no'))
+    for label, function in (('generic decoding', _generic), ('replica listing decoding', _replica_listing)):
+        start = time.perf_counter()
+        count = function(data)
+        duration = time.perf_counter() - start
+        print('%-26s %8.2f s %10.0f lines/s' % (label, duration, count / duration))